@@ -2,24 +2,98 @@
 
 import argparse
 import base64
+import contextlib
+import glob
+import hashlib
+import importlib
+import importlib.util
+import io
 import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
 
-from lib import DashboardEncoder
-from lib.api_gateways import generate_api_gateways_dashboard as apig_dispatcher
-from lib.ecs import generate_ecs_alb_service_dashboard as ecs_alb_service_dispatcher
-from lib.elasticache_redis import (
-    generate_elasticache_redis_dashboard as elasticache_redis_dispatcher,
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR_ENV = "GRAFANA_DASHBOARDS_CACHE_DIR"
+# Same variables as the terraform grafana provider
+GRAFANA_URL_ENV = "GRAFANA_URL"
+GRAFANA_AUTH_ENV = "GRAFANA_AUTH"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "grafana-dashboards",
 )
-from lib.elasticsearch import (
-    generate_elasticsearch_dashboard as elasticsearch_dispatcher,
-)
-from lib.firehose import generate_firehose_dashboard as firehose_dispatcher
-from lib.lambdas import dispatcher as lambda_dispatcher
-from lib.rds import generate_rds_dashboard as rds_dispatcher
-from lib.step_functions import generate_sfn_dashboard as sfn_dispatcher
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Warnings of a cached render are stored next to its output, to be repeated on
+# every cache hit
+CACHE_STDERR_SUFFIX = ".stderr"
+# Options that change how a dashboard is rendered, not what is rendered
+CACHE_OPTIONS = ["no_cache", "cache_dir", "cache_max_bytes", "profile"]
+# CloudWatch budgets of a dashboard and a batch, GetMetricData takes at most
+# 500 metric queries per request
+DEFAULT_MAX_QUERIES_PER_REFRESH = 500
+DEFAULT_MAX_DATAPOINTS_PER_HOUR = 2500000
+DEFAULT_MAX_BATCH_DATAPOINTS_PER_HOUR = 50000000
+BUDGET_OPTIONS = ["max_queries_per_refresh", "max_datapoints_per_hour", "budget"]
+# Options setting the refresh and time range of a dashboard
+TIME_OPTIONS = ["time_profile", "refresh", "time_range", "refresh_intervals"]
+# Options setting the period policy of the CloudWatch metrics
+PERIOD_OPTIONS = ["period", "period_min", "period_max"]
+# Number of functions in the cProfile report of --profile
+PROFILE_FUNCTIONS = 40
+
+# Generators are imported on dispatch, so that one invocation only imports the
+# modules of the service it renders
+DISPATCHERS = {
+    "lambda": "lib.lambdas:dispatcher",
+    "api-gateway": "lib.api_gateways:generate_api_gateways_dashboard",
+    "step-function": "lib.step_functions:generate_sfn_dashboard",
+    "firehose": "lib.firehose:generate_firehose_dashboard",
+    "elasticache-redis": "lib.elasticache_redis:generate_elasticache_redis_dashboard",
+    "elasticsearch": "lib.elasticsearch:generate_elasticsearch_dashboard",
+    "rds": "lib.rds:generate_rds_dashboard",
+    "ecs-alb-service": "lib.ecs:generate_ecs_alb_service_dashboard",
+}
 
 
-def parse_options():  # pragma: no cover
+def add_budget_options(parser, batch=False):  # pragma: no cover
+    """
+    add CloudWatch budget cli
+    """
+    parser.add_argument(
+        "--budget-queries-per-refresh",
+        type=int,
+        default=DEFAULT_MAX_QUERIES_PER_REFRESH,
+        help="CloudWatch metric queries per refresh of a dashboard, 0 for no limit",
+        dest="max_queries_per_refresh",
+    )
+    parser.add_argument(
+        "--budget-datapoints-per-hour",
+        type=int,
+        default=DEFAULT_MAX_DATAPOINTS_PER_HOUR,
+        help="GetMetricData datapoints per hour of a dashboard, 0 for no limit",
+        dest="max_datapoints_per_hour",
+    )
+    if batch:
+        parser.add_argument(
+            "--budget-batch-datapoints-per-hour",
+            type=int,
+            default=DEFAULT_MAX_BATCH_DATAPOINTS_PER_HOUR,
+            help="GetMetricData datapoints per hour of all dashboards, 0 for no limit",
+            dest="max_batch_datapoints_per_hour",
+        )
+    parser.add_argument(
+        "--on-budget-exceeded",
+        choices=["fail", "warn"],
+        default="fail",
+        help="Fail or warn when a CloudWatch budget is exceeded",
+        dest="budget",
+    )
+
+
+def parse_options(argv=None):  # pragma: no cover
     """
     parse cli
     """
@@ -52,6 +126,116 @@ def parse_options():  # pragma: no cover
         help="LambdaInsights Namespace",
     )
     parser.add_argument("--notifications", nargs="+", help="Notify alerts")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Minimal JSON without null and empty fields",
+    )
+    parser.add_argument(
+        "--prune-defaults",
+        action="store_true",
+        help="Leave out the fields equal to the Grafana defaults",
+        dest="prune_defaults",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Gzip the JSON, printed as base64gzip instead of base64EncodedJson",
+    )
+    parser.add_argument(
+        "--precompiled-panels",
+        action="store_true",
+        help="Fill precompiled panel templates instead of building every panel",
+        dest="precompiled_panels",
+    )
+    parser.add_argument(
+        "--lazy-rows",
+        action="store_true",
+        help="Collapse every row but the summary, queried when expanded",
+        dest="lazy_rows",
+    )
+    parser.add_argument(
+        "--time-profile",
+        type=str,
+        help="Refresh and time range preset, ops-live or review",
+        dest="time_profile",
+    )
+    parser.add_argument(
+        "--refresh",
+        type=str,
+        help="Auto refresh of the dashboard like 30s, off to turn it off",
+    )
+    parser.add_argument(
+        "--time-range",
+        type=str,
+        help="Default time range of the dashboard like 7d, for the last 7 days",
+        dest="time_range",
+    )
+    parser.add_argument(
+        "--refresh-intervals",
+        nargs="+",
+        help="Auto refresh intervals offered by the time picker",
+        dest="refresh_intervals",
+    )
+    parser.add_argument(
+        "--period",
+        type=str,
+        help="Period of the CloudWatch metrics, auto, variable for a template "
+        "variable between --period-min and --period-max, or a period like 5m",
+    )
+    parser.add_argument(
+        "--period-min",
+        type=str,
+        help="Shortest period of the period template variable, 1m by default",
+        dest="period_min",
+    )
+    parser.add_argument(
+        "--period-max",
+        type=str,
+        help="Longest period of the period template variable, which then has no "
+        "auto period as Grafana does not bound it",
+        dest="period_max",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Add the query fan-out report of the dashboard as report",
+    )
+    parser.add_argument(
+        "--content-hash",
+        action="store_true",
+        help="Add the hash of the canonical JSON of the dashboard as contentHash",
+        dest="content_hash",
+    )
+    add_budget_options(parser)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always render, do not read or write the render cache",
+        dest="no_cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR),
+        help="Render cache directory",
+        dest="cache_dir",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Size of the render cache before least recently used entries are evicted",
+        dest="cache_max_bytes",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Render without the cache and write the phase timings and cProfile "
+        "stats to PATH, stderr without PATH",
+    )
 
     subparsers = parser.add_subparsers(dest="service")
     subparsers.required = True
@@ -62,6 +246,19 @@ def parse_options():  # pragma: no cover
     apig.add_argument(
         "--lambdas", nargs="+", help="List of Lambda names or arns", default=[]
     )
+    apig_lambda_sections = apig.add_mutually_exclusive_group()
+    apig_lambda_sections.add_argument(
+        "--aggregate-lambdas",
+        action="store_true",
+        help="One graph per metric of all the lambdas instead of a row per lambda",
+        dest="aggregate_lambdas",
+    )
+    apig_lambda_sections.add_argument(
+        "--repeat-lambdas",
+        action="store_true",
+        help="One row repeated by Grafana for the lambdas selected in a template",
+        dest="repeat_lambdas",
+    )
 
     rds = subparsers.add_parser("rds", help="Create dashboard for RDS")
     rds.add_argument(
@@ -118,6 +315,19 @@ def parse_options():  # pragma: no cover
     sfn.add_argument(
         "--lambdas", nargs="+", help="List of Lambda names or arns", default=[]
     )
+    sfn_lambda_sections = sfn.add_mutually_exclusive_group()
+    sfn_lambda_sections.add_argument(
+        "--aggregate-lambdas",
+        action="store_true",
+        help="One graph per metric of all the lambdas instead of a row per lambda",
+        dest="aggregate_lambdas",
+    )
+    sfn_lambda_sections.add_argument(
+        "--repeat-lambdas",
+        action="store_true",
+        help="One row repeated by Grafana for the lambdas selected in a template",
+        dest="repeat_lambdas",
+    )
 
     lambda_function = subparsers.add_parser(
         "lambda", help="Create dashboard for lambdas"
@@ -154,7 +364,148 @@ def parse_options():  # pragma: no cover
         "sqs", help="Lambda is triggered by SQS"
     )
     sqs.add_argument("--fifo", action="store_true", help="Are the SQS queues FIFO")
-    return parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def parse_batch_options(argv):  # pragma: no cover
+    """
+    parse batch cli
+    """
+    parser = argparse.ArgumentParser(
+        prog="bin.py batch",
+        description="Render every dashboard of a manifest in one process",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        required=True,
+        help="JSON file with a list of dashboard specs",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes rendering dashboards in parallel",
+    )
+    parser.add_argument(
+        "--precompiled-panels",
+        action="store_true",
+        help="Fill precompiled panel templates instead of building every panel",
+        dest="precompiled_panels",
+    )
+    parser.add_argument(
+        "--memo-size",
+        type=int,
+        default=1024,
+        help="Number of lambda panels memoized across dashboards, 0 to disable",
+        dest="memo_size",
+    )
+    add_budget_options(parser, batch=True)
+    return parser.parse_args(argv)
+
+
+def parse_sync_options(argv):  # pragma: no cover
+    """
+    parse sync cli
+    """
+    parser = argparse.ArgumentParser(
+        prog="bin.py sync",
+        description="Render every dashboard of a manifest and push them to Grafana",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        required=True,
+        help="JSON file with a list of dashboard specs",
+    )
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=os.environ.get(GRAFANA_URL_ENV),
+        required=GRAFANA_URL_ENV not in os.environ,
+        help="Grafana URL, ${}".format(GRAFANA_URL_ENV),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes rendering dashboards in parallel",
+    )
+    parser.add_argument(
+        "--precompiled-panels",
+        action="store_true",
+        help="Fill precompiled panel templates instead of building every panel",
+        dest="precompiled_panels",
+    )
+    parser.add_argument(
+        "--memo-size",
+        type=int,
+        default=1024,
+        help="Number of lambda panels memoized across dashboards, 0 to disable",
+        dest="memo_size",
+    )
+    add_budget_options(parser, batch=True)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of dashboards posted to Grafana at the same time",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries of a request failing with a connection error or 429/5xx",
+    )
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=0.5,
+        help="Seconds before the first retry, doubled for every next retry",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30,
+        help="Seconds to wait for Grafana to connect or respond before a retry",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the dashboards that would be created, updated and skipped",
+        dest="dry_run",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_serve_options(argv):  # pragma: no cover
+    """
+    parse serve cli
+    """
+    from client import get_socket_path
+
+    parser = argparse.ArgumentParser(
+        prog="bin.py serve",
+        description="Keep the generator loaded and render dashboards for client.py",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=get_socket_path(),
+        help="Unix socket to listen on",
+        dest="socket_path",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="Stop after this many seconds without requests",
+        dest="idle_timeout",
+    )
+    return parser.parse_args(argv)
 
 
 def apply_options(args):
@@ -167,17 +518,312 @@ def apply_options(args):
     return args
 
 
+MANIFEST_DEFAULTS = {
+    "cloudwatch_data_source": None,
+    "influxdb_data_source": None,
+    "elasticsearch_data_source": None,
+    "lucene_query": None,
+    "lambda_insights_namespace": "LambdaInsights",
+    "notifications": None,
+    "lambdas": [],
+    "aggregate_lambdas": False,
+    "repeat_lambdas": False,
+    "fifo": False,
+    "precompiled_panels": False,
+    "lazy_rows": False,
+    "time_profile": None,
+    "refresh": None,
+    "time_range": None,
+    "refresh_intervals": None,
+    "period": None,
+    "period_min": None,
+    "period_max": None,
+    "memo_size": 0,
+    "max_queries_per_refresh": DEFAULT_MAX_QUERIES_PER_REFRESH,
+    "max_datapoints_per_hour": DEFAULT_MAX_DATAPOINTS_PER_HOUR,
+    "budget": "fail",
+}
+
+MANIFEST_REQUIRED_FIELDS = ["id", "service", "name", "environment"]
+
+
+def load_dispatcher(path: str):
+    """Import the dashboard generator of a module:function path"""
+
+    module_name, function_name = path.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def lazy_dispatcher(path: str):
+    """Dashboard generator that is only imported when called"""
+
+    def dispatch(*args, **kwargs):
+        return load_dispatcher(path)(*args, **kwargs)
+
+    return dispatch
+
+
 def dispatcher():
-    return {
-        "lambda": lambda_dispatcher,
-        "api-gateway": apig_dispatcher,
-        "step-function": sfn_dispatcher,
-        "firehose": firehose_dispatcher,
-        "elasticache-redis": elasticache_redis_dispatcher,
-        "elasticsearch": elasticsearch_dispatcher,
-        "rds": rds_dispatcher,
-        "ecs-alb-service": ecs_alb_service_dispatcher,
-    }
+    return {service: lazy_dispatcher(path) for service, path in DISPATCHERS.items()}
+
+
+def get_period_policy(args):
+    """Period policy of the CloudWatch metrics of the options, None to keep the
+    periods of the panel builders"""
+
+    period_options = [getattr(args, option, None) for option in PERIOD_OPTIONS]
+    if not any(period_options):
+        return None
+
+    from lib.periods import DEFAULT_MIN_PERIOD, VARIABLE, PeriodPolicy
+
+    period, min_period, max_period = period_options
+    if (min_period or max_period) and period != VARIABLE:
+        raise Exception(
+            "Min and max periods only bound the {} period, not period {}".format(
+                VARIABLE, period
+            )
+        )
+    return PeriodPolicy(period, min_period or DEFAULT_MIN_PERIOD, max_period)
+
+
+def build_dashboard(args):
+    """Build the dashboard described by the options"""
+
+    from lib.templates import memoized_panels, precompiled_panels
+
+    dispatch = dispatcher()
+    precompiled = getattr(args, "precompiled_panels", False)
+    memo_size = getattr(args, "memo_size", 0)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(precompiled_panels(precompiled))
+        stack.enter_context(memoized_panels(memo_size))
+        if getattr(args, "lazy_rows", False):
+            from lib.layout import lazy_rows
+
+            stack.enter_context(lazy_rows())
+        policy = get_period_policy(args)
+        if policy:
+            from lib.periods import period_policy
+
+            stack.enter_context(period_policy(policy))
+        dashboard = dispatch[args.service](**args.__dict__)
+
+    time_options = {option: getattr(args, option, None) for option in TIME_OPTIONS}
+    if any(value is not None for value in time_options.values()):
+        from lib.commons import apply_time_profile
+
+        dashboard = apply_time_profile(dashboard, **time_options)
+
+    # The period variable starts on a period of the time range of the dashboard
+    if policy:
+        from lib.periods import apply_period_policy
+
+        dashboard = apply_period_policy(dashboard, policy)
+    return dashboard
+
+
+def check_budget(subject: str, violations: list, budget="fail") -> None:
+    """Fail or warn about the budgets the subject exceeds"""
+
+    if not violations:
+        return
+
+    message = "{} exceeds the CloudWatch budget: {}".format(
+        subject, ", ".join(violations)
+    )
+    if budget == "warn":
+        print("Warning: {}".format(message), file=sys.stderr)
+    else:
+        raise Exception(message)
+
+
+def check_dashboard_budget(report: dict, args) -> None:
+    """Fail or warn when the dashboard of the report exceeds the budgets of the
+    options"""
+
+    from lib.report import get_budget_violations
+
+    violations = get_budget_violations(
+        report,
+        max_queries_per_refresh=getattr(args, "max_queries_per_refresh", 0),
+        max_datapoints_per_hour=getattr(args, "max_datapoints_per_hour", 0),
+    )
+    check_budget(
+        "Dashboard {}".format(report["title"]),
+        violations,
+        getattr(args, "budget", "fail"),
+    )
+
+
+def render_dashboard_report(args) -> tuple:
+    """Render the dashboard described by the options as JSON, returns it with
+    its query report after checking the budgets and its content hash"""
+
+    from lib import CanonicalEncoder, get_canonical_json_data, get_content_hash
+    from lib.report import get_dashboard_report
+
+    dashboard = build_dashboard(args)
+    data = get_canonical_json_data(dashboard)
+    report = get_dashboard_report(data)
+    check_dashboard_budget(report, args)
+    return json.dumps(data, cls=CanonicalEncoder), report, get_content_hash(data)
+
+
+def render_dashboard(args) -> str:
+    """Render the dashboard described by the options as JSON"""
+
+    return render_dashboard_report(args)[0]
+
+
+def load_manifest(path: str) -> list:
+    """Load the dashboard specs of a batch manifest"""
+
+    with open(path) as manifest:
+        specs = json.load(manifest)
+
+    if not isinstance(specs, list):
+        raise Exception("Manifest should contain a list of dashboard specs")
+
+    return specs
+
+
+def get_manifest_options(spec: dict) -> argparse.Namespace:
+    """Turn a manifest spec into the options the CLI would have parsed"""
+
+    missing = [field for field in MANIFEST_REQUIRED_FIELDS if field not in spec]
+    if missing:
+        raise Exception(
+            "Dashboard spec {} is missing {}".format(
+                spec.get("id", "<unknown>"), ", ".join(missing)
+            )
+        )
+
+    if spec["service"] not in dispatcher():
+        raise Exception(
+            "Dashboard spec {} has an unknown service {}".format(
+                spec["id"], spec["service"]
+            )
+        )
+
+    if spec.get("aggregate_lambdas") and spec.get("repeat_lambdas"):
+        raise Exception(
+            "Dashboard spec {} sets both aggregate_lambdas and repeat_lambdas".format(
+                spec["id"]
+            )
+        )
+
+    options = dict(MANIFEST_DEFAULTS)
+    options.update({key: value for key, value in spec.items() if key != "id"})
+    return apply_options(argparse.Namespace(**options))
+
+
+def render_spec(args: argparse.Namespace) -> tuple:
+    """Render the options of a dashboard spec, returns its base64 and content
+    hash, error, GetMetricData datapoints per hour and the panel memo hits and
+    misses it added"""
+
+    from lib.templates import MEMO_STATS
+
+    stats = dict(MEMO_STATS)
+    try:
+        dashboard, report, content_hash = render_dashboard_report(args)
+        dashboard = {
+            "base64EncodedJson": str(get_base64_encoded_dashboard(dashboard), "utf-8"),
+            "contentHash": content_hash,
+        }
+        datapoints, error = report["datapoints_per_hour"]["total"], None
+    except Exception as e:
+        dashboard, datapoints = None, 0
+        error = "{}: {}".format(type(e).__name__, e)
+
+    return (
+        dashboard,
+        error,
+        datapoints,
+        {key: MEMO_STATS[key] - count for key, count in stats.items()},
+    )
+
+
+def render_manifest(
+    specs: list, jobs: int = 1, max_batch_datapoints_per_hour=0, budget="fail"
+) -> tuple:
+    """Render every dashboard spec, returns the base64 and content hash of the
+    dashboards and the errors by spec id"""
+
+    options = {}
+    for spec in specs:
+        args = get_manifest_options(spec)
+        if spec["id"] in options:
+            raise Exception("Duplicate dashboard spec id {}".format(spec["id"]))
+        options[spec["id"]] = args
+
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Specs are spread over the workers in a few chunks each, map keeps
+        # the results in manifest order
+        chunksize = max(1, len(options) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(render_spec, options.values(), chunksize=chunksize))
+
+        # Every worker has its own panel memo, add their counters to ours
+        from lib.templates import MEMO_STATS
+
+        for _, _, _, stats in results:
+            for key, count in stats.items():
+                MEMO_STATS[key] += count
+    else:
+        results = [render_spec(args) for args in options.values()]
+
+    rendered, errors = {}, {}
+    for spec_id, (dashboard, error, _, _) in zip(options, results):
+        if error:
+            errors[spec_id] = error
+        else:
+            rendered[spec_id] = dashboard
+
+    datapoints = sum(datapoints for _, _, datapoints, _ in results)
+    if max_batch_datapoints_per_hour and datapoints > max_batch_datapoints_per_hour:
+        violation = "{:.0f} GetMetricData datapoints per hour, more than {}".format(
+            datapoints, max_batch_datapoints_per_hour
+        )
+        check_budget("Batch", [violation], budget)
+
+    return rendered, errors
+
+
+def sync_manifest(
+    specs: list,
+    client,
+    jobs: int = 1,
+    dry_run=False,
+    max_batch_datapoints_per_hour=0,
+    budget="fail",
+) -> tuple:
+    """Render every dashboard spec and push the changed ones to Grafana, returns
+    the results and errors by spec id"""
+
+    from lib.sync import sync_dashboards
+
+    rendered, errors = render_manifest(
+        specs,
+        jobs=jobs,
+        max_batch_datapoints_per_hour=max_batch_datapoints_per_hour,
+        budget=budget,
+    )
+    dashboards = [
+        (
+            spec["id"],
+            spec.get("folder_uid"),
+            base64.b64decode(rendered[spec["id"]]["base64EncodedJson"]),
+        )
+        for spec in specs
+        if spec["id"] in rendered
+    ]
+    results, sync_errors = sync_dashboards(client, dashboards, dry_run=dry_run)
+    errors.update(sync_errors)
+    return results, errors
 
 
 def get_base64_encoded_dashboard(dashboard: str) -> str:
@@ -186,23 +832,466 @@ def get_base64_encoded_dashboard(dashboard: str) -> str:
     return base64.b64encode(dashboard.encode("utf-8"))
 
 
-def print_base64_encoded_json(base64_encoded_json: str) -> None:
+def print_base64_encoded_json(base64_encoded_json: str, out=None) -> None:
     """Print Base64 encoded JSON"""
 
-    print(json.dumps({"base64EncodedJson": str(base64_encoded_json, "utf-8")}))
+    print(
+        json.dumps({"base64EncodedJson": str(base64_encoded_json, "utf-8")}),
+        file=out,
+    )
+
+
+def get_generator_version() -> str:
+    """Digest of the generator sources, bin.py and lib are not versioned"""
+
+    digest = hashlib.sha256()
+    for path in [os.path.join(ROOT_DIR, "bin.py")] + sorted(
+        glob.glob(os.path.join(ROOT_DIR, "lib", "*.py"))
+    ):
+        with open(path, "rb") as source:
+            digest.update(source.read())
+
+    return digest.hexdigest()
+
+
+def get_grafanalib_version() -> str:
+    """Installed grafanalib distribution, found without importlib.metadata which
+    imports email, zipfile and csv"""
+
+    spec = importlib.util.find_spec("grafanalib")
+    site_packages = os.path.dirname(os.path.dirname(spec.origin))
+    distributions = glob.glob(os.path.join(site_packages, "grafanalib-*.*-info"))
+    return " ".join(sorted(map(os.path.basename, distributions))) or spec.origin
+
+
+def get_cache_key(args) -> str:
+    """Hash of the normalized options and the generator and grafanalib versions"""
+
+    options = {
+        key: value for key, value in vars(args).items() if key not in CACHE_OPTIONS
+    }
+    key = {
+        "options": options,
+        "generator": get_generator_version(),
+        "grafanalib": get_grafanalib_version(),
+    }
+
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def read_cache(cache_dir: str, key: str, out, err=None) -> bool:
+    """Copy the cached output to out and its warnings to err, False on a miss"""
+
+    path = os.path.join(cache_dir, key)
+    try:
+        with open(path) as entry:
+            shutil.copyfileobj(entry, out)
+    except FileNotFoundError:
+        return False
+
+    with contextlib.suppress(FileNotFoundError):
+        with open(path + CACHE_STDERR_SUFFIX) as warnings:
+            shutil.copyfileobj(warnings, err or sys.stderr)
+
+    # Mark the entry as recently used
+    os.utime(path)
+    return True
+
+
+@contextlib.contextmanager
+def write_cache(cache_dir: str, key: str, max_bytes: int):
+    """Store what is written to the entry and what is written to stderr
+    meanwhile, then evict beyond max_bytes"""
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key)
+    entry = tempfile.NamedTemporaryFile("w", dir=cache_dir, prefix=".", delete=False)
+    warnings = io.StringIO()
+    try:
+        with entry, contextlib.redirect_stderr(TeeWriter(sys.stderr, warnings)):
+            yield entry
+    except BaseException:
+        os.unlink(entry.name)
+        raise
+
+    if warnings.getvalue():
+        with open(path + CACHE_STDERR_SUFFIX, "w") as stderr:
+            stderr.write(warnings.getvalue())
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path + CACHE_STDERR_SUFFIX)
+    os.replace(entry.name, path)
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir: str, max_bytes: int) -> None:
+    """Remove the least recently used entries until the cache fits in max_bytes"""
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.startswith(".") or entry.name.endswith(CACHE_STDERR_SUFFIX):
+            continue
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, path in sorted(entries):
+        if size <= max_bytes:
+            break
+        for entry_path in [path, path + CACHE_STDERR_SUFFIX]:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(entry_path)
+        size -= entry_size
+
+
+class Base64Writer:
+    """Base64 encode the data written to it into out, chunk by chunk"""
+
+    # Multiple of 3 bytes, so that encoded chunks concatenate without padding
+    CHUNK_SIZE = 3 * 16384
+
+    def __init__(self, out):
+        self.out = out
+        self.pending = bytearray()
+
+    def write(self, data) -> None:
+        self.pending += data.encode("utf-8") if isinstance(data, str) else data
+        if len(self.pending) >= self.CHUNK_SIZE:
+            size = len(self.pending) - len(self.pending) % 3
+            self.out.write(str(base64.b64encode(self.pending[:size]), "utf-8"))
+            del self.pending[:size]
+
+    def close(self) -> None:
+        self.out.write(str(base64.b64encode(self.pending), "utf-8"))
+        self.pending = bytearray()
+
+
+class GzipWriter:
+    """Gzip the text written to it into out, chunk by chunk"""
+
+    def __init__(self, out):
+        self.out = out
+        # gzip container without timestamp, so that output is reproducible
+        self.compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def write(self, text: str) -> None:
+        self.out.write(self.compressor.compress(text.encode("utf-8")))
+
+    def close(self) -> None:
+        self.out.write(self.compressor.flush())
+        self.out.close()
+
+
+class PhaseTimer:
+    """Wall time spent in each phase of a render"""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0) + elapsed
+
+    def report(self) -> str:
+        lines = ["Phase timings"]
+        for name, elapsed in self.phases.items():
+            lines.append("{:>12} {:>10.2f} ms".format(name, elapsed * 1000))
+        lines.append(
+            "{:>12} {:>10.2f} ms".format("total", sum(self.phases.values()) * 1000)
+        )
+        return "\n".join(lines) + "\n"
+
+
+class TeeWriter:
+    """Write the text to every out"""
+
+    def __init__(self, *outs):
+        self.outs = outs
+
+    def write(self, text: str) -> None:
+        for out in self.outs:
+            out.write(text)
+
+
+def stream_encoded_json(
+    dashboard,
+    out,
+    compact=False,
+    gzip=False,
+    prune_defaults=False,
+    report=False,
+    budget=None,
+    timer=None,
+    content_hash=False,
+) -> None:
+    """Print the encoded JSON of the dashboard without building it in memory"""
+
+    from lib import CanonicalEncoder, get_content_hash, normalize_floats
+
+    timer = timer or PhaseTimer()
+    with timer.phase("ids"):
+        dashboard = dashboard.auto_panel_ids()
+
+    with timer.phase("json"):
+        data = normalize_floats(dashboard.to_json_data())
+        if report or budget:
+            from lib.report import get_dashboard_report
+
+            dashboard_report = get_dashboard_report(data)
+            if budget:
+                check_dashboard_budget(dashboard_report, budget)
+
+        # The encoder prunes and compacts the panels one by one
+        options = {"compact": compact, "prune_defaults": prune_defaults}
+        if compact:
+            options["separators"] = (",", ":")
+        encoder = CanonicalEncoder(**options)
+        data_hash = None
+        if content_hash:
+            data_hash = get_content_hash(
+                data, compact=compact, prune_defaults=prune_defaults
+            )
+        chunks = encoder.iterencode(data)
+
+    out.write('{{"{}": "'.format("base64gzip" if gzip else "base64EncodedJson"))
+    writer = Base64Writer(out)
+    if gzip:
+        writer = GzipWriter(writer)
+    while True:
+        with timer.phase("json"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        with timer.phase("base64"):
+            writer.write(chunk)
+    with timer.phase("base64"):
+        writer.close()
+    out.write('"')
+    if data_hash:
+        out.write(', "contentHash": "{}"'.format(data_hash))
+    if report:
+        # Terraform only accepts strings as values of the external data source
+        out.write(', "report": {}'.format(json.dumps(json.dumps(dashboard_report))))
+    out.write("}\n")
+
+
+def stream_dashboard(args, out, timer=None) -> None:
+    """Render the dashboard described by the options into out"""
+
+    timer = timer or PhaseTimer()
+    with timer.phase("import"):
+        load_dispatcher(DISPATCHERS[args.service])
+
+    with timer.phase("build"):
+        dashboard = build_dashboard(args)
+
+    stream_encoded_json(
+        dashboard,
+        out,
+        compact=args.compact,
+        gzip=args.gzip,
+        prune_defaults=args.prune_defaults,
+        report=args.report,
+        budget=args,
+        timer=timer,
+        content_hash=args.content_hash,
+    )
+
+
+def profile_dashboard(args, out, timer: PhaseTimer) -> None:
+    """Render the dashboard under cProfile, then write the phase timings and
+    the profile to args.profile, keeping out for the JSON"""
+
+    import cProfile
+    import pstats
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        stream_dashboard(args, out, timer)
+    finally:
+        profile.disable()
+
+    with contextlib.ExitStack() as stack:
+        report = sys.stderr
+        if args.profile != "-":
+            report = stack.enter_context(open(args.profile, "w"))
+
+        report.write(timer.report() + "\n")
+        stats = pstats.Stats(profile, stream=report)
+        stats.sort_stats("cumulative").print_stats(PROFILE_FUNCTIONS)
+
+
+def run(argv, out=None) -> None:
+    """Render the dashboard for the cli arguments"""
+
+    out = out or sys.stdout
+    timer = PhaseTimer()
+    with timer.phase("arguments"):
+        args = parse_options(argv)
+        args = apply_options(args)
+
+    if args.profile:
+        return profile_dashboard(args, out, timer)
+
+    if args.no_cache:
+        return stream_dashboard(args, out)
+
+    key = get_cache_key(args)
+    if read_cache(args.cache_dir, key, out):
+        return
+
+    with write_cache(args.cache_dir, key, args.cache_max_bytes) as entry:
+        stream_dashboard(args, TeeWriter(out, entry))
+
+
+def run_captured(argv) -> dict:
+    """Render the dashboard for the cli arguments, returns its stdout, stderr
+    and exit status like bin.py would have printed and exited with"""
+
+    out, err = io.StringIO(), io.StringIO()
+    status = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            run(argv, out)
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+                status = 1
+            else:
+                status = e.code or 0
+        except Exception as e:
+            print("{}: {}".format(type(e).__name__, e), file=sys.stderr)
+            status = 1
+
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "status": status}
+
+
+def get_batch_specs(specs: list, args) -> list:
+    """Apply the batch options to the specs, specs keep their own budgets"""
+
+    budgets = {option: getattr(args, option) for option in BUDGET_OPTIONS}
+    return [
+        dict(
+            budgets,
+            **spec,
+            precompiled_panels=args.precompiled_panels,
+            memo_size=args.memo_size,
+        )
+        for spec in specs
+    ]
+
+
+def print_memo_stats():  # pragma: no cover
+    """Log the panel memo hits and misses of the batch"""
+
+    from lib.templates import MEMO_STATS
+
+    if MEMO_STATS["hits"] or MEMO_STATS["misses"]:
+        print(
+            "Panel memo: {hits} hits, {misses} misses".format(**MEMO_STATS),
+            file=sys.stderr,
+        )
+
+
+def batch(argv):  # pragma: no cover
+    """
+    batch
+    """
+    args = parse_batch_options(argv)
+    specs = load_manifest(args.manifest)
+    specs = get_batch_specs(specs, args)
+    rendered, errors = render_manifest(
+        specs,
+        jobs=args.jobs,
+        max_batch_datapoints_per_hour=args.max_batch_datapoints_per_hour,
+        budget=args.budget,
+    )
+    print(json.dumps(rendered))
+    print_memo_stats()
+
+    for spec_id, error in errors.items():
+        print("Dashboard spec {} failed: {}".format(spec_id, error), file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+def sync(argv):  # pragma: no cover
+    """
+    sync
+    """
+    from lib.sync import GrafanaClient, get_report
+
+    args = parse_sync_options(argv)
+    specs = load_manifest(args.manifest)
+    specs = get_batch_specs(specs, args)
+    client = GrafanaClient(
+        args.url,
+        auth=os.environ.get(GRAFANA_AUTH_ENV),
+        concurrency=args.concurrency,
+        retries=args.retries,
+        backoff=args.backoff,
+        timeout=args.timeout,
+    )
+    try:
+        results, errors = sync_manifest(
+            specs,
+            client,
+            jobs=args.jobs,
+            dry_run=args.dry_run,
+            max_batch_datapoints_per_hour=args.max_batch_datapoints_per_hour,
+            budget=args.budget,
+        )
+    finally:
+        client.close()
+    print(json.dumps(get_report(results)))
+    print_memo_stats()
+
+    for spec_id, error in errors.items():
+        print("Dashboard spec {} failed: {}".format(spec_id, error), file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+def serve(argv):  # pragma: no cover
+    """
+    serve
+    """
+    from server import GeneratorServer
+
+    args = parse_serve_options(argv)
+
+    with GeneratorServer(
+        args.socket_path, run_captured, get_generator_version
+    ) as server:
+        for path in DISPATCHERS.values():
+            load_dispatcher(path)
+
+        server.timeout = args.idle_timeout
+        while not server.idle:
+            server.handle_request()
 
 
 def main():  # pragma: no cover
     """
     main
     """
-    args = parse_options()
-    args = apply_options(args)
-    dispatch = dispatcher()
-    dashboard = dispatch[args.service](**args.__dict__)
-    dashboard_json = json.dumps(dashboard.to_json_data(), cls=DashboardEncoder)
-    base64_encoded_json = get_base64_encoded_dashboard(dashboard_json)
-    print_base64_encoded_json(base64_encoded_json)
+    if sys.argv[1:2] == ["batch"]:
+        return batch(sys.argv[2:])
+
+    if sys.argv[1:2] == ["sync"]:
+        return sync(sys.argv[2:])
+
+    if sys.argv[1:2] == ["serve"]:
+        return serve(sys.argv[2:])
+
+    run(sys.argv[1:])
 
 
 if __name__ == "__main__":  # pragma: no cover
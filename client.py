@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Thin client for the dashboard generator daemon (bin.py serve).
+
+Takes the same arguments as bin.py. Only the standard library is imported, the
+dashboard is rendered by the daemon listening on the local Unix socket. When no
+daemon is running the dashboard is rendered in-process by bin.py.
+"""
+
+import json
+import os
+import socket
+import sys
+
+SOCKET_ENV = "GRAFANA_DASHBOARDS_SOCKET"
+TIMEOUT_SECONDS = 60
+
+
+def get_socket_path() -> str:
+    """Get the path of the generator daemon socket, in the runtime directory of
+    the user or else in a directory of the user under TMPDIR, other users can
+    not create or replace it"""
+
+    socket_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.environ.get("TMPDIR", "/tmp"),
+        "grafana-dashboards-{}".format(os.getuid()),
+    )
+    default = os.path.join(socket_dir, "grafana-dashboards.sock")
+    return os.environ.get(SOCKET_ENV, default)
+
+
+def make_socket_dir(socket_path: str):
+    """Create the directory of the socket only accessible to the current user,
+    refuses a directory of another user"""
+
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if os.lstat(socket_dir).st_uid != os.getuid():
+        raise Exception(
+            "Socket directory {} belongs to another user".format(socket_dir)
+        )
+
+
+def is_own_socket(socket_path: str) -> bool:
+    """Whether the socket was created by the current user, the dashboards of a
+    daemon of another user can not be trusted"""
+
+    try:
+        return os.stat(socket_path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def request(argv, socket_path: str):
+    """Ask the daemon to render, returns its stdout, stderr and exit status or
+    None when the daemon can not render"""
+
+    if not is_own_socket(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(TIMEOUT_SECONDS)
+            connection.connect(socket_path)
+            connection.sendall(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+            response = connection.makefile("rb").readline()
+    except OSError:
+        return None
+
+    if not response:
+        return None
+
+    response = json.loads(response)
+    if "error" in response:
+        return None
+
+    return response
+
+
+def main():  # pragma: no cover
+    """
+    main
+    """
+    response = request(sys.argv[1:], get_socket_path())
+
+    if response is None:
+        import bin
+
+        return bin.main()
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    sys.exit(response["status"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,5 +1,10 @@
+import hashlib
 import json
 
+# Content hashes are short enough to be stored as a Grafana tag, at most 50
+# characters
+CONTENT_HASH_LENGTH = 32
+
 
 class DashboardEncoder(json.JSONEncoder):
     """Encode dashboard objects."""
@@ -9,3 +14,145 @@ class DashboardEncoder(json.JSONEncoder):
         if to_json_data:
             return to_json_data()
         return json.JSONEncoder.default(self, obj)
+
+
+class CanonicalEncoder(DashboardEncoder):
+    """Encode dashboard objects with sorted keys and normalized floats,
+    optionally without the fields equal to Grafana's defaults and without null
+    and empty fields."""
+
+    def __init__(self, compact=False, prune_defaults=False, **kwargs):
+        kwargs["sort_keys"] = True
+        super().__init__(**kwargs)
+        self.compact = compact
+        self.prune_defaults = prune_defaults
+
+    def default(self, obj):
+        return normalize_floats(super().default(obj))
+
+    def resolve(self, data: dict) -> dict:
+        """Prune and compact part of the top level object, as plain dicts and
+        lists"""
+
+        if self.prune_defaults:
+            from lib.defaults import prune_dashboard_defaults
+
+            data = prune_dashboard_defaults(data)
+        if self.compact:
+            data = compact_json_data(data)
+        return normalize_floats(data)
+
+    def iterencode(self, o, _one_shot=False):
+        """Encode the items of the top level object and its lists one by one,
+        each with the C encoder. Only the item being encoded is pruned and
+        compacted."""
+
+        if _one_shot or not isinstance(o, dict):
+            yield from super().iterencode(o, _one_shot)
+            return
+
+        resolve = self.compact or self.prune_defaults
+        separator = ""
+        yield "{"
+        for key, value in sorted(o.items()):
+            # Pruning and compacting keep the items of lists, a list of one
+            # item is never a default
+            if isinstance(value, list) and value:
+                yield separator + self.encode(key) + self.key_separator + "["
+                for j, item in enumerate(value):
+                    if j:
+                        yield self.item_separator
+                    if resolve:
+                        item = self.resolve({key: [item]})[key][0]
+                    yield self.encode(item)
+                yield "]"
+            else:
+                if resolve:
+                    data = self.resolve({key: value})
+                    if key not in data:
+                        continue
+                    value = data[key]
+                yield separator + self.encode(key) + self.key_separator
+                yield self.encode(value)
+            separator = self.item_separator
+        yield "}"
+
+
+def normalize_float(value: float):
+    """Shortest stable form of the float, integral floats become ints"""
+
+    if value.is_integer():
+        return int(value)
+    return float("{:.15g}".format(value))
+
+
+def normalize_floats(obj):
+    """Normalize the floats of the JSON data, dashboard objects are left to
+    CanonicalEncoder"""
+
+    if isinstance(obj, float):
+        return normalize_float(obj)
+
+    if isinstance(obj, dict):
+        return {key: normalize_floats(value) for key, value in obj.items()}
+
+    if isinstance(obj, (list, tuple)):
+        return [normalize_floats(value) for value in obj]
+
+    return obj
+
+
+def get_canonical_json_data(dashboard):
+    """JSON data of the dashboard with pinned panel ids, for CanonicalEncoder"""
+
+    return normalize_floats(dashboard.auto_panel_ids().to_json_data())
+
+
+def get_content_hash(data, compact=False, prune_defaults=False) -> str:
+    """Hash of the canonical JSON of the dashboard data, the same for the same
+    dashboard whatever the whitespace and key order it was rendered with"""
+
+    digest = hashlib.sha256()
+    encoder = CanonicalEncoder(
+        compact=compact, prune_defaults=prune_defaults, separators=(",", ":")
+    )
+    for chunk in encoder.iterencode(data):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()[:CONTENT_HASH_LENGTH]
+
+
+def get_json_data(obj):
+    """JSON data of the dashboard object as plain dicts and lists"""
+
+    to_json_data = getattr(obj, "to_json_data", None)
+    if to_json_data:
+        return get_json_data(to_json_data())
+
+    if isinstance(obj, dict):
+        return {key: get_json_data(value) for key, value in obj.items()}
+
+    if isinstance(obj, (list, tuple)):
+        return [get_json_data(value) for value in obj]
+
+    return obj
+
+
+def compact_json_data(obj):
+    """JSON data of the dashboard object without null and empty fields"""
+
+    to_json_data = getattr(obj, "to_json_data", None)
+    if to_json_data:
+        return compact_json_data(to_json_data())
+
+    if isinstance(obj, dict):
+        compacted = {key: compact_json_data(value) for key, value in obj.items()}
+        return {
+            key: value
+            for key, value in compacted.items()
+            if value is not None and value != "" and value != [] and value != {}
+        }
+
+    if isinstance(obj, (list, tuple)):
+        return [compact_json_data(value) for value in obj]
+
+    return obj
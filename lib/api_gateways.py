@@ -1,6 +1,5 @@
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     OP_AND,
     RTYPE_MAX,
@@ -10,8 +9,8 @@ from grafanalib.core import (
     Dashboard,
     Graph,
     GreaterThan,
-    Row,
     Target,
+    Templating,
     TimeRange,
     YAxes,
     YAxis,
@@ -28,12 +27,18 @@ from lib.commons import (
     TRANSPARENT,
 )
 from lib.lambdas import (
+    create_lambdas_aggregated_sections,
+    create_lambdas_repeated_sections,
+    get_lambda_template,
     lambda_generate_duration_graph,
     lambda_generate_invocations_graph,
     lambda_generate_logs_panel,
     lambda_generate_memory_utilization_graph,
     lambda_generate_memory_utilization_percentage_graph,
 )
+from lib.layout import Section, layout_panels
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 # https://docs.aws.amazon.com/apigateway/latest/developerguide/api-gateway-metrics-and-dimensions.html
 API_GATEWAY_INVOCATION_METRIC_GROUP_BY = "1m"
@@ -46,11 +51,12 @@ API_GATEWAY_REQUESTS_ALIAS = "requests"
 API_GATEWAY_REQUESTS_REF_ID = "C"
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_api_gateway_requests_graph(
     name: str, cloudwatch_data_source: str, notifications: List[str], *args, **kwargs
 ):
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=API_GATEWAY_5XX_ALIAS,
             namespace=NAMESPACE,
             statistics=["Sum"],
@@ -58,7 +64,7 @@ def generate_api_gateway_requests_graph(
             dimensions={"ApiName": name},
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=API_GATEWAY_REQUESTS_ALIAS,
             namespace=NAMESPACE,
             statistics=["Sum"],
@@ -66,7 +72,7 @@ def generate_api_gateway_requests_graph(
             dimensions={"ApiName": name},
             refId=API_GATEWAY_REQUESTS_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=API_GATEWAY_4XX_ALIAS,
             namespace=NAMESPACE,
             statistics=["Sum"],
@@ -139,9 +145,14 @@ def generate_api_gateways_dashboard(
     notifications: List[str],
     environment: str,
     lambdas: List[str],
+    aggregate_lambdas: bool = False,
+    repeat_lambdas: bool = False,
     *args,
     **kwargs,
 ):
+    if aggregate_lambdas and repeat_lambdas:
+        raise Exception("Lambdas can not be both aggregated and repeated")
+
     tags = ["api-gateway", environment]
 
     if lambdas:
@@ -151,43 +162,51 @@ def generate_api_gateways_dashboard(
         name, cloudwatch_data_source, notifications
     )
 
-    rows = [
-        Row(title="API Gateway Metrics", showTitle=True, panels=[api_gateway_graph])
+    templating = Templating()
+    sections = [
+        Section(title="API Gateway Metrics", panels=[api_gateway_graph], summary=True)
     ]
 
     if lambdas:
-        for lambda_fn in lambdas:
-            lambda_metrics_row = Row(
-                title="{} Lambda Metrics".format(lambda_fn),
-                showTitle=True,
-                collapse=False,
-                panels=[
-                    lambda_generate_invocations_graph(
-                        name, cloudwatch_data_source, notifications=[]
-                    ),
-                    lambda_generate_duration_graph(name, cloudwatch_data_source),
-                    lambda_generate_memory_utilization_percentage_graph(
-                        name,
-                        cloudwatch_data_source,
-                        lambda_insights_namespace,
-                        notifications=notifications,
-                    ),
-                    lambda_generate_memory_utilization_graph(
-                        name, cloudwatch_data_source, lambda_insights_namespace
-                    ),
-                ],
+        if aggregate_lambdas:
+            sections += create_lambdas_aggregated_sections(
+                lambdas, cloudwatch_data_source, lambda_insights_namespace
             )
-            lambda_logs_row = Row(
-                title="{} Lambda Logs".format(lambda_fn),
-                showTitle=True,
-                collapse=True,
-                panels=[
-                    lambda_generate_logs_panel(name, cloudwatch_data_source),
-                ],
+        elif repeat_lambdas:
+            sections += create_lambdas_repeated_sections(
+                cloudwatch_data_source, lambda_insights_namespace
             )
+            templating = Templating(list=[get_lambda_template(lambdas)])
+        else:
+            for lambda_fn in lambdas:
+                lambda_metrics_section = Section(
+                    title="{} Lambda Metrics".format(lambda_fn),
+                    panels=[
+                        lambda_generate_invocations_graph(
+                            name, cloudwatch_data_source, notifications=[]
+                        ),
+                        lambda_generate_duration_graph(name, cloudwatch_data_source),
+                        lambda_generate_memory_utilization_percentage_graph(
+                            name,
+                            cloudwatch_data_source,
+                            lambda_insights_namespace,
+                            notifications=notifications,
+                        ),
+                        lambda_generate_memory_utilization_graph(
+                            name, cloudwatch_data_source, lambda_insights_namespace
+                        ),
+                    ],
+                )
+                lambda_logs_section = Section(
+                    title="{} Lambda Logs".format(lambda_fn),
+                    collapsed=True,
+                    panels=[
+                        lambda_generate_logs_panel(name, cloudwatch_data_source),
+                    ],
+                )
 
-            rows.append(lambda_metrics_row)
-            rows.append(lambda_logs_row)
+                sections.append(lambda_metrics_section)
+                sections.append(lambda_logs_section)
 
     return Dashboard(
         title="{} {}".format("API Gateway:", name),
@@ -196,5 +215,6 @@ def generate_api_gateways_dashboard(
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
         refresh=DEFAULT_REFRESH,
-        rows=rows,
+        panels=layout_panels(sections),
+        templating=templating,
     ).auto_panel_ids()
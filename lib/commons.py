@@ -1,3 +1,6 @@
+import attr
+from grafanalib.core import Time
+
 ALERT_THRESHOLD = False
 ALERT_REF_ID = "A"
 TIMEZONE = ""
@@ -7,6 +10,22 @@ TRANSPARENT = True
 RAW_QUERY = True
 RETENTION_POLICY = "autogen"
 DEFAULT_REFRESH = "1m"
+# Refresh, relative time range and time picker refresh intervals of the
+# dashboards by profile, a refresh of False turns auto refresh off
+TIME_PROFILES = {
+    "ops-live": {
+        "refresh": "30s",
+        "time_range": "1h",
+        "refresh_intervals": ["30s", "1m", "5m", "15m"],
+    },
+    "review": {
+        "refresh": False,
+        "time_range": "7d",
+        "refresh_intervals": ["5m", "15m", "1h", "1d"],
+    },
+}
+# Longest expression of a GetMetricData query
+MAX_EXPRESSION_LENGTH = 1024
 
 
 def get_documentation_link(url: str):
@@ -24,3 +43,79 @@ def get_series_overrides(min_alias: str, mean_alias: str, max_alias: str):
             "lines": False,
         },
     ]
+
+
+def get_search_expressions(
+    namespace: str, dimension: str, metric_name: str, statistic: str, values: list
+) -> list:
+    """
+    CloudWatch SEARCH expressions of the metric of every value of the
+    dimension, one series per value. Values are split over as few expressions
+    as fit in MAX_EXPRESSION_LENGTH.
+    """
+
+    prefix = 'SEARCH(\'{{{},{}}} MetricName="{}" ('.format(
+        namespace, dimension, metric_name
+    )
+    suffix = ")', '{}')".format(statistic)
+    expressions, terms = [], []
+    for value in values:
+        term = '{}="{}"'.format(dimension, value)
+        if terms and len(prefix + " OR ".join(terms + [term]) + suffix) > (
+            MAX_EXPRESSION_LENGTH
+        ):
+            expressions.append(prefix + " OR ".join(terms) + suffix)
+            terms = []
+        terms.append(term)
+
+    if terms:
+        expressions.append(prefix + " OR ".join(terms) + suffix)
+    return expressions
+
+
+def apply_time_profile(
+    dashboard, time_profile=None, refresh=None, time_range=None, refresh_intervals=None
+):
+    """
+    Set the refresh, time range and refresh intervals of the dashboard from
+    the time profile, the other arguments override it. A refresh of off turns
+    auto refresh off, a time range of 7d shows the last 7 days.
+    """
+
+    if time_profile and time_profile not in TIME_PROFILES:
+        raise Exception(
+            "Unknown time profile {}, one of {}".format(
+                time_profile, ", ".join(sorted(TIME_PROFILES))
+            )
+        )
+
+    options = dict(TIME_PROFILES.get(time_profile, {}))
+    if refresh is not None:
+        options["refresh"] = False if refresh == "off" else refresh
+    if time_range:
+        options["time_range"] = time_range
+    if refresh_intervals:
+        options["refresh_intervals"] = list(refresh_intervals)
+
+    changes = {}
+    if "refresh" in options:
+        changes["refresh"] = options["refresh"]
+    if "time_range" in options:
+        changes["time"] = Time("now-{}".format(options["time_range"]), "now")
+    if "refresh_intervals" in options:
+        changes["timePicker"] = attr.evolve(
+            dashboard.timePicker, refreshIntervals=options["refresh_intervals"]
+        )
+
+    # Grafana falls back to another interval for a refresh it does not offer
+    intervals = changes.get("timePicker", dashboard.timePicker).refreshIntervals
+    new_refresh = changes.get("refresh", dashboard.refresh)
+    changed = "refresh" in changes or "timePicker" in changes
+    if changed and isinstance(new_refresh, str) and new_refresh not in intervals:
+        raise Exception(
+            "Refresh {} is not one of the refresh intervals {}".format(
+                new_refresh, ", ".join(intervals)
+            )
+        )
+
+    return attr.evolve(dashboard, **changes)
@@ -0,0 +1,222 @@
+"""
+Grafana defaults of dashboards and panels
+
+Grafana fills missing keys with these defaults when loading a dashboard
+(https://github.com/grafana/grafana/blob/v8.3.0/public/app/features/dashboard/state/PanelModel.ts,
+https://github.com/grafana/grafana/blob/v8.3.0/public/app/plugins/panel/graph/module.ts),
+so keys equal to them can be left out of the generated JSON.
+"""
+
+import copy
+
+from lib import get_json_data
+
+# Grafana treats null and missing keys alike, None stands for "not set"
+DASHBOARD_DEFAULTS = {
+    "annotations": {"list": []},
+    "gnetId": None,
+    "id": None,
+    "links": [],
+    "panels": [],
+    "style": "dark",
+    "tags": [],
+    "templating": {"list": []},
+    "timezone": "",
+    "uid": None,
+    "version": 0,
+}
+
+PANEL_DEFAULTS = {
+    "*": {
+        "cacheTimeout": None,
+        "datasource": None,
+        "description": None,
+        "gridPos": None,
+        "height": None,
+        "interval": None,
+        "maxPerRow": None,
+        "minSpan": None,
+        "repeat": None,
+        "repeatDirection": None,
+        "span": None,
+        "timeFrom": None,
+        "timeShift": None,
+        "title": "",
+        "transparent": False,
+    },
+    "graph": {
+        "aliasColors": {},
+        "bars": False,
+        "dashLength": 10,
+        "dashes": False,
+        "fill": 1,
+        "fillGradient": 0,
+        "legend": {
+            "avg": False,
+            "current": False,
+            "max": False,
+            "min": False,
+            "show": True,
+            "total": False,
+            "values": False,
+        },
+        "lines": True,
+        "linewidth": 1,
+        "nullPointMode": "null",
+        "options": {"dataLinks": []},
+        "percentage": False,
+        "pointradius": 2,
+        "points": False,
+        "renderer": "flot",
+        "seriesOverrides": [],
+        "spaceLength": 10,
+        "stack": False,
+        "steppedLine": False,
+        "thresholds": [],
+        "tooltip": {"shared": True, "sort": 0, "value_type": "individual"},
+        "xaxis": {"mode": "time", "name": None, "show": True, "values": []},
+        "yaxis": {"align": False, "alignLevel": None},
+    },
+    "logs": {
+        "options": {
+            "dedupStrategy": "none",
+            "enableLogDetails": True,
+            "prettifyLogMessage": False,
+            "showCommonLabels": False,
+            "showLabels": False,
+            "showTime": False,
+            "sortOrder": "Descending",
+            "wrapLogMessage": False,
+        },
+    },
+    "stat": {
+        "options": {
+            "colorMode": "value",
+            "graphMode": "area",
+            "justifyMode": "auto",
+            "orientation": "auto",
+            "reduceOptions": {"calcs": ["lastNotNull"], "fields": "", "values": False},
+            "textMode": "auto",
+        },
+    },
+    "text": {
+        "options": {"mode": "markdown"},
+    },
+    "timeseries": {
+        "fieldConfig": {
+            "defaults": {
+                "color": {"mode": "palette-classic"},
+                "custom": {
+                    "axisLabel": "",
+                    "axisPlacement": "auto",
+                    "barAlignment": 0,
+                    "drawStyle": "line",
+                    "fillOpacity": 0,
+                    "gradientMode": "none",
+                    "hideFrom": {"legend": False, "tooltip": False, "viz": False},
+                    "lineInterpolation": "linear",
+                    "lineWidth": 1,
+                    "pointSize": 5,
+                    "showPoints": "auto",
+                    "spanNulls": False,
+                    "thresholdsStyle": {"mode": "off"},
+                },
+            },
+        },
+        "options": {
+            "legend": {"calcs": [], "displayMode": "list", "placement": "bottom"},
+            "tooltip": {"mode": "single"},
+        },
+    },
+}
+
+
+def get_panel_defaults(panel: dict) -> dict:
+    """Get the defaults of the panel type"""
+
+    defaults = dict(PANEL_DEFAULTS["*"])
+    defaults.update(PANEL_DEFAULTS.get(panel.get("type"), {}))
+    return defaults
+
+
+def is_default(value, default) -> bool:
+    """Whether the JSON value equals the default with the same types, unlike ==
+    True is not 1"""
+
+    if type(value) is not type(default):
+        return False
+    if isinstance(value, dict):
+        return value.keys() == default.keys() and all(
+            is_default(value[key], default[key]) for key in value
+        )
+    if isinstance(value, list):
+        return len(value) == len(default) and all(map(is_default, value, default))
+    return value == default
+
+
+def prune(data: dict, defaults: dict) -> dict:
+    """Remove the keys equal to their default, nested objects are pruned key by key"""
+
+    pruned = {}
+    for key, value in data.items():
+        default = defaults.get(key, KeyError)
+        if isinstance(default, dict) and default and isinstance(value, dict):
+            value = prune(value, default)
+            if not value:
+                continue
+        elif is_default(value, default):
+            continue
+        pruned[key] = value
+
+    return pruned
+
+
+def apply(data: dict, defaults: dict) -> dict:
+    """Fill the missing keys with their default, like Grafana's defaultsDeep"""
+
+    applied = dict(data)
+    for key, default in defaults.items():
+        if key not in applied:
+            applied[key] = copy.deepcopy(default)
+        elif isinstance(default, dict) and isinstance(applied[key], dict):
+            applied[key] = apply(applied[key], default)
+
+    return applied
+
+
+def map_panels(dashboard: dict, f) -> dict:
+    """Apply f to every panel of the dashboard, including panels of rows"""
+
+    def map_panel(panel):
+        panel = f(panel)
+        if panel.get("panels"):
+            panel = dict(panel, panels=[map_panel(p) for p in panel["panels"]])
+        return panel
+
+    dashboard = dict(dashboard)
+    if dashboard.get("panels"):
+        dashboard["panels"] = [map_panel(panel) for panel in dashboard["panels"]]
+    if dashboard.get("rows"):
+        dashboard["rows"] = [
+            dict(row, panels=[map_panel(panel) for panel in row.get("panels", [])])
+            for row in dashboard["rows"]
+        ]
+
+    return dashboard
+
+
+def prune_dashboard_defaults(dashboard) -> dict:
+    """Remove the keys of the dashboard and its panels equal to Grafana's defaults"""
+
+    dashboard = map_panels(
+        get_json_data(dashboard),
+        lambda panel: prune(panel, get_panel_defaults(panel)),
+    )
+    return prune(dashboard, DASHBOARD_DEFAULTS)
+
+
+def apply_dashboard_defaults(dashboard) -> dict:
+    """Fill the dashboard and its panels with Grafana's defaults, like Grafana does on load"""
+
+    dashboard = apply(get_json_data(dashboard), DASHBOARD_DEFAULTS)
+    return map_panels(dashboard, lambda panel: apply(panel, get_panel_defaults(panel)))
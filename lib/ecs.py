@@ -4,7 +4,6 @@
 
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     OP_AND,
     RTYPE_MAX,
@@ -13,9 +12,7 @@ from grafanalib.core import (
     Dashboard,
     Graph,
     GreaterThan,
-    GridPos,
     Logs,
-    RowPanel,
     Stat,
     Target,
     Text,
@@ -36,6 +33,9 @@ from lib.commons import (
     TIMEZONE,
     TRANSPARENT,
 )
+from lib.layout import GRID_WIDTH, Cell, Section, layout_panels
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 ECS_NAMESPACE = "AWS/ECS"
 CONTAINER_INSIGHTS_NAMESPACE = "ECS/ContainerInsights"
@@ -45,32 +45,32 @@ AVERAGE_ALIAS = "Avg"
 MAXIMUM_ALIAS = "Max"
 
 
+@panel_template("name", "cloudwatch_data_source", "cluster_name")
 def generate_running_count_stats_panel(
     name: str,
     cloudwatch_data_source: str,
     cluster_name: str,
-    grid_pos: GridPos,
 ) -> Stat:
     """
     Generate running count stats panel
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Desired",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
             metricName="DesiredTaskCount",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Pending",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
             metricName="PendingTaskCount",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Running",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
@@ -90,15 +90,14 @@ def generate_running_count_stats_panel(
         alignment="center",
         reduceCalc="lastNotNull",
         thresholds=[{"color": "blue"}],
-        gridPos=grid_pos,
     )
 
 
+@panel_template("name", "cloudwatch_data_source", "cluster_name")
 def generate_cpu_utilization_graph(
     name: str,
     cloudwatch_data_source: str,
     cluster_name: str,
-    grid_pos: GridPos,
 ) -> Graph:
     """
     Generate CPU graph
@@ -107,21 +106,21 @@ def generate_cpu_utilization_graph(
     y_axes = single_y_axis(format=PERCENT_FORMAT)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MINIMUM_ALIAS,
             namespace=ECS_NAMESPACE,
             statistics=["Minimum"],
             metricName="CPUUtilization",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=AVERAGE_ALIAS,
             namespace=ECS_NAMESPACE,
             statistics=["Average"],
             metricName="CPUUtilization",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MAXIMUM_ALIAS,
             namespace=ECS_NAMESPACE,
             statistics=["Maximum"],
@@ -149,15 +148,14 @@ def generate_cpu_utilization_graph(
         yAxes=y_axes,
         transparent=TRANSPARENT,
         editable=EDITABLE,
-        gridPos=grid_pos,
     )
 
 
+@panel_template("name", "cloudwatch_data_source", "cluster_name")
 def generate_mem_utilization_graph(
     name: str,
     cloudwatch_data_source: str,
     cluster_name: str,
-    grid_pos: GridPos,
 ) -> Graph:
     """
     Generate Mem graph
@@ -165,14 +163,14 @@ def generate_mem_utilization_graph(
 
     y_axes = single_y_axis(format=MEGA_BYTES)
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MINIMUM_ALIAS,
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Minimum"],
             metricName="MemoryUtilized",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=AVERAGE_ALIAS,
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Average"],
@@ -180,14 +178,14 @@ def generate_mem_utilization_graph(
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MAXIMUM_ALIAS,
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
             metricName="MemoryUtilized",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Memory reserved",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
@@ -216,17 +214,16 @@ def generate_mem_utilization_graph(
         seriesOverrides=seriesOverrides,
         transparent=TRANSPARENT,
         editable=EDITABLE,
-        gridPos=grid_pos,
         alertThreshold=ALERT_THRESHOLD,
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source", "cluster_name")
 def generate_mem_utilization_percentage_graph(
     name: str,
     cloudwatch_data_source: str,
     cluster_name: str,
     notifications: List[str],
-    grid_pos: GridPos,
 ) -> Graph:
     """
     Generate Mem Percentage graph
@@ -235,14 +232,14 @@ def generate_mem_utilization_percentage_graph(
     y_axes = single_y_axis(format=PERCENT_FORMAT)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MINIMUM_ALIAS,
             namespace=ECS_NAMESPACE,
             statistics=["Minimum"],
             metricName="MemoryUtilization",
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=AVERAGE_ALIAS,
             namespace=ECS_NAMESPACE,
             statistics=["Average"],
@@ -250,7 +247,7 @@ def generate_mem_utilization_percentage_graph(
             dimensions={"ServiceName": name, "ClusterName": cluster_name},
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MAXIMUM_ALIAS,
             namespace=ECS_NAMESPACE,
             statistics=["Maximum"],
@@ -298,16 +295,15 @@ def generate_mem_utilization_percentage_graph(
         transparent=TRANSPARENT,
         editable=EDITABLE,
         alert=alert,
-        gridPos=grid_pos,
         alertThreshold=ALERT_THRESHOLD,
     ).auto_ref_ids()
 
 
+@panel_template("cloudwatch_data_source", "loadbalancer", "target_group")
 def generate_req_count_graph(
     cloudwatch_data_source: str,
     loadbalancer: str,
     target_group: str,
-    grid_pos: GridPos,
 ) -> Graph:
     """
     Generate req graph
@@ -317,14 +313,14 @@ def generate_req_count_graph(
     request_count_per_target_alias = "RequestCount Per Container"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=request_count_alias,
             namespace="AWS/ApplicationELB",
             statistics=["Sum"],
             metricName="RequestCount",
             dimensions={"LoadBalancer": loadbalancer, "TargetGroup": target_group},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=request_count_per_target_alias,
             namespace="AWS/ApplicationELB",
             statistics=["Sum"],
@@ -345,16 +341,15 @@ def generate_req_count_graph(
         seriesOverrides=seriesOverrides,
         transparent=TRANSPARENT,
         editable=EDITABLE,
-        gridPos=grid_pos,
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source", "loadbalancer", "target_group")
 def generate_res_count_graph(
     name: str,
     cloudwatch_data_source: str,
     loadbalancer: str,
     target_group: str,
-    grid_pos: GridPos,
     notifications: List[str],
 ) -> Graph:
     """
@@ -367,28 +362,28 @@ def generate_res_count_graph(
     xx5_alias = "5xx"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx2_alias,
             namespace="AWS/ApplicationELB",
             statistics=["Sum"],
             metricName="HTTPCode_Target_2XX_Count",
             dimensions={"LoadBalancer": loadbalancer, "TargetGroup": target_group},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx3_alias,
             namespace="AWS/ApplicationELB",
             statistics=["Sum"],
             metricName="HTTPCode_Target_3XX_Count",
             dimensions={"LoadBalancer": loadbalancer, "TargetGroup": target_group},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx4_alias,
             namespace="AWS/ApplicationELB",
             statistics=["Sum"],
             metricName="HTTPCode_Target_4XX_Count",
             dimensions={"LoadBalancer": loadbalancer, "TargetGroup": target_group},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx5_alias,
             namespace="AWS/ApplicationELB",
             statistics=["Sum"],
@@ -431,23 +426,22 @@ def generate_res_count_graph(
         seriesOverrides=seriesOverrides,
         transparent=TRANSPARENT,
         editable=EDITABLE,
-        gridPos=grid_pos,
         alert=alert,
     )
 
 
+@panel_template("name", "cloudwatch_data_source", "cluster_name")
 def generate_deployment_graph(
     name: str,
     cloudwatch_data_source: str,
     cluster_name: str,
-    grid_pos: GridPos,
 ) -> TimeSeries:
     """
     Generate deployment graph
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Deployment",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
@@ -464,11 +458,11 @@ def generate_deployment_graph(
         editable=EDITABLE,
         axisPlacement="hidden",
         tooltipMode="none",
-        gridPos=grid_pos,
     )
 
 
-def generate_helpful_resources_panel(lucene_query: str, grid_pos: GridPos) -> Text:
+@panel_template("lucene_query")
+def generate_helpful_resources_panel(lucene_query: str) -> Text:
 
     content = """
 # Helpful resources
@@ -483,13 +477,11 @@ Elasticsearch query to find all error logs: `{}`
         transparent=TRANSPARENT,
         content=content,
         mode="markdown",
-        gridPos=grid_pos,
     )
 
 
-def generate_error_logs_panel(
-    elasticsearch_data_source: str, lucene_query, grid_pos: GridPos
-) -> Logs:
+@panel_template("elasticsearch_data_source", "lucene_query")
+def generate_error_logs_panel(elasticsearch_data_source: str, lucene_query) -> Logs:
     """
     Generate Logs panel
     """
@@ -508,21 +500,20 @@ def generate_error_logs_panel(
         prettifyLogMessage=False,
         enableLogDetails=True,
         dedupStrategy="exact",
-        gridPos=grid_pos,
         transparent=TRANSPARENT,
     )
 
 
+@panel_template("name", "cluster_name", "cloudwatch_data_source")
 def generate_running_count_graph(
     name: str,
     cluster_name: str,
     max: int,
     cloudwatch_data_source: str,
     notifications: List[str],
-    grid_pos: GridPos,
 ):
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Containers",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
@@ -560,21 +551,20 @@ def generate_running_count_graph(
         transparent=TRANSPARENT,
         editable=EDITABLE,
         alert=alert,
-        gridPos=grid_pos,
         alertThreshold=ALERT_THRESHOLD,
     ).auto_ref_ids()
 
 
+@panel_template("name", "cluster_name", "cloudwatch_data_source")
 def generate_desired_count_graph(
     name: str,
     cluster_name: str,
     max: int,
     cloudwatch_data_source: str,
     notifications: List[str],
-    grid_pos: GridPos,
 ):
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Containers",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
@@ -612,20 +602,19 @@ def generate_desired_count_graph(
         transparent=TRANSPARENT,
         editable=EDITABLE,
         alert=alert,
-        gridPos=grid_pos,
         alertThreshold=ALERT_THRESHOLD,
     ).auto_ref_ids()
 
 
+@panel_template("name", "cluster_name", "cloudwatch_data_source")
 def generate_pending_count_graph(
     name: str,
     cluster_name: str,
     cloudwatch_data_source: str,
     notifications: List[str],
-    grid_pos: GridPos,
 ):
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Containers",
             namespace=CONTAINER_INSIGHTS_NAMESPACE,
             statistics=["Maximum"],
@@ -661,7 +650,6 @@ def generate_pending_count_graph(
         transparent=TRANSPARENT,
         editable=EDITABLE,
         alert=alert,
-        gridPos=grid_pos,
         alertThreshold=ALERT_THRESHOLD,
     ).auto_ref_ids()
 
@@ -683,96 +671,105 @@ def generate_ecs_alb_service_dashboard(
     """Generate ECS Service dashboard"""
     tags = ["ecs", "ecs-service", "containers", "service", environment]
 
-    panels = [
-        RowPanel(
+    sections = [
+        Section(
             title="Summary",
-            gridPos=GridPos(1, 24, 0, 0),
-        ),
-        generate_running_count_stats_panel(
-            name=name,
-            cluster_name=cluster_name,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 12, 0, 1),
-        ),
-        generate_deployment_graph(
-            name=name,
-            cluster_name=cluster_name,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 12, 12, 1),
-        ),
-        RowPanel(title="Capacity", gridPos=GridPos(1, 24, 0, 9)),
-        generate_running_count_graph(
-            name=name,
-            cluster_name=cluster_name,
-            max=max,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 8, 0, 10),
-            notifications=notifications,
-        ),
-        generate_desired_count_graph(
-            name=name,
-            cluster_name=cluster_name,
-            max=max,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 8, 8, 10),
-            notifications=notifications,
-        ),
-        generate_pending_count_graph(
-            name=name,
-            cluster_name=cluster_name,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 8, 16, 10),
-            notifications=notifications,
-        ),
-        RowPanel(title="Utilization", gridPos=GridPos(1, 24, 0, 18)),
-        generate_cpu_utilization_graph(
-            name=name,
-            cluster_name=cluster_name,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 8, 0, 19),
-        ),
-        generate_mem_utilization_graph(
-            name=name,
-            cluster_name=cluster_name,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 8, 8, 19),
+            summary=True,
+            panels=[
+                generate_running_count_stats_panel(
+                    name=name,
+                    cluster_name=cluster_name,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                ),
+                generate_deployment_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                ),
+            ],
         ),
-        generate_mem_utilization_percentage_graph(
-            name=name,
-            cluster_name=cluster_name,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 8, 16, 19),
-            notifications=notifications,
+        Section(
+            title="Capacity",
+            panels=[
+                generate_running_count_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    max=max,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                    notifications=notifications,
+                ),
+                generate_desired_count_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    max=max,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                    notifications=notifications,
+                ),
+                generate_pending_count_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                    notifications=notifications,
+                ),
+            ],
         ),
-        RowPanel(title="Requests and Responses", gridPos=GridPos(1, 24, 0, 27)),
-        generate_req_count_graph(
-            loadbalancer=loadbalancer,
-            target_group=target_group,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 12, 0, 28),
+        Section(
+            title="Utilization",
+            panels=[
+                generate_cpu_utilization_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                ),
+                generate_mem_utilization_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                ),
+                generate_mem_utilization_percentage_graph(
+                    name=name,
+                    cluster_name=cluster_name,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                    notifications=notifications,
+                ),
+            ],
         ),
-        generate_res_count_graph(
-            name=name,
-            loadbalancer=loadbalancer,
-            target_group=target_group,
-            cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=GridPos(8, 12, 12, 28),
-            notifications=notifications,
+        Section(
+            title="Requests and Responses",
+            panels=[
+                generate_req_count_graph(
+                    loadbalancer=loadbalancer,
+                    target_group=target_group,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                ),
+                generate_res_count_graph(
+                    name=name,
+                    loadbalancer=loadbalancer,
+                    target_group=target_group,
+                    cloudwatch_data_source=cloudwatch_data_source,
+                    notifications=notifications,
+                ),
+            ],
         ),
     ]
 
     if elasticsearch_data_source and lucene_query:
-        panels += [
-            RowPanel(title="Logs", gridPos=GridPos(1, 24, 0, 36)),
-            generate_helpful_resources_panel(
-                lucene_query=lucene_query, grid_pos=GridPos(8, 24, 0, 37)
-            ),
-            generate_error_logs_panel(
-                grid_pos=GridPos(24, 24, 0, 45),
-                elasticsearch_data_source=elasticsearch_data_source,
-                lucene_query=lucene_query,
-            ),
-        ]
+        sections.append(
+            Section(
+                title="Logs",
+                panels=[
+                    generate_helpful_resources_panel(lucene_query=lucene_query),
+                    Cell(
+                        generate_error_logs_panel(
+                            elasticsearch_data_source=elasticsearch_data_source,
+                            lucene_query=lucene_query,
+                        ),
+                        width=GRID_WIDTH,
+                        height=24,
+                    ),
+                ],
+            )
+        )
 
     return Dashboard(
         title="{} {}".format("ECS Service:", name),
@@ -780,6 +777,6 @@ def generate_ecs_alb_service_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        panels=panels,
+        panels=layout_panels(sections),
         refresh=DEFAULT_REFRESH,
     ).auto_panel_ids()
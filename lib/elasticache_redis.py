@@ -4,7 +4,6 @@
 
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     MILLISECONDS_FORMAT,
     OP_OR,
@@ -16,7 +15,6 @@ from grafanalib.core import (
     Dashboard,
     Graph,
     LowerThan,
-    Row,
     Target,
     TimeRange,
     YAxes,
@@ -34,6 +32,9 @@ from lib.commons import (
     TIMEZONE,
     TRANSPARENT,
 )
+from lib.layout import Section, layout_panels
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 ELASTICACHE_MEASUREMENT = "cloudwatch_aws_elasticache"
 NAMESPACE = "AWS/ElastiCache"
@@ -45,6 +46,7 @@ DOCUMENTATION_LINK = {
 }
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_db_memory_usage_and_evicitons_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -62,7 +64,7 @@ def generate_elasticache_redis_db_memory_usage_and_evicitons_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["db usage"],
             namespace=NAMESPACE,
             period="1m",
@@ -70,7 +72,7 @@ def generate_elasticache_redis_db_memory_usage_and_evicitons_graph(
             dimensions={"CacheClusterId": cache_cluster_id},
             metricName="DatabaseMemoryUsagePercentage",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["evictions"],
             namespace=NAMESPACE,
             period="1m",
@@ -109,6 +111,7 @@ def generate_elasticache_redis_db_memory_usage_and_evicitons_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_swap_and_memory_usage_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -123,7 +126,7 @@ def generate_elasticache_redis_swap_and_memory_usage_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["bytes"],
             namespace=NAMESPACE,
             period="1m",
@@ -131,7 +134,7 @@ def generate_elasticache_redis_swap_and_memory_usage_graph(
             dimensions={"CacheClusterId": cache_cluster_id},
             metricName="BytesUsedForCache",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["swap"],
             namespace=NAMESPACE,
             period="1m",
@@ -169,6 +172,7 @@ def generate_elasticache_redis_swap_and_memory_usage_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_cpu_usage_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -182,7 +186,7 @@ def generate_elasticache_redis_cpu_usage_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["engine utilization"],
             namespace=NAMESPACE,
             period="1m",
@@ -214,6 +218,7 @@ def generate_elasticache_redis_cpu_usage_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_cpu_credit_usage_graph(
     cache_cluster_id: str, cloudwatch_data_source: str, notifications: List[str]
 ) -> Graph:
@@ -228,7 +233,7 @@ def generate_elasticache_redis_cpu_credit_usage_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["credit balance"],
             namespace=NAMESPACE,
             period="1m",
@@ -237,7 +242,7 @@ def generate_elasticache_redis_cpu_credit_usage_graph(
             metricName="CPUCreditBalance",
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["credit usage"],
             namespace=NAMESPACE,
             period="1m",
@@ -296,6 +301,7 @@ def generate_elasticache_redis_cpu_credit_usage_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_network_in_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -309,7 +315,7 @@ def generate_elasticache_redis_network_in_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["in"],
             namespace=NAMESPACE,
             period="1m",
@@ -342,6 +348,7 @@ def generate_elasticache_redis_network_in_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_network_out_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -355,7 +362,7 @@ def generate_elasticache_redis_network_out_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["out"],
             namespace=NAMESPACE,
             period="1m",
@@ -387,6 +394,7 @@ def generate_elasticache_redis_network_out_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_connections_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -400,7 +408,7 @@ def generate_elasticache_redis_connections_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["current"],
             namespace=NAMESPACE,
             period="1m",
@@ -433,6 +441,7 @@ def generate_elasticache_redis_connections_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_replication_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -451,7 +460,7 @@ def generate_elasticache_redis_replication_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["bytes"],
             namespace=NAMESPACE,
             period="1m",
@@ -459,7 +468,7 @@ def generate_elasticache_redis_replication_graph(
             dimensions={"CacheClusterId": cache_cluster_id},
             metricName="ReplicationBytes",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["lag"],
             namespace=NAMESPACE,
             period="1m",
@@ -498,6 +507,7 @@ def generate_elasticache_redis_replication_graph(
     ).auto_ref_ids()
 
 
+@panel_template("cache_cluster_id", "cloudwatch_data_source")
 def generate_elasticache_redis_latency_graph(
     cache_cluster_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -512,7 +522,7 @@ def generate_elasticache_redis_latency_graph(
     }
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=aliases["latency"],
             namespace=NAMESPACE,
             period="1m",
@@ -557,8 +567,9 @@ def generate_elasticache_redis_dashboard(
     """Generate ElastiCache Redis dashboard"""
     tags = ["elasticache", "redis", environment]
 
-    rows = [
-        Row(
+    sections = [
+        Section(
+            summary=True,
             panels=[
                 generate_elasticache_redis_cpu_usage_graph(
                     cache_cluster_id=cache_cluster_id,
@@ -574,9 +585,9 @@ def generate_elasticache_redis_dashboard(
                     cloudwatch_data_source=cloudwatch_data_source,
                 ),
             ],
-            editable=EDITABLE,
         ),
-        Row(
+        Section(
+            title="Connections and Memory",
             panels=[
                 generate_elasticache_redis_network_in_graph(
                     cache_cluster_id=cache_cluster_id,
@@ -591,9 +602,9 @@ def generate_elasticache_redis_dashboard(
                     cloudwatch_data_source=cloudwatch_data_source,
                 ),
             ],
-            editable=EDITABLE,
         ),
-        Row(
+        Section(
+            title="Replication and Latency",
             panels=[
                 generate_elasticache_redis_network_out_graph(
                     cache_cluster_id=cache_cluster_id,
@@ -608,7 +619,6 @@ def generate_elasticache_redis_dashboard(
                     cloudwatch_data_source=cloudwatch_data_source,
                 ),
             ],
-            editable=EDITABLE,
         ),
     ]
 
@@ -618,7 +628,7 @@ def generate_elasticache_redis_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=rows,
+        panels=layout_panels(sections),
         links=[DOCUMENTATION_LINK],
         refresh=DEFAULT_REFRESH,
     ).auto_panel_ids()
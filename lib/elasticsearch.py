@@ -4,7 +4,6 @@
 
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     OP_OR,
     PERCENT_FORMAT,
@@ -16,7 +15,6 @@ from grafanalib.core import (
     Graph,
     GreaterThan,
     LowerThan,
-    Row,
     Target,
     TimeRange,
     YAxes,
@@ -34,6 +32,9 @@ from lib.commons import (
     TIMEZONE,
     TRANSPARENT,
 )
+from lib.layout import Section, layout_panels
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 ES_MEASUREMENT = "cloudwatch_aws_es"
 NAMESPACE = "AWS/ES"
@@ -45,6 +46,7 @@ DOCUMENTATION_LINK = {
 }
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_cpu_graph(
     name: str, client_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -56,7 +58,7 @@ def generate_elasticsearch_cpu_graph(
     alias = "CPU utilization"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=alias,
             namespace=NAMESPACE,
             period="1m",
@@ -88,6 +90,7 @@ def generate_elasticsearch_cpu_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_jvm_memory_pressure_graph(
     name: str, client_id: str, cloudwatch_data_source: str, notifications: List[str]
 ) -> Graph:
@@ -99,7 +102,7 @@ def generate_elasticsearch_jvm_memory_pressure_graph(
     alias = "JVM memory pressure"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=alias,
             namespace=NAMESPACE,
             period="1m",
@@ -153,6 +156,7 @@ def generate_elasticsearch_jvm_memory_pressure_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_documents_graph(
     name: str, client_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -168,7 +172,7 @@ def generate_elasticsearch_documents_graph(
     deleted_documents_alias = "Deleted documents"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=searchable_documents_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -176,7 +180,7 @@ def generate_elasticsearch_documents_graph(
             dimensions={"DomainName": name, "ClientId": client_id},
             metricName="SearchableDocuments",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=deleted_documents_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -215,6 +219,7 @@ def generate_elasticsearch_documents_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_storage_graph(
     name: str, client_id: str, cloudwatch_data_source: str, notifications: List[str]
 ) -> Graph:
@@ -230,7 +235,7 @@ def generate_elasticsearch_storage_graph(
     cluster_used_space_alias = "Used space"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=free_storage_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -239,7 +244,7 @@ def generate_elasticsearch_storage_graph(
             metricName="FreeStorageSpace",
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=cluster_used_space_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -299,6 +304,7 @@ def generate_elasticsearch_storage_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_requests_graph(
     name: str, client_id: str, cloudwatch_data_source: str
 ) -> Graph:
@@ -316,7 +322,7 @@ def generate_elasticsearch_requests_graph(
     xx5_alias = "5xx"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx2_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -324,7 +330,7 @@ def generate_elasticsearch_requests_graph(
             dimensions={"DomainName": name, "ClientId": client_id},
             metricName="2xx",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx3_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -332,7 +338,7 @@ def generate_elasticsearch_requests_graph(
             dimensions={"DomainName": name, "ClientId": client_id},
             metricName="3xx",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx4_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -340,7 +346,7 @@ def generate_elasticsearch_requests_graph(
             dimensions={"DomainName": name, "ClientId": client_id},
             metricName="4xx",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=xx5_alias,
             namespace=NAMESPACE,
             period="1m",
@@ -390,6 +396,7 @@ def generate_elasticsearch_requests_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_status_red_alert_graph(
     name: str, client_id: str, cloudwatch_data_source: str, notifications: List[str]
 ) -> Graph:
@@ -403,7 +410,7 @@ def generate_elasticsearch_status_red_alert_graph(
     )
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Red status",
             namespace=NAMESPACE,
             period="1m",
@@ -447,6 +454,7 @@ def generate_elasticsearch_status_red_alert_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_nodes_alert_graph(
     name: str, client_id: str, cloudwatch_data_source: str, notifications: List[str]
 ):
@@ -460,7 +468,7 @@ def generate_elasticsearch_nodes_alert_graph(
     )
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Minimum number of nodes",
             namespace=NAMESPACE,
             period="1m",
@@ -469,7 +477,7 @@ def generate_elasticsearch_nodes_alert_graph(
             metricName="Nodes",
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Maximum number of nodes",
             namespace=NAMESPACE,
             period="1m",
@@ -512,6 +520,7 @@ def generate_elasticsearch_nodes_alert_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_writes_blocked_alert_graph(
     name: str, client_id: str, cloudwatch_data_source: str, notifications: List[str]
 ) -> Graph:
@@ -522,7 +531,7 @@ def generate_elasticsearch_writes_blocked_alert_graph(
     y_axes = single_y_axis(format=SHORT_FORMAT)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Writes blocked",
             namespace=NAMESPACE,
             period="1m",
@@ -566,6 +575,7 @@ def generate_elasticsearch_writes_blocked_alert_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "client_id", "cloudwatch_data_source")
 def generate_elasticsearch_automated_snapshot_failure_alert_graph(
     name: str, client_id: str, cloudwatch_data_source: str, notifications: List[str]
 ):
@@ -576,7 +586,7 @@ def generate_elasticsearch_automated_snapshot_failure_alert_graph(
     y_axes = single_y_axis(format=SHORT_FORMAT)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Automated snapshot failure",
             namespace=NAMESPACE,
             period="1m",
@@ -633,8 +643,9 @@ def generate_elasticsearch_dashboard(
     """Generate Elasticsearch dashboard"""
     tags = ["elasticsearch", environment]
 
-    rows = [
-        Row(
+    sections = [
+        Section(
+            summary=True,
             panels=[
                 generate_elasticsearch_cpu_graph(
                     name=name,
@@ -648,9 +659,9 @@ def generate_elasticsearch_dashboard(
                     notifications=notifications,
                 ),
             ],
-            editable=EDITABLE,
         ),
-        Row(
+        Section(
+            title="Documents",
             panels=[
                 generate_elasticsearch_documents_graph(
                     name=name,
@@ -658,9 +669,9 @@ def generate_elasticsearch_dashboard(
                     cloudwatch_data_source=cloudwatch_data_source,
                 )
             ],
-            editable=EDITABLE,
         ),
-        Row(
+        Section(
+            title="Storage",
             panels=[
                 generate_elasticsearch_storage_graph(
                     name=name,
@@ -669,9 +680,9 @@ def generate_elasticsearch_dashboard(
                     notifications=notifications,
                 )
             ],
-            editable=EDITABLE,
         ),
-        Row(
+        Section(
+            title="Requests",
             panels=[
                 generate_elasticsearch_requests_graph(
                     name=name,
@@ -679,9 +690,9 @@ def generate_elasticsearch_dashboard(
                     cloudwatch_data_source=cloudwatch_data_source,
                 )
             ],
-            editable=EDITABLE,
         ),
-        Row(
+        Section(
+            title="Cluster Health",
             panels=[
                 generate_elasticsearch_status_red_alert_graph(
                     name=name,
@@ -708,7 +719,6 @@ def generate_elasticsearch_dashboard(
                     notifications=notifications,
                 ),
             ],
-            editable=EDITABLE,
         ),
     ]
 
@@ -718,7 +728,7 @@ def generate_elasticsearch_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=rows,
+        panels=layout_panels(sections),
         links=[DOCUMENTATION_LINK],
         refresh=DEFAULT_REFRESH,
     ).auto_panel_ids()
@@ -2,7 +2,7 @@
     https://docs.aws.amazon.com/firehose/latest/dev/monitoring-with-cloudwatch-metrics.html
 """
 
-from grafanalib.core import SHORT_FORMAT, Dashboard, Graph, Row, Template, single_y_axis
+from grafanalib.core import SHORT_FORMAT, Dashboard, Graph, Template, single_y_axis
 from grafanalib.influxdb import InfluxDBTarget
 
 from lib import colors
@@ -14,6 +14,8 @@ from lib.commons import (
     TIMEZONE,
     TRANSPARENT,
 )
+from lib.layout import Section, layout_panels
+from lib.templates import panel_template
 
 FIREHOSE_MEASUREMENT = "cloudwatch_aws_firehose"
 FIREHOSE_INCOMING_RECORDS_ALIAS = "Incoming records"
@@ -38,6 +40,7 @@ def get_firehose_template(data_source: str) -> Template:
     )
 
 
+@panel_template("influxdb_data_source")
 def generate_firehose_graph(influxdb_data_source: str) -> Graph:
     """
     Generate Firehose graph
@@ -104,12 +107,12 @@ def generate_firehose_dashboard(
     """Generate Firehose dashboard"""
     tags = ["firehose", environment]
 
-    rows = [
-        Row(
+    sections = [
+        Section(
             panels=[generate_firehose_graph(influxdb_data_source=influxdb_data_source)],
-            editable=EDITABLE,
             repeat="firehose",
             title="$firehose",
+            summary=True,
         )
     ]
 
@@ -119,5 +122,5 @@ def generate_firehose_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=rows,
+        panels=layout_panels(sections),
     ).auto_panel_ids()
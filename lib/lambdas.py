@@ -4,7 +4,7 @@
 
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchLogsInsightsTarget, CloudwatchMetricsTarget
+from grafanalib.cloudwatch import CloudwatchLogsInsightsTarget
 from grafanalib.core import (
     MILLISECONDS_FORMAT,
     OP_AND,
@@ -13,11 +13,12 @@ from grafanalib.core import (
     Alert,
     AlertCondition,
     Dashboard,
+    DataLink,
     Graph,
     GreaterThan,
     Logs,
-    Row,
     Target,
+    Template,
     TimeRange,
     YAxes,
     YAxis,
@@ -33,11 +34,22 @@ from lib.commons import (
     SHARED_CROSSHAIR,
     TIMEZONE,
     TRANSPARENT,
+    get_search_expressions,
 )
+from lib.layout import Section, layout_panels
+from lib.periods import get_cloudwatch_target
 from lib.sns import create_sns_graph
+from lib.templates import memoized_panel, panel_template
 
 NAMESPACE = "AWS/Lambda"
 LAMBDA_DASHBOARD_PREFIX = "Lambda: "
+# Search of the lambda dashboard of a series of an aggregated graph, with the
+# percent-encoded prefix as urllib.parse imports ipaddress on every render
+LAMBDA_DASHBOARD_LINK = "/dashboards?query=Lambda%3A%20${__series.name:percentencode}"
+# Log groups of one CloudWatch Logs Insights query
+LOG_GROUPS_PER_QUERY = 50
+# Template variable of the repeated lambda rows
+LAMBDA_VARIABLE = "lambda"
 
 
 MINIMUM_ALIAS = "Min"
@@ -68,6 +80,8 @@ def dispatcher(service, trigger, *args, **kwargs):
     return dispatch[trigger](**kwargs)
 
 
+@memoized_panel
+@panel_template("name", "cloudwatch_data_source")
 def lambda_generate_logs_panel(name: str, cloudwatch_data_source: str) -> Logs:
     """
     Generate Logs panel
@@ -89,6 +103,8 @@ def lambda_generate_logs_panel(name: str, cloudwatch_data_source: str) -> Logs:
     )
 
 
+@memoized_panel
+@panel_template("name", "cloudwatch_data_source", "lambda_insights_namespace")
 def lambda_generate_memory_utilization_percentage_graph(
     name: str,
     cloudwatch_data_source: str,
@@ -102,14 +118,14 @@ def lambda_generate_memory_utilization_percentage_graph(
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MINIMUM_ALIAS,
             namespace=lambda_insights_namespace,
             statistics=["Minimum"],
             metricName="memory_utilization",
             dimensions={"function_name": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=AVERAGE_ALIAS,
             namespace=lambda_insights_namespace,
             statistics=["Average"],
@@ -117,7 +133,7 @@ def lambda_generate_memory_utilization_percentage_graph(
             dimensions={"function_name": name},
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MAXIMUM_ALIAS,
             namespace=lambda_insights_namespace,
             statistics=["Maximum"],
@@ -177,6 +193,8 @@ def lambda_generate_memory_utilization_percentage_graph(
     ).auto_ref_ids()
 
 
+@memoized_panel
+@panel_template("name", "cloudwatch_data_source", "lambda_insights_namespace")
 def lambda_generate_memory_utilization_graph(
     name: str,
     cloudwatch_data_source: str,
@@ -189,14 +207,14 @@ def lambda_generate_memory_utilization_graph(
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="used_memory_max",
             namespace=lambda_insights_namespace,
             statistics=["Maximum"],
             metricName="used_memory_max",
             dimensions={"function_name": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="allocated_memory",
             namespace=lambda_insights_namespace,
             statistics=["Maximum"],
@@ -234,6 +252,8 @@ def lambda_generate_memory_utilization_graph(
     ).auto_ref_ids()
 
 
+@memoized_panel
+@panel_template("name", "cloudwatch_data_source")
 def lambda_generate_duration_graph(
     name: str, cloudwatch_data_source: str, *args, **kwargs
 ) -> Graph:
@@ -242,21 +262,21 @@ def lambda_generate_duration_graph(
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MINIMUM_ALIAS,
             namespace=NAMESPACE,
             statistics=["Minimum"],
             metricName="Duration",
             dimensions={"FunctionName": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=AVERAGE_ALIAS,
             namespace=NAMESPACE,
             statistics=["Average"],
             metricName="Duration",
             dimensions={"FunctionName": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=MAXIMUM_ALIAS,
             namespace=NAMESPACE,
             statistics=["Maximum"],
@@ -297,6 +317,8 @@ def lambda_generate_duration_graph(
     ).auto_ref_ids()
 
 
+@memoized_panel
+@panel_template("name", "cloudwatch_data_source")
 def lambda_generate_invocations_graph(
     name: str, cloudwatch_data_source: str, notifications: List[str], *args, **kwargs
 ) -> Graph:
@@ -305,14 +327,14 @@ def lambda_generate_invocations_graph(
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=LAMBDA_INVOCATIONS_ALIAS,
             namespace=NAMESPACE,
             statistics=["Sum"],
             metricName="Invocations",
             dimensions={"FunctionName": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=LAMBDA_ERRORS_ALIAS,
             namespace=NAMESPACE,
             statistics=["Sum"],
@@ -375,6 +397,190 @@ def lambda_generate_invocations_graph(
     ).auto_ref_ids()
 
 
+def lambda_generate_aggregated_graph(
+    lambdas: List[str],
+    cloudwatch_data_source: str,
+    title: str,
+    namespace: str,
+    dimension: str,
+    metric_name: str,
+    statistic: str,
+    format: str = SHORT_FORMAT,
+) -> Graph:
+    """
+    Generate a graph of the metric of all the lambdas, one series per lambda
+    linking to its dashboard, from SEARCH expressions
+    """
+
+    targets = [
+        get_cloudwatch_target(
+            alias="{{{{{}}}}}".format(dimension), expression=expression
+        )
+        for expression in get_search_expressions(
+            namespace, dimension, metric_name, statistic, lambdas
+        )
+    ]
+
+    yAxes = YAxes(
+        YAxis(format=format, decimals=2),
+        YAxis(format=SHORT_FORMAT, decimals=2),
+    )
+
+    return Graph(
+        title=title,
+        dataSource=cloudwatch_data_source,
+        targets=targets,
+        yAxes=yAxes,
+        transparent=TRANSPARENT,
+        editable=EDITABLE,
+        alertThreshold=ALERT_THRESHOLD,
+        dataLinks=[DataLink(title="Lambda dashboard", linkUrl=LAMBDA_DASHBOARD_LINK)],
+    ).auto_ref_ids()
+
+
+def lambda_generate_aggregated_logs_panel(
+    lambdas: List[str], cloudwatch_data_source: str
+) -> Logs:
+    """
+    Generate Logs panel of all the lambdas
+    """
+    log_groups = ["/aws/lambda/{}".format(name) for name in lambdas]
+    targets = [
+        CloudwatchLogsInsightsTarget(
+            expression="fields @timestamp, @log, @message | filter @message like /^(?!.*(START|END|REPORT|LOGS|EXTENSION)).*$/ | sort @timestamp desc",  # noqa: E501
+            logGroupNames=log_groups[i : i + LOG_GROUPS_PER_QUERY],
+        )
+        for i in range(0, len(log_groups), LOG_GROUPS_PER_QUERY)
+    ]
+
+    return Logs(
+        title="Logs",
+        dataSource=cloudwatch_data_source,
+        targets=targets,
+        wrapLogMessages=True,
+        prettifyLogMessage=False,
+        enableLogDetails=True,
+    )
+
+
+def create_lambdas_aggregated_sections(
+    lambdas: List[str], cloudwatch_data_source: str, lambda_insights_namespace: str
+) -> List[Section]:
+    """
+    Rows with one graph per metric for all the lambdas, instead of a row per
+    lambda, the series link to the lambda dashboards. Alerts are left to the
+    lambda dashboards.
+    """
+
+    return [
+        Section(
+            title="Lambda Metrics",
+            panels=[
+                lambda_generate_aggregated_graph(
+                    lambdas,
+                    cloudwatch_data_source,
+                    title="Lambda Invocations",
+                    namespace=NAMESPACE,
+                    dimension="FunctionName",
+                    metric_name="Invocations",
+                    statistic="Sum",
+                ),
+                lambda_generate_aggregated_graph(
+                    lambdas,
+                    cloudwatch_data_source,
+                    title="Lambda Errors",
+                    namespace=NAMESPACE,
+                    dimension="FunctionName",
+                    metric_name="Errors",
+                    statistic="Sum",
+                ),
+                lambda_generate_aggregated_graph(
+                    lambdas,
+                    cloudwatch_data_source,
+                    title="Lambda Invocation Duration",
+                    namespace=NAMESPACE,
+                    dimension="FunctionName",
+                    metric_name="Duration",
+                    statistic="Average",
+                    format=MILLISECONDS_FORMAT,
+                ),
+                lambda_generate_aggregated_graph(
+                    lambdas,
+                    cloudwatch_data_source,
+                    title="Lambda Memory Utilization Percentage",
+                    namespace=lambda_insights_namespace,
+                    dimension="function_name",
+                    metric_name="memory_utilization",
+                    statistic="Maximum",
+                ),
+            ],
+        ),
+        Section(
+            title="Lambda Logs",
+            collapsed=True,
+            panels=[
+                lambda_generate_aggregated_logs_panel(lambdas, cloudwatch_data_source)
+            ],
+        ),
+    ]
+
+
+def get_lambda_template(lambdas: List[str]) -> Template:
+    """Get template for the lambdas, the first one is selected"""
+
+    return Template(
+        name=LAMBDA_VARIABLE,
+        query=",".join(lambdas),
+        label="Lambda",
+        type="custom",
+        default=lambdas[0],
+        multi=True,
+        includeAll=True,
+    )
+
+
+def create_lambdas_repeated_sections(
+    cloudwatch_data_source: str, lambda_insights_namespace: str
+) -> List[Section]:
+    """
+    Rows repeated by Grafana for the lambdas selected in the lambda template,
+    the logs row is only queried when expanded. Grafana does not alert on
+    templated queries, alerts are left to the lambda dashboards.
+    """
+
+    name = "${}".format(LAMBDA_VARIABLE)
+
+    return [
+        Section(
+            title="{} Lambda Metrics".format(name),
+            repeat=LAMBDA_VARIABLE,
+            panels=[
+                lambda_generate_invocations_graph(
+                    name, cloudwatch_data_source, notifications=[]
+                ),
+                lambda_generate_duration_graph(name, cloudwatch_data_source),
+                lambda_generate_memory_utilization_percentage_graph(
+                    name,
+                    cloudwatch_data_source,
+                    lambda_insights_namespace,
+                    notifications=[],
+                ),
+                lambda_generate_memory_utilization_graph(
+                    name, cloudwatch_data_source, lambda_insights_namespace
+                ),
+            ],
+        ),
+        Section(
+            title="{} Lambda Logs".format(name),
+            collapsed=True,
+            repeat=LAMBDA_VARIABLE,
+            panels=[
+                lambda_generate_logs_panel(name, cloudwatch_data_source),
+            ],
+        ),
+    ]
+
+
 def lambda_cron_dashboard(*args, **kwargs):
     """
     Generate lambda dashboard for cron
@@ -433,37 +639,43 @@ def create_lambda_only_dashboard(
         tags=tags + ["lambda", environment],
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=[
-            Row(
-                panels=[
-                    lambda_generate_invocations_graph(
-                        name, cloudwatch_data_source, notifications=notifications
-                    ),
-                    lambda_generate_duration_graph(name, cloudwatch_data_source),
-                ]
-            ),
-            Row(
-                panels=[
-                    lambda_generate_memory_utilization_percentage_graph(
-                        name,
-                        cloudwatch_data_source,
-                        lambda_insights_namespace,
-                        notifications=notifications,
-                    ),
-                    lambda_generate_memory_utilization_graph(
-                        name, cloudwatch_data_source, lambda_insights_namespace
-                    ),
-                ]
-            ),
-            Row(
-                panels=[
-                    lambda_generate_logs_panel(name, cloudwatch_data_source),
-                ]
-            ),
-        ],
+        panels=layout_panels(
+            [
+                Section(
+                    panels=[
+                        lambda_generate_invocations_graph(
+                            name, cloudwatch_data_source, notifications=notifications
+                        ),
+                        lambda_generate_duration_graph(name, cloudwatch_data_source),
+                    ],
+                    summary=True,
+                ),
+                Section(
+                    title="Memory Utilization",
+                    panels=[
+                        lambda_generate_memory_utilization_percentage_graph(
+                            name,
+                            cloudwatch_data_source,
+                            lambda_insights_namespace,
+                            notifications=notifications,
+                        ),
+                        lambda_generate_memory_utilization_graph(
+                            name, cloudwatch_data_source, lambda_insights_namespace
+                        ),
+                    ],
+                ),
+                Section(
+                    title="Logs",
+                    panels=[
+                        lambda_generate_logs_panel(name, cloudwatch_data_source),
+                    ],
+                ),
+            ]
+        ),
     ).auto_panel_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def create_lambda_sqs_dlq_graph(
     name: str, cloudwatch_data_source: str, fifo: bool, notifications: List[str]
 ):
@@ -473,7 +685,7 @@ def create_lambda_sqs_dlq_graph(
         name += ".fifo"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Approximate number of messages available",
             namespace="AWS/SQS",
             statistics=["Maximum"],
@@ -518,6 +730,7 @@ def create_lambda_sqs_dlq_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def create_lambda_sqs_graph(name: str, cloudwatch_data_source: str, fifo: bool):
     """Create SQS graph"""
 
@@ -525,7 +738,7 @@ def create_lambda_sqs_graph(name: str, cloudwatch_data_source: str, fifo: bool):
         name += ".fifo"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Number of messages sent to the queue",
             namespace="AWS/SQS",
             statistics=["Sum"],
@@ -578,47 +791,46 @@ def lambda_sqs_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=[
-            Row(
-                title="Invocations",
-                showTitle=True,
-                panels=[
-                    lambda_generate_invocations_graph(
-                        name, cloudwatch_data_source, notifications=[]
-                    ),
-                    lambda_generate_duration_graph(name, cloudwatch_data_source),
-                ],
-            ),
-            Row(
-                title="Memory Utilization",
-                showTitle=True,
-                panels=[
-                    lambda_generate_memory_utilization_percentage_graph(
-                        name,
-                        cloudwatch_data_source,
-                        lambda_insights_namespace,
-                        notifications=notifications,
-                    ),
-                    lambda_generate_memory_utilization_graph(
-                        name, cloudwatch_data_source, lambda_insights_namespace
-                    ),
-                ],
-            ),
-            Row(
-                title="Logs",
-                showTitle=True,
-                collapse=True,
-                panels=[
-                    lambda_generate_logs_panel(name, cloudwatch_data_source),
-                ],
-            ),
-            Row(title="Queues", showTitle=True, panels=[sqs_graph]),
-            Row(
-                title="Dead Letter Queues",
-                showTitle=True,
-                panels=[dead_letter_sqs_graph],
-            ),
-        ],
+        panels=layout_panels(
+            [
+                Section(
+                    title="Invocations",
+                    panels=[
+                        lambda_generate_invocations_graph(
+                            name, cloudwatch_data_source, notifications=[]
+                        ),
+                        lambda_generate_duration_graph(name, cloudwatch_data_source),
+                    ],
+                    summary=True,
+                ),
+                Section(
+                    title="Memory Utilization",
+                    panels=[
+                        lambda_generate_memory_utilization_percentage_graph(
+                            name,
+                            cloudwatch_data_source,
+                            lambda_insights_namespace,
+                            notifications=notifications,
+                        ),
+                        lambda_generate_memory_utilization_graph(
+                            name, cloudwatch_data_source, lambda_insights_namespace
+                        ),
+                    ],
+                ),
+                Section(
+                    title="Logs",
+                    collapsed=True,
+                    panels=[
+                        lambda_generate_logs_panel(name, cloudwatch_data_source),
+                    ],
+                ),
+                Section(title="Queues", panels=[sqs_graph]),
+                Section(
+                    title="Dead Letter Queues",
+                    panels=[dead_letter_sqs_graph],
+                ),
+            ]
+        ),
     ).auto_panel_ids()
 
 
@@ -664,52 +876,49 @@ def lambda_sns_sqs_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=[
-            Row(
-                title="SNS Topics",
-                showTitle=True,
-                collapse=False,
-                panels=sns_topic_panels,
-            ),
-            Row(
-                title="Invocations",
-                showTitle=True,
-                panels=[
-                    lambda_generate_invocations_graph(
-                        name, cloudwatch_data_source, notifications=[]
-                    ),
-                    lambda_generate_duration_graph(name, cloudwatch_data_source),
-                ],
-            ),
-            Row(
-                title="Memory Utilization",
-                showTitle=True,
-                panels=[
-                    lambda_generate_memory_utilization_percentage_graph(
-                        name,
-                        cloudwatch_data_source,
-                        lambda_insights_namespace,
-                        notifications=notifications,
-                    ),
-                    lambda_generate_memory_utilization_graph(
-                        name, cloudwatch_data_source, lambda_insights_namespace
-                    ),
-                ],
-            ),
-            Row(
-                title="Logs",
-                showTitle=True,
-                collapse=True,
-                panels=[
-                    lambda_generate_logs_panel(name, cloudwatch_data_source),
-                ],
-            ),
-            Row(title="Queues", showTitle=True, panels=[sqs_graph]),
-            Row(
-                title="Dead Letter Queues",
-                showTitle=True,
-                panels=[dead_letter_sqs_graph],
-            ),
-        ],
+        panels=layout_panels(
+            [
+                Section(
+                    title="SNS Topics",
+                    panels=sns_topic_panels,
+                ),
+                Section(
+                    title="Invocations",
+                    panels=[
+                        lambda_generate_invocations_graph(
+                            name, cloudwatch_data_source, notifications=[]
+                        ),
+                        lambda_generate_duration_graph(name, cloudwatch_data_source),
+                    ],
+                    summary=True,
+                ),
+                Section(
+                    title="Memory Utilization",
+                    panels=[
+                        lambda_generate_memory_utilization_percentage_graph(
+                            name,
+                            cloudwatch_data_source,
+                            lambda_insights_namespace,
+                            notifications=notifications,
+                        ),
+                        lambda_generate_memory_utilization_graph(
+                            name, cloudwatch_data_source, lambda_insights_namespace
+                        ),
+                    ],
+                ),
+                Section(
+                    title="Logs",
+                    collapsed=True,
+                    panels=[
+                        lambda_generate_logs_panel(name, cloudwatch_data_source),
+                    ],
+                ),
+                Section(title="Queues", panels=[sqs_graph]),
+                Section(
+                    title="Dead Letter Queues",
+                    panels=[dead_letter_sqs_graph],
+                ),
+            ]
+        ),
         refresh=DEFAULT_REFRESH,
     ).auto_panel_ids()
@@ -0,0 +1,139 @@
+"""
+Grid layout of dashboard panels
+
+Dashboards are described as sections of panels, a section with a title gets a
+row panel header. The panels of a section are packed left to right into the
+24 columns of the Grafana grid, wrapping to a new line when full, so Grafana
+does not have to migrate legacy rows when loading the dashboard.
+"""
+
+import contextlib
+
+import attr
+from grafanalib.core import GridPos, Repeat, RowPanel
+
+GRID_WIDTH = 24
+# Panels without a width hint are at least a quarter of the grid wide
+MIN_WIDTH = 6
+DEFAULT_HEIGHT = 8
+ROW_HEIGHT = 1
+
+# Collapse every titled section but the summaries, see lazy_rows
+lazy = False
+
+
+@attr.s
+class Cell(object):
+    """Panel with a size hint, in grid columns and units"""
+
+    panel = attr.ib()
+    width = attr.ib(default=None)
+    height = attr.ib(default=None)
+
+
+@attr.s
+class Section(object):
+    """
+    Panels or cells under a row header, without one when untitled. Panels
+    without a width share the columns left by the others, panels without a
+    height get the height of the section. Summary sections stay open under
+    lazy rows.
+    """
+
+    panels = attr.ib()
+    title = attr.ib(default=None)
+    collapsed = attr.ib(default=False)
+    repeat = attr.ib(default=None)
+    height = attr.ib(default=DEFAULT_HEIGHT)
+    summary = attr.ib(default=False)
+
+
+@contextlib.contextmanager
+def lazy_rows(enable=True):
+    """Collapse the titled sections but the summary sections laid out in this
+    context, Grafana only queries the panels of a collapsed row when it is
+    expanded"""
+
+    global lazy
+    previous, lazy = lazy, enable
+    try:
+        yield
+    finally:
+        lazy = previous
+
+
+def get_cells(section: Section) -> list:
+    """Cells of the panels of the section, sized"""
+
+    cells = [
+        panel if isinstance(panel, Cell) else Cell(panel) for panel in section.panels
+    ]
+    unsized = [cell for cell in cells if not cell.width]
+    # Columns left on the last line of the sized panels
+    sized = sum(cell.width for cell in cells if cell.width)
+    free = (GRID_WIDTH - sized) % GRID_WIDTH or GRID_WIDTH
+    width = max(MIN_WIDTH, free // len(unsized)) if unsized else GRID_WIDTH
+
+    return [
+        Cell(cell.panel, cell.width or width, cell.height or section.height)
+        for cell in cells
+    ]
+
+
+def layout_panels(sections: list) -> list:
+    """Panels of the sections with their grid position, after the row panel of
+    their section, or in it for collapsed sections"""
+
+    panels, y = [], 0
+    for section in sections:
+        collapsed = section.collapsed or (lazy and not section.summary)
+        row = None
+        if section.title is not None:
+            row = RowPanel(
+                title=section.title,
+                gridPos=GridPos(ROW_HEIGHT, GRID_WIDTH, 0, y),
+                collapsed=collapsed,
+                repeat=Repeat(variable=section.repeat),
+            )
+            y += ROW_HEIGHT
+
+        section_panels, top, x, line_height = [], y, 0, 0
+        for cell in get_cells(section):
+            if x + cell.width > GRID_WIDTH:
+                y, x, line_height = y + line_height, 0, 0
+            section_panels.append(
+                attr.evolve(cell.panel, gridPos=GridPos(cell.height, cell.width, x, y))
+            )
+            x, line_height = x + cell.width, max(line_height, cell.height)
+        y += line_height
+
+        if row and collapsed:
+            # Collapsed panels keep their position under the row when expanded
+            panels.append(attr.evolve(row, panels=section_panels))
+            y = top
+        else:
+            panels += ([row] if row else []) + section_panels
+
+    return panels
+
+
+def get_sections(panels: list) -> list:
+    """Sections of panels laid out by layout_panels, the panels above the first
+    row panel are in an untitled section"""
+
+    sections = []
+    for panel in panels:
+        if isinstance(panel, RowPanel):
+            sections.append(
+                Section(
+                    panels=list(panel.panels),
+                    title=panel.title,
+                    collapsed=panel.collapsed,
+                    repeat=panel.repeat.variable,
+                )
+            )
+        elif sections:
+            sections[-1].panels.append(panel)
+        else:
+            sections.append(Section(panels=[panel]))
+    return sections
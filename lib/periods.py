@@ -0,0 +1,197 @@
+"""
+Period policy of CloudWatch metric targets
+
+Every CloudWatch metric target of the generators is built with
+get_cloudwatch_target, which sets its period from the policy of the dashboard
+being built: the period its builder asks for, auto to let Grafana pick it from
+the time range, a fixed period, or the period template variable whose auto
+value grows with the time range from a min period. Grafana does not bound the
+auto value, a variable with a max period has no auto value and starts on the
+first period at least the auto period of the time range of the dashboard.
+"""
+
+import contextlib
+import json
+
+import attr
+from grafanalib.cloudwatch import CloudwatchMetricsTarget
+from grafanalib.core import Template
+
+from lib import templates
+from lib.report import get_time_range, parse_duration
+
+AUTO = "auto"
+VARIABLE = "variable"
+PERIOD_VARIABLE = "period"
+# Periods offered by the period template variable, between its bounds
+PERIODS = ["1m", "5m", "15m", "1h", "6h", "1d"]
+DEFAULT_MIN_PERIOD = "1m"
+# The auto period splits the time range in this many periods, 1d for 30 days
+AUTO_COUNT = 30
+# Refresh of the template variable when the time range changes
+REFRESH_ON_TIME_RANGE_CHANGE = 2
+
+
+@attr.s
+class PeriodPolicy(object):
+    """Period of the CloudWatch metric targets, auto, variable, a period like
+    5m, or None for the period of their builder. The variable period has no
+    max period unless set."""
+
+    period = attr.ib(default=None)
+    min_period = attr.ib(default=DEFAULT_MIN_PERIOD)
+    max_period = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        periods = [self.min_period]
+        if self.max_period is not None:
+            periods.append(self.max_period)
+        if self.period not in (None, AUTO, VARIABLE):
+            periods.append(self.period)
+        for period in periods:
+            seconds = parse_duration(period)
+            if seconds < 60 or seconds % 60:
+                raise Exception("Invalid period {}, a multiple of 1m".format(period))
+
+        max_period = self.max_period or self.min_period
+        if parse_duration(self.min_period) > parse_duration(max_period):
+            raise Exception(
+                "Min period {} is longer than the max period {}".format(
+                    self.min_period, self.max_period
+                )
+            )
+
+
+current_policy = PeriodPolicy()
+templates.key_context["period_policy"] = repr(current_policy)
+
+
+@contextlib.contextmanager
+def period_policy(policy: PeriodPolicy):
+    """Build the CloudWatch metric targets with the policy in this context"""
+
+    global current_policy
+    previous, current_policy = current_policy, policy
+    # Precompiled and memoized panels built under another policy differ
+    templates.key_context["period_policy"] = repr(policy)
+    try:
+        yield
+    finally:
+        current_policy = previous
+        templates.key_context["period_policy"] = repr(previous)
+
+
+def get_period(period="") -> str:
+    """Period of a target whose builder asks for period, under the policy"""
+
+    if current_policy.period is None:
+        return period
+    if current_policy.period == AUTO:
+        return ""
+    if current_policy.period == VARIABLE:
+        return "$" + PERIOD_VARIABLE
+    return current_policy.period
+
+
+def get_cloudwatch_target(**kwargs) -> CloudwatchMetricsTarget:
+    """CloudWatch metric target with its period under the policy"""
+
+    kwargs["period"] = get_period(kwargs.get("period", ""))
+    return CloudwatchMetricsTarget(**kwargs)
+
+
+def get_period_template(policy: PeriodPolicy, time_range: int) -> Template:
+    """Interval template variable of the period, auto by default, or starting
+    on the first period at least the auto period of the time range, in
+    seconds, with a max period"""
+
+    min_seconds = parse_duration(policy.min_period)
+    max_seconds = parse_duration(policy.max_period or PERIODS[-1])
+    periods = [
+        period
+        for period in PERIODS
+        if min_seconds <= parse_duration(period) <= max_seconds
+    ] or [policy.min_period]
+
+    if policy.max_period is None:
+        return Template(
+            name=PERIOD_VARIABLE,
+            label="Period",
+            type="interval",
+            query=",".join(periods),
+            default="$__auto_interval_{}".format(PERIOD_VARIABLE),
+            refresh=REFRESH_ON_TIME_RANGE_CHANGE,
+            auto=True,
+            autoMin=policy.min_period,
+            autoCount=AUTO_COUNT,
+        )
+
+    auto_seconds = time_range / AUTO_COUNT
+    return Template(
+        name=PERIOD_VARIABLE,
+        label="Period",
+        type="interval",
+        query=",".join(periods),
+        default=next(
+            (period for period in periods if parse_duration(period) >= auto_seconds),
+            periods[-1],
+        ),
+        refresh=REFRESH_ON_TIME_RANGE_CHANGE,
+    )
+
+
+def pin_alert_periods(panel):
+    """Panel with the variable period of the targets of its alert on auto,
+    alerts can not query template variables"""
+
+    variable = "$" + PERIOD_VARIABLE
+    if isinstance(panel, templates.PrecompiledPanel):
+        data = panel.to_json_data()
+        if not data.get("alert"):
+            return panel
+
+        ref_ids = {
+            condition["query"]["params"][0] for condition in data["alert"]["conditions"]
+        }
+        data["targets"] = [
+            (
+                dict(target, period="")
+                if target.get("refId") in ref_ids and target.get("period") == variable
+                else target
+            )
+            for target in data["targets"]
+        ]
+        return attr.evolve(panel, skeleton=json.dumps(data), values={})
+
+    alert = getattr(panel, "alert", None)
+    if not alert:
+        return panel
+
+    ref_ids = {condition.target.refId for condition in alert.alertConditions}
+    return attr.evolve(
+        panel,
+        targets=[
+            (
+                attr.evolve(target, period="")
+                if target.refId in ref_ids and getattr(target, "period", "") == variable
+                else target
+            )
+            for target in panel.targets
+        ],
+    )
+
+
+def apply_period_policy(dashboard, policy: PeriodPolicy):
+    """Add the period template variable to a dashboard built under a variable
+    period policy, with the targets of its alerts on auto"""
+
+    if policy.period != VARIABLE:
+        return dashboard
+
+    template = get_period_template(policy, get_time_range({"time": dashboard.time}))
+    return attr.evolve(
+        dashboard._map_panels(pin_alert_periods),
+        templating=attr.evolve(
+            dashboard.templating, list=dashboard.templating.list + [template]
+        ),
+    )
@@ -4,7 +4,6 @@
 
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     OP_AND,
     PERCENT_FORMAT,
@@ -16,7 +15,6 @@ from grafanalib.core import (
     Graph,
     GreaterThan,
     LowerThan,
-    Row,
     Target,
     TimeRange,
     single_y_axis,
@@ -34,10 +32,14 @@ from lib.commons import (
     get_documentation_link,
     get_series_overrides,
 )
+from lib.layout import Section, layout_panels
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 NAMESPACE = "AWS/RDS"
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_cpu_graph(
     name: str, cloudwatch_data_source: str, notifications: List[str]
 ):
@@ -51,7 +53,7 @@ def generate_rds_cpu_graph(
     mean_alias = "mean"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=max_alias,
             namespace=NAMESPACE,
             dimensions={"DBInstanceIdentifier": name},
@@ -60,7 +62,7 @@ def generate_rds_cpu_graph(
             metricName="CPUUtilization",
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=mean_alias,
             namespace=NAMESPACE,
             dimensions={"DBInstanceIdentifier": name},
@@ -68,7 +70,7 @@ def generate_rds_cpu_graph(
             metricName="CPUUtilization",
             period="1m",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=min_alias,
             namespace=NAMESPACE,
             dimensions={"DBInstanceIdentifier": name},
@@ -115,6 +117,7 @@ def generate_rds_cpu_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_database_connections_graph(name: str, cloudwatch_data_source: str):
     """
     Generate rds graph
@@ -126,7 +129,7 @@ def generate_rds_database_connections_graph(name: str, cloudwatch_data_source: s
     mean_alias = "mean"
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=max_alias,
             namespace=NAMESPACE,
             dimensions={"DBInstanceIdentifier": name},
@@ -135,7 +138,7 @@ def generate_rds_database_connections_graph(name: str, cloudwatch_data_source: s
             period="1m",
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=mean_alias,
             metricName="DatabaseConnections",
             statistics=["Average"],
@@ -143,7 +146,7 @@ def generate_rds_database_connections_graph(name: str, cloudwatch_data_source: s
             dimensions={"DBInstanceIdentifier": name},
             period="1m",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=min_alias,
             metricName="DatabaseConnections",
             statistics=["Minimum"],
@@ -168,6 +171,7 @@ def generate_rds_database_connections_graph(name: str, cloudwatch_data_source: s
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_burst_balance_graph(
     name: str, cloudwatch_data_source: str, notifications: List[str]
 ):
@@ -178,7 +182,7 @@ def generate_rds_burst_balance_graph(
     y_axes = single_y_axis(format=PERCENT_FORMAT)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Burst balance",
             metricName="BurstBalance",
             statistics=["Minimum"],
@@ -223,6 +227,7 @@ def generate_rds_burst_balance_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_transaction_id_graph(
     name: str, cloudwatch_data_source: str, notifications: List[str]
 ):
@@ -233,7 +238,7 @@ def generate_rds_transaction_id_graph(
     y_axes = single_y_axis(format=SHORT_FORMAT)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Transaction ids used",
             metricName="MaximumUsedTransactionIDs",
             statistics=["Maximum"],
@@ -278,6 +283,7 @@ def generate_rds_transaction_id_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_freeable_memory_graph(name: str, cloudwatch_data_source: str):
     """
     Generate rds graph
@@ -286,7 +292,7 @@ def generate_rds_freeable_memory_graph(name: str, cloudwatch_data_source: str):
     y_axes = single_y_axis(format=BYTES)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Freeable memory",
             metricName="FreeableMemory",
             statistics=["Minimum"],
@@ -295,7 +301,7 @@ def generate_rds_freeable_memory_graph(name: str, cloudwatch_data_source: str):
             period="1m",
             refId=ALERT_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Swap memory",
             metricName="SwapUsage",
             statistics=["Maximum"],
@@ -317,6 +323,7 @@ def generate_rds_freeable_memory_graph(name: str, cloudwatch_data_source: str):
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_free_storage_space_graph(name: str, cloudwatch_data_source: str):
     """
     Generate rds graph
@@ -325,7 +332,7 @@ def generate_rds_free_storage_space_graph(name: str, cloudwatch_data_source: str
     y_axes = single_y_axis(format=BYTES)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="Free storage",
             metricName="FreeStorageSpace",
             statistics=["Minimum"],
@@ -348,6 +355,7 @@ def generate_rds_free_storage_space_graph(name: str, cloudwatch_data_source: str
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_disk_latency_graph(name: str, cloudwatch_data_source: str):
     """
     Generate rds graph
@@ -356,7 +364,7 @@ def generate_rds_disk_latency_graph(name: str, cloudwatch_data_source: str):
     y_axes = single_y_axis(format=SECONDS)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="read latency",
             metricName="ReadLatency",
             statistics=["Maximum"],
@@ -364,7 +372,7 @@ def generate_rds_disk_latency_graph(name: str, cloudwatch_data_source: str):
             dimensions={"DBInstanceIdentifier": name},
             period="1m",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="write latency",
             metricName="WriteLatency",
             statistics=["Maximum"],
@@ -386,6 +394,7 @@ def generate_rds_disk_latency_graph(name: str, cloudwatch_data_source: str):
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_disk_ops_graph(name: str, cloudwatch_data_source: str):
     """
     Generate rds graph
@@ -394,7 +403,7 @@ def generate_rds_disk_ops_graph(name: str, cloudwatch_data_source: str):
     y_axes = single_y_axis(format=SHORT_FORMAT, min=None)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="write iops",
             metricName="WriteIOPS",
             statistics=["Maximum"],
@@ -402,7 +411,7 @@ def generate_rds_disk_ops_graph(name: str, cloudwatch_data_source: str):
             dimensions={"DBInstanceIdentifier": name},
             period="1m",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="read iops",
             metricName="ReadIOPS",
             statistics=["Maximum"],
@@ -410,7 +419,7 @@ def generate_rds_disk_ops_graph(name: str, cloudwatch_data_source: str):
             dimensions={"DBInstanceIdentifier": name},
             period="1m",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="disk queue depth",
             metricName="DiskQueueDepth",
             statistics=["Maximum"],
@@ -432,6 +441,7 @@ def generate_rds_disk_ops_graph(name: str, cloudwatch_data_source: str):
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_rds_network_throughput_graph(name: str, cloudwatch_data_source: str):
     """
     Generate rds graph
@@ -440,7 +450,7 @@ def generate_rds_network_throughput_graph(name: str, cloudwatch_data_source: str
     y_axes = single_y_axis(format=BYTES_SEC, min=None)
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="RX",
             metricName="NetworkReceiveThroughput",
             statistics=["Maximum"],
@@ -448,7 +458,7 @@ def generate_rds_network_throughput_graph(name: str, cloudwatch_data_source: str
             dimensions={"DBInstanceIdentifier": name},
             period="1m",
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias="TX",
             metricName="NetworkTransmitThroughput",
             statistics=["Maximum"],
@@ -513,10 +523,14 @@ def generate_rds_dashboard(
         name=name, cloudwatch_data_source=cloudwatch_data_source
     )
 
-    rows = [
-        Row(panels=[cpu_graph, burst_graph]),
-        Row(panels=[connections_graph, freeable_memory_graph, free_storage_graph]),
-        Row(
+    sections = [
+        Section(panels=[cpu_graph, burst_graph], summary=True),
+        Section(
+            title="Connections and Memory",
+            panels=[connections_graph, freeable_memory_graph, free_storage_graph],
+        ),
+        Section(
+            title="Disk and Network",
             panels=[
                 generate_rds_disk_latency_graph(
                     name=name, cloudwatch_data_source=cloudwatch_data_source
@@ -527,20 +541,21 @@ def generate_rds_dashboard(
                 generate_rds_network_throughput_graph(
                     name=name, cloudwatch_data_source=cloudwatch_data_source
                 ),
-            ]
+            ],
         ),
     ]
 
     if engine == "postgres":
-        rows += [
-            Row(
+        sections += [
+            Section(
+                title="Transaction IDs",
                 panels=[
                     generate_rds_transaction_id_graph(
                         name=name,
                         cloudwatch_data_source=cloudwatch_data_source,
                         notifications=notifications,
                     )
-                ]
+                ],
             )
         ]
 
@@ -550,7 +565,7 @@ def generate_rds_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=rows,
+        panels=layout_panels(sections),
         links=[
             get_documentation_link(
                 "https://docs.aws.amazon.com/AmazonRDS/latest/UserGuide/MonitoringOverview.html"
@@ -0,0 +1,254 @@
+"""
+Query fan-out report of a dashboard
+
+Counts the queries a dashboard fires per refresh and per hour, from its JSON
+data. A CloudWatch metric target asks GetMetricData for one metric per
+statistic, alerts evaluate the targets of their conditions at their own
+frequency. Each metric returns one datapoint per period of the time range,
+a SEARCH expression one metric per term. Grafana only queries the panels of
+collapsed rows when they are expanded, dashboards with auto refresh off only
+when they are loaded.
+"""
+
+import math
+import re
+
+from lib.commons import DEFAULT_REFRESH
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# Time range of dashboards without one, Grafana's default
+DEFAULT_TIME_RANGE = "6h"
+# Period Grafana picks for CloudWatch targets without one, by time range
+AUTO_PERIODS = [(3 * 3600, 60), (24 * 3600, 300), (15 * 86400, 3600)]
+AUTO_PERIOD_MAX = 86400
+
+
+def parse_duration(duration) -> int:
+    """Seconds of a Grafana duration like 30s or 1m, plain numbers are seconds"""
+
+    if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+        return int(duration)
+
+    match = re.fullmatch(r"(\d+)([smhdw])", str(duration or "").strip())
+    if not match:
+        raise Exception("Invalid duration {}".format(duration))
+
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def get_data(obj):
+    """JSON data of the dashboard object one level deep, dicts as they are"""
+
+    to_json_data = getattr(obj, "to_json_data", None)
+    return to_json_data() if to_json_data else obj
+
+
+def get_per_hour(duration) -> float:
+    """Number of times something running every duration runs in an hour"""
+
+    return 3600 / parse_duration(duration)
+
+
+def get_time_range(dashboard: dict) -> int:
+    """Seconds of the relative time range of the dashboard, now-1h is 3600"""
+
+    time_range = get_data(dashboard.get("time", {}))
+    start = time_range.get("from", "now-" + DEFAULT_TIME_RANGE)
+    return parse_duration(start[len("now-") :] if start.startswith("now-") else start)
+
+
+def get_period(target: dict, time_range: int) -> int:
+    """Seconds of the period of the CloudWatch target over the time range, a
+    template variable is estimated like the period Grafana picks"""
+
+    period = target.get("period")
+    if period and not str(period).startswith("$"):
+        return parse_duration(period)
+
+    for max_time_range, period in AUTO_PERIODS:
+        if time_range <= max_time_range:
+            return period
+    return AUTO_PERIOD_MAX
+
+
+def get_datapoints(target: dict, time_range: int) -> int:
+    """GetMetricData datapoints the target fetches over the time range"""
+
+    if get_target_kind(target) != "cloudwatch_metrics":
+        return 0
+
+    periods = math.ceil(time_range / get_period(target, time_range))
+    return get_target_queries(target) * get_target_series(target) * periods
+
+
+def iter_panels(dashboard: dict, collapsed=False):
+    """Every panel of the dashboard, including the panels of rows, with
+    whether it is in a collapsed row Grafana only queries when expanded"""
+
+    panels = [(panel, collapsed) for panel in dashboard.get("panels", [])]
+    for row in map(get_data, dashboard.get("rows", [])):
+        panels.extend(
+            (panel, collapsed or bool(row.get("collapse")))
+            for panel in row.get("panels", [])
+        )
+
+    for panel, in_collapsed in panels:
+        panel = get_data(panel)
+        if panel.get("type") != "row":
+            yield panel, in_collapsed
+        yield from iter_panels(
+            {"panels": panel.get("panels", [])},
+            in_collapsed or bool(panel.get("collapsed")),
+        )
+
+
+def get_target_kind(target: dict) -> str:
+    """cloudwatch_metrics, cloudwatch_logs or other"""
+
+    if target.get("queryMode") == "Logs":
+        return "cloudwatch_logs"
+    if target.get("metricName") or target.get("expression"):
+        return "cloudwatch_metrics"
+    return "other"
+
+
+def get_target_queries(target: dict) -> int:
+    """Queries the target fires, one per statistic for CloudWatch metrics"""
+
+    if get_target_kind(target) == "cloudwatch_metrics" and target.get("metricName"):
+        return max(1, len(target.get("statistics") or []))
+    return 1
+
+
+def get_target_series(target: dict) -> int:
+    """Series the target returns, a SEARCH expression returns one per OR'ed
+    term, an estimate as some terms may match no metric"""
+
+    expression = target.get("expression") or ""
+    if expression.startswith("SEARCH("):
+        return expression.count(" OR ") + 1
+    return 1
+
+
+def get_query_counts(targets: list) -> dict:
+    """Queries of the targets by kind"""
+
+    counts = {"cloudwatch_metrics": 0, "cloudwatch_logs": 0, "other": 0}
+    for target in targets:
+        counts[get_target_kind(target)] += get_target_queries(target)
+    return counts
+
+
+def get_alert_report(panel: dict) -> dict:
+    """Evaluation frequency, queries and datapoints of the alert of the panel"""
+
+    alert = get_data(panel["alert"])
+    targets = {target.get("refId"): target for target in panel["targets"]}
+    queries, datapoints = 0, 0
+    for condition in map(get_data, alert.get("conditions", [])):
+        params = condition.get("query", {}).get("params", [])
+        if params and params[0] in targets:
+            target = targets[params[0]]
+            queries += get_target_queries(target)
+            time_range = parse_duration(params[1]) if len(params) > 1 else 3600
+            datapoints += get_datapoints(target, time_range)
+    evaluations_per_hour = get_per_hour(alert.get("frequency") or DEFAULT_REFRESH)
+
+    return {
+        "name": alert.get("name"),
+        "panel": panel.get("title"),
+        "frequency": alert.get("frequency"),
+        "queries_per_evaluation": queries,
+        "queries_per_hour": queries * evaluations_per_hour,
+        "datapoints_per_hour": datapoints * evaluations_per_hour,
+    }
+
+
+def get_dashboard_report(dashboard: dict) -> dict:
+    """Panels, targets, distinct metrics, alerts and estimated queries per
+    hour of the JSON data of the dashboard, its panels may still be dashboard
+    objects"""
+
+    refresh = dashboard.get("refresh", DEFAULT_REFRESH)
+    # Dashboards with auto refresh off only query when loaded
+    refreshes_per_hour = get_per_hour(refresh) if refresh else 0
+    time_range = get_time_range(dashboard)
+    panels, alerts, metrics, targets, loaded_targets = [], [], set(), [], []
+    for panel, collapsed in iter_panels(dashboard):
+        panel_targets = list(map(get_data, panel.get("targets", [])))
+        panel = dict(panel, targets=panel_targets)
+        targets.extend(panel_targets)
+        if not collapsed:
+            loaded_targets.extend(panel_targets)
+        panels.append(
+            {
+                "id": panel.get("id"),
+                "title": panel.get("title"),
+                "type": panel.get("type"),
+                "targets": len(panel_targets),
+                "queries": sum(map(get_target_queries, panel_targets)),
+                "collapsed": collapsed,
+            }
+        )
+        metrics.update(
+            "{}/{}".format(target.get("namespace"), target["metricName"])
+            for target in panel_targets
+            if target.get("metricName")
+        )
+        if panel.get("alert"):
+            alerts.append(get_alert_report(panel))
+
+    queries = get_query_counts(targets)
+    queries_per_refresh = sum(queries.values())
+    dashboard_queries_per_hour = queries_per_refresh * refreshes_per_hour
+    alert_queries_per_hour = sum(alert["queries_per_hour"] for alert in alerts)
+    datapoints = sum(get_datapoints(target, time_range) for target in targets)
+    dashboard_datapoints_per_hour = datapoints * refreshes_per_hour
+    alert_datapoints_per_hour = sum(alert["datapoints_per_hour"] for alert in alerts)
+
+    return {
+        "title": dashboard.get("title"),
+        "refresh": refresh,
+        "panel_count": len(panels),
+        "target_count": len(targets),
+        "panels": panels,
+        "distinct_metrics": sorted(metrics),
+        "alerts": alerts,
+        "queries_per_refresh": queries,
+        "queries_on_load": get_query_counts(loaded_targets),
+        "queries_per_hour": {
+            "dashboard": dashboard_queries_per_hour,
+            "alerts": alert_queries_per_hour,
+            "total": dashboard_queries_per_hour + alert_queries_per_hour,
+        },
+        "datapoints_per_hour": {
+            "dashboard": dashboard_datapoints_per_hour,
+            "alerts": alert_datapoints_per_hour,
+            "total": dashboard_datapoints_per_hour + alert_datapoints_per_hour,
+        },
+    }
+
+
+def get_budget_violations(
+    report: dict, max_queries_per_refresh=0, max_datapoints_per_hour=0
+) -> list:
+    """Budgets the dashboard of the report exceeds, a budget of 0 is unlimited"""
+
+    violations = []
+    queries = report["queries_per_refresh"]["cloudwatch_metrics"]
+    if max_queries_per_refresh and queries > max_queries_per_refresh:
+        violations.append(
+            "{} CloudWatch metric queries per refresh, more than {}".format(
+                queries, max_queries_per_refresh
+            )
+        )
+
+    datapoints = report["datapoints_per_hour"]["total"]
+    if max_datapoints_per_hour and datapoints > max_datapoints_per_hour:
+        violations.append(
+            "{:.0f} GetMetricData datapoints per hour, more than {}".format(
+                datapoints, max_datapoints_per_hour
+            )
+        )
+
+    return violations
@@ -1,7 +1,6 @@
 import re
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     OP_OR,
     RTYPE_MAX,
@@ -17,6 +16,8 @@ from grafanalib.core import (
 
 from lib import colors
 from lib.commons import ALERT_REF_ID, ALERT_THRESHOLD, EDITABLE, TRANSPARENT
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 NAMESPACE = "AWS/SNS"
 PERIOD = "5m"
@@ -26,6 +27,7 @@ SNS_DELIVERED_NOTIFICATIONS = "Delivered"
 SNS_FAILED_NOTIFICATIONS = "Failed"
 
 
+@panel_template("cloudwatch_data_source")
 def create_sns_graph(name: str, cloudwatch_data_source: str, notifications: List[str]):
     """Create SNS graph"""
 
@@ -33,7 +35,7 @@ def create_sns_graph(name: str, cloudwatch_data_source: str, notifications: List
         name = name.split(":")[-1]
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SNS_PUBLISHED_NOTIFICATIONS,
             namespace=NAMESPACE,
             period=PERIOD,
@@ -41,7 +43,7 @@ def create_sns_graph(name: str, cloudwatch_data_source: str, notifications: List
             metricName="NumberOfMessagesPublished",
             dimensions={"TopicName": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SNS_DELIVERED_NOTIFICATIONS,
             namespace=NAMESPACE,
             period=PERIOD,
@@ -49,7 +51,7 @@ def create_sns_graph(name: str, cloudwatch_data_source: str, notifications: List
             metricName="NumberOfNotificationsDelivered",
             dimensions={"TopicName": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SNS_FAILED_NOTIFICATIONS,
             namespace=NAMESPACE,
             period=PERIOD,
@@ -1,6 +1,5 @@
 from typing import List
 
-from grafanalib.cloudwatch import CloudwatchMetricsTarget
 from grafanalib.core import (
     MILLISECONDS_FORMAT,
     OP_OR,
@@ -11,8 +10,8 @@ from grafanalib.core import (
     Dashboard,
     Graph,
     GreaterThan,
-    Row,
     Target,
+    Templating,
     TimeRange,
     YAxes,
     YAxis,
@@ -28,12 +27,18 @@ from lib.commons import (
     TRANSPARENT,
 )
 from lib.lambdas import (
+    create_lambdas_aggregated_sections,
+    create_lambdas_repeated_sections,
+    get_lambda_template,
     lambda_generate_duration_graph,
     lambda_generate_invocations_graph,
     lambda_generate_logs_panel,
     lambda_generate_memory_utilization_graph,
     lambda_generate_memory_utilization_percentage_graph,
 )
+from lib.layout import Section, layout_panels
+from lib.periods import get_cloudwatch_target
+from lib.templates import panel_template
 
 # https://docs.aws.amazon.com/step-functions/latest/dg/procedure-cw-metrics.html
 
@@ -56,6 +61,7 @@ SFN_EXECUTIONS_TIMEDOUT_ALIAS = "Executions - Timeout"
 SFN_EXECUTIONS_TIMEDOUT_REF_ID = "D"
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_sfn_execution_metrics_graph(
     name: str, cloudwatch_data_source: str, notifications: List[str], *args, **kwargs
 ):
@@ -64,21 +70,21 @@ def generate_sfn_execution_metrics_graph(
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SFN_EXECUTIONS_STARTED_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionsStarted",
             statistics=["Sum"],
             dimensions={"StateMachineArn": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SFN_EXECUTIONS_SUCCEEDED_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionsSucceeded",
             statistics=["Sum"],
             dimensions={"StateMachineArn": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SFN_EXECUTIONS_ABORTED_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionsAborted",
@@ -86,7 +92,7 @@ def generate_sfn_execution_metrics_graph(
             dimensions={"StateMachineArn": name},
             refId=SFN_EXECUTIONS_ABORTED_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SFN_EXECUTIONS_FAILED_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionsFailed",
@@ -94,7 +100,7 @@ def generate_sfn_execution_metrics_graph(
             dimensions={"StateMachineArn": name},
             refId=SFN_EXECUTIONS_FAILED_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SFN_EXECUTIONS_THROTTLED_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionsThrottled",
@@ -102,7 +108,7 @@ def generate_sfn_execution_metrics_graph(
             dimensions={"StateMachineArn": name},
             refId=SFN_EXECUTIONS_THROTTLED_REF_ID,
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=SFN_EXECUTIONS_TIMEDOUT_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionsTimedOut",
@@ -206,6 +212,7 @@ def generate_sfn_execution_metrics_graph(
     ).auto_ref_ids()
 
 
+@panel_template("name", "cloudwatch_data_source")
 def generate_sfn_execution_duration_graph(
     name: str, cloudwatch_data_source: str, *args, **kwargs
 ):
@@ -214,21 +221,21 @@ def generate_sfn_execution_duration_graph(
     """
 
     targets = [
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=DURATION_MINIMUM_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionTime",
             statistics=["Minimum"],
             dimensions={"StateMachineArn": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=DURATION_AVERAGE_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionTime",
             statistics=["Average"],
             dimensions={"StateMachineArn": name},
         ),
-        CloudwatchMetricsTarget(
+        get_cloudwatch_target(
             alias=DURATION_MAXIMUM_ALIAS,
             namespace=NAMESPACE,
             metricName="ExecutionTime",
@@ -275,6 +282,8 @@ def generate_sfn_dashboard(
     notifications: List[str],
     environment: str,
     lambdas: List[str],
+    aggregate_lambdas: bool = False,
+    repeat_lambdas: bool = False,
     *args,
     **kwargs,
 ):
@@ -285,6 +294,9 @@ def generate_sfn_dashboard(
     if not name.startswith("arn:aws:states"):
         raise Exception("Statemachine ARN should be provided")
 
+    if aggregate_lambdas and repeat_lambdas:
+        raise Exception("Lambdas can not be both aggregated and repeated")
+
     sfn_name = name.split(":")[-1]
 
     sfn_execution_duration_graph = generate_sfn_execution_duration_graph(
@@ -298,49 +310,59 @@ def generate_sfn_dashboard(
         notifications=notifications,
     )
 
-    rows = [
-        Row(
+    templating = Templating()
+    sections = [
+        Section(
             title="Step Function Execution Metrics",
-            showTitle=True,
             panels=[sfn_execution_duration_graph, sfn_execution_metrics_graph],
+            summary=True,
         )
     ]
 
     if lambdas:
         tags = tags + ["lambda"]
 
-        for lambda_fn in lambdas:
-            lambda_metrics_row = Row(
-                title="{} Lambda Metrics".format(lambda_fn),
-                showTitle=True,
-                collapse=False,
-                panels=[
-                    lambda_generate_invocations_graph(
-                        lambda_fn, cloudwatch_data_source, notifications=[]
-                    ),
-                    lambda_generate_duration_graph(lambda_fn, cloudwatch_data_source),
-                    lambda_generate_memory_utilization_percentage_graph(
-                        lambda_fn,
-                        cloudwatch_data_source,
-                        lambda_insights_namespace,
-                        notifications=notifications,
-                    ),
-                    lambda_generate_memory_utilization_graph(
-                        lambda_fn, cloudwatch_data_source, lambda_insights_namespace
-                    ),
-                ],
+        if aggregate_lambdas:
+            sections += create_lambdas_aggregated_sections(
+                lambdas, cloudwatch_data_source, lambda_insights_namespace
             )
-            lambda_logs_row = Row(
-                title="{} Lambda Logs".format(lambda_fn),
-                showTitle=True,
-                collapse=True,
-                panels=[
-                    lambda_generate_logs_panel(lambda_fn, cloudwatch_data_source),
-                ],
+        elif repeat_lambdas:
+            sections += create_lambdas_repeated_sections(
+                cloudwatch_data_source, lambda_insights_namespace
             )
-
-            rows.append(lambda_metrics_row)
-            rows.append(lambda_logs_row)
+            templating = Templating(list=[get_lambda_template(lambdas)])
+        else:
+            for lambda_fn in lambdas:
+                lambda_metrics_section = Section(
+                    title="{} Lambda Metrics".format(lambda_fn),
+                    panels=[
+                        lambda_generate_invocations_graph(
+                            lambda_fn, cloudwatch_data_source, notifications=[]
+                        ),
+                        lambda_generate_duration_graph(
+                            lambda_fn, cloudwatch_data_source
+                        ),
+                        lambda_generate_memory_utilization_percentage_graph(
+                            lambda_fn,
+                            cloudwatch_data_source,
+                            lambda_insights_namespace,
+                            notifications=notifications,
+                        ),
+                        lambda_generate_memory_utilization_graph(
+                            lambda_fn, cloudwatch_data_source, lambda_insights_namespace
+                        ),
+                    ],
+                )
+                lambda_logs_section = Section(
+                    title="{} Lambda Logs".format(lambda_fn),
+                    collapsed=True,
+                    panels=[
+                        lambda_generate_logs_panel(lambda_fn, cloudwatch_data_source),
+                    ],
+                )
+
+                sections.append(lambda_metrics_section)
+                sections.append(lambda_logs_section)
 
     return Dashboard(
         title="{}{}".format(SFN_DASHBOARD_PREFIX, sfn_name),
@@ -348,6 +370,7 @@ def generate_sfn_dashboard(
         tags=tags,
         timezone=TIMEZONE,
         sharedCrosshair=SHARED_CROSSHAIR,
-        rows=rows,
+        panels=layout_panels(sections),
+        templating=templating,
         refresh=DEFAULT_REFRESH,
     ).auto_panel_ids()
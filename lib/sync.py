@@ -0,0 +1,206 @@
+"""
+Push rendered dashboards to the Grafana HTTP API
+"""
+
+import base64
+import http.client
+import itertools
+import json
+import queue
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import get_content_hash
+
+# Responses worth retrying, Grafana is overloaded or restarting
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# The content hash of a synced dashboard is stored as one of its tags
+HASH_TAG_PREFIX = "content-hash:"
+SEARCH_LIMIT = 5000
+
+
+class GrafanaError(Exception):
+    """Grafana API request failed"""
+
+    def __init__(self, status, message: str):
+        super().__init__("HTTP {}: {}".format(status, message) if status else message)
+        self.status = status
+
+
+class GrafanaClient:
+    """Grafana API client sharing a pool of keep-alive connections"""
+
+    def __init__(
+        self, url, auth=None, concurrency=4, retries=3, backoff=0.5, timeout=30
+    ):
+        url = urllib.parse.urlsplit(url)
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.path = url.path.rstrip("/")
+        self.headers = {"Content-Type": "application/json"}
+        if auth and ":" in auth:
+            self.headers["Authorization"] = "Basic {}".format(
+                str(base64.b64encode(auth.encode("utf-8")), "utf-8")
+            )
+        elif auth:
+            self.headers["Authorization"] = "Bearer {}".format(auth)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.connections = queue.LifoQueue()
+        for _ in range(concurrency):
+            self.connections.put(None)
+
+    def send(self, connection, method: str, path: str, body: bytes):
+        """Send one request over the connection, returns status and body"""
+
+        connection.request(method, self.path + path, body=body, headers=self.headers)
+        response = connection.getresponse()
+        data = response.read()
+        if response.will_close:
+            connection.close()
+
+        return response.status, response.getheader("Retry-After"), data
+
+    def request(self, method: str, path: str, data=None):
+        """Send a request with retries, returns the decoded JSON response"""
+
+        body = json.dumps(data).encode("utf-8") if data is not None else None
+        connection = self.connections.get() or self.connection_class(
+            self.netloc, timeout=self.timeout
+        )
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    status, retry_after, response = self.send(
+                        connection, method, path, body
+                    )
+                except (OSError, http.client.HTTPException) as e:
+                    # Timeouts are OSErrors too, a stalled Grafana is retried
+                    connection.close()
+                    status, retry_after, response = None, None, str(e)
+
+                if status and status < 400:
+                    return json.loads(response) if response else None
+
+                if status not in RETRY_STATUSES + [None] or attempt == self.retries:
+                    break
+
+                delay = self.backoff * 2**attempt
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                time.sleep(delay)
+        finally:
+            self.connections.put(connection)
+
+        if isinstance(response, bytes):
+            response = response.decode("utf-8", "replace")
+        raise GrafanaError(status, response)
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+
+        while not self.connections.empty():
+            connection = self.connections.get()
+            if connection:
+                connection.close()
+
+
+def get_existing_hashes(client: GrafanaClient) -> dict:
+    """Content hashes of the dashboards in Grafana, keyed by folder uid and title"""
+
+    hashes = {}
+    for page in itertools.count(1):
+        query = {"type": "dash-db", "limit": SEARCH_LIMIT, "page": page}
+        results = client.request("GET", "/api/search?" + urllib.parse.urlencode(query))
+        for result in results:
+            content_hashes = [
+                tag[len(HASH_TAG_PREFIX) :]
+                for tag in result.get("tags", [])
+                if tag.startswith(HASH_TAG_PREFIX)
+            ]
+            hashes[(result.get("folderUid"), result["title"])] = (
+                content_hashes[0] if content_hashes else None
+            )
+        if len(results) < SEARCH_LIMIT:
+            return hashes
+
+
+def post_dashboard(client: GrafanaClient, dashboard: dict, folder_uid=None) -> dict:
+    """Create or update the dashboard in the folder"""
+
+    data = {
+        "dashboard": dashboard,
+        "overwrite": True,
+        "message": "Synced by grafana-dashboards",
+    }
+    if folder_uid:
+        data["folderUid"] = folder_uid
+
+    return client.request("POST", "/api/dashboards/db", data)
+
+
+def sync_dashboards(client: GrafanaClient, dashboards: list, dry_run=False) -> tuple:
+    """
+    Post (id, folder uid, dashboard JSON) tuples that changed folder by folder,
+    at most client.concurrency at a time, returns the results and errors by id
+    """
+
+    existing = get_existing_hashes(client)
+    folders = {}
+    for dashboard_id, folder_uid, dashboard in dashboards:
+        folders.setdefault(folder_uid, []).append((dashboard_id, dashboard))
+
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=client.concurrency) as pool:
+        for folder_uid, folder in folders.items():
+            futures = []
+            for dashboard_id, dashboard in folder:
+                dashboard = json.loads(dashboard)
+                content_hash = get_content_hash(dashboard)
+                key = (folder_uid, dashboard.get("title"))
+                if key not in existing:
+                    results[dashboard_id] = {"action": "created"}
+                elif existing[key] == content_hash:
+                    results[dashboard_id] = {"action": "skipped"}
+                    continue
+                else:
+                    results[dashboard_id] = {"action": "updated"}
+
+                if not dry_run:
+                    dashboard["tags"] = dashboard.get("tags", []) + [
+                        HASH_TAG_PREFIX + content_hash
+                    ]
+                    futures.append(
+                        (
+                            dashboard_id,
+                            pool.submit(post_dashboard, client, dashboard, folder_uid),
+                        )
+                    )
+
+            for dashboard_id, future in futures:
+                try:
+                    results[dashboard_id].update(future.result())
+                except Exception as e:
+                    del results[dashboard_id]
+                    errors[dashboard_id] = "{}: {}".format(type(e).__name__, e)
+
+    return results, errors
+
+
+def get_report(results: dict) -> dict:
+    """Count the created, updated and skipped dashboards"""
+
+    report = {action: 0 for action in ["created", "updated", "skipped"]}
+    for result in results.values():
+        report[result["action"]] += 1
+
+    report["dashboards"] = results
+    return report
@@ -0,0 +1,180 @@
+"""
+Precompiled panel templates
+
+A panel builder decorated with panel_template is rendered once per combination
+of its other arguments with placeholders for its variables. Later calls fill
+the cached JSON skeleton with the variables instead of building the grafanalib
+objects again.
+
+A panel builder decorated with memoized_panel keeps the JSON of the panels it
+built in an LRU memo, keyed on all its arguments, for panels shared by several
+dashboards of a batch.
+"""
+
+import collections
+import contextlib
+import functools
+import inspect
+import json
+
+import attr
+
+from lib import get_json_data
+
+PLACEHOLDER = "@@template-{}@@"
+
+# Precompiled panel builders, and the JSON skeletons of the panels they built
+BUILDERS = []
+SKELETONS = {}
+
+enabled = False
+
+# LRU memo of the JSON of built panels, disabled with a size of 0
+MEMO = collections.OrderedDict()
+MEMO_STATS = {"hits": 0, "misses": 0}
+
+memo_size = 0
+
+# Rendering options changing the panels builders build, part of their keys
+key_context = {}
+
+
+@contextlib.contextmanager
+def precompiled_panels(enable=True):
+    """Render the panel builders from precompiled templates in this context"""
+
+    global enabled
+    previous, enabled = enabled, enable
+    try:
+        yield
+    finally:
+        enabled = previous
+
+
+@contextlib.contextmanager
+def memoized_panels(size: int):
+    """Keep the JSON of the last size panels built by memoized builders in
+    this context, the memo outlives the context for the next dashboards"""
+
+    global memo_size
+    previous, memo_size = memo_size, size
+    try:
+        yield
+    finally:
+        memo_size = previous
+
+
+def get_key(builder, arguments: inspect.BoundArguments, exclude=()) -> tuple:
+    """Key of the builder called with the arguments"""
+
+    return (
+        builder.__module__,
+        builder.__qualname__,
+        json.dumps(
+            {
+                name: value
+                for name, value in arguments.arguments.items()
+                if name not in exclude
+            },
+            sort_keys=True,
+            default=repr,
+        ),
+        json.dumps(key_context, sort_keys=True),
+    )
+
+
+def get_skeleton(panel) -> tuple:
+    """JSON of the panel without its id and span, which are set per dashboard"""
+
+    data = get_json_data(attr.evolve(panel, id=None, span=None))
+    return json.dumps(data), panel.id, panel.span
+
+
+@attr.s
+class PrecompiledPanel(object):
+    """Panel rendered from a precompiled JSON skeleton"""
+
+    skeleton = attr.ib()
+    values = attr.ib()
+    id = attr.ib(default=None)
+    span = attr.ib(default=None)
+    gridPos = attr.ib(default=None)
+
+    def _map_panels(self, f):
+        return f(self)
+
+    def to_json_data(self):
+        data = self.skeleton
+        for variable, value in self.values.items():
+            data = data.replace(PLACEHOLDER.format(variable), json.dumps(value)[1:-1])
+        data = json.loads(data)
+        data["id"] = self.id
+        data["span"] = self.span
+        if self.gridPos:
+            data["gridPos"] = self.gridPos.to_json_data()
+        return data
+
+
+def panel_template(*variables):
+    """Precompile the panel builder, variables are the names of the string
+    arguments substituted in the skeleton, the other arguments key it"""
+
+    def decorator(builder):
+        signature = inspect.signature(builder)
+
+        @functools.wraps(builder)
+        def build(*args, **kwargs):
+            if not enabled:
+                return builder(*args, **kwargs)
+
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            values = {variable: arguments.arguments[variable] for variable in variables}
+            if not all(isinstance(value, str) for value in values.values()):
+                return builder(*args, **kwargs)
+
+            key = get_key(builder, arguments, exclude=variables)
+            if key not in SKELETONS:
+                for variable in variables:
+                    arguments.arguments[variable] = PLACEHOLDER.format(variable)
+                SKELETONS[key] = get_skeleton(
+                    builder(*arguments.args, **arguments.kwargs)
+                )
+
+            skeleton, id, span = SKELETONS[key]
+            return PrecompiledPanel(skeleton, values, id=id, span=span)
+
+        build.builder = builder
+        build.variables = variables
+        BUILDERS.append(build)
+        return build
+
+    return decorator
+
+
+def memoized_panel(builder):
+    """Memoize the JSON of the panels built by the builder"""
+
+    signature = inspect.signature(builder)
+
+    @functools.wraps(builder)
+    def build(*args, **kwargs):
+        if not memo_size:
+            return builder(*args, **kwargs)
+
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        key = get_key(builder, arguments)
+        if key in MEMO:
+            MEMO_STATS["hits"] += 1
+            MEMO.move_to_end(key)
+        else:
+            MEMO_STATS["misses"] += 1
+            MEMO[key] = get_skeleton(builder(*args, **kwargs))
+            if len(MEMO) > memo_size:
+                MEMO.popitem(last=False)
+
+        data, id, span = MEMO[key]
+        return PrecompiledPanel(data, {}, id=id, span=span)
+
+    return build
@@ -0,0 +1,68 @@
+"""
+Generator daemon of bin.py serve, only imported by the serve command so that
+rendering a dashboard does not import the socket modules.
+"""
+
+import json
+import os
+import socketserver
+
+from client import make_socket_dir
+
+
+class GeneratorRequestHandler(socketserver.StreamRequestHandler):
+    """Render one dashboard per connection for client.py"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            self.server.check_generator_version()
+            response = self.server.render(request["argv"])
+        except Exception as e:
+            # client.py renders in-process and reports the error itself
+            response = {"error": str(e)}
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class GeneratorServer(socketserver.UnixStreamServer):
+    """Unix socket server keeping the generator loaded, render returns the
+    stdout, stderr and exit status of the cli arguments and get_version the
+    digest of the generator sources"""
+
+    idle = False
+
+    def __init__(self, socket_path: str, render, get_version):
+        self.render = render
+        self.get_version = get_version
+        super().__init__(socket_path, GeneratorRequestHandler)
+
+    def server_bind(self):
+        # The generator is loaded after binding, from these sources
+        self.generator_version = self.get_version()
+        # Only the current user can connect, from the moment the socket exists
+        umask = os.umask(0o077)
+        try:
+            make_socket_dir(self.server_address)
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def check_generator_version(self):
+        """Stop once the generator sources changed, the loaded generator would
+        render and cache the dashboards of the old sources under the key of the
+        new ones"""
+
+        if self.get_version() != self.generator_version:
+            self.idle = True
+            raise Exception("Generator sources changed since the daemon started")
+
+    def handle_timeout(self):
+        self.idle = True
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
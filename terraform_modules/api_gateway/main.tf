@@ -7,6 +7,10 @@ variable "grafana_configuration" {
     notifications          = list(string)
     lambdas                = list(string)
     folder                 = string
+    time_profile           = optional(string)
+    refresh                = optional(string)
+    time_range             = optional(string)
+    refresh_intervals      = optional(list(string))
   })
 }
 
@@ -18,17 +22,27 @@ variable "enable" {
 locals {
   notification_args = try(length(var.grafana_configuration.notifications), 0) > 0 ? flatten(["--notifications", var.grafana_configuration.notifications]) : []
   lambda_args       = try(length(var.grafana_configuration.lambdas), 0) > 0 ? flatten(["--lambdas", var.grafana_configuration.lambdas]) : []
+  time_args = concat(
+    var.grafana_configuration.time_profile == null ? [] : ["--time-profile", var.grafana_configuration.time_profile],
+    var.grafana_configuration.refresh == null ? [] : ["--refresh", var.grafana_configuration.refresh],
+    var.grafana_configuration.time_range == null ? [] : ["--time-range", var.grafana_configuration.time_range],
+    try(length(var.grafana_configuration.refresh_intervals), 0) > 0 ? flatten(["--refresh-intervals", var.grafana_configuration.refresh_intervals]) : [],
+  )
 }
 data "external" "dashboard" {
   count = var.enable ? 1 : 0
   program = flatten([
     "python3",
-    "${path.module}/../../bin.py",
+    "${path.module}/../../client.py",
     "--name",
     var.grafana_configuration.name,
     "--environment",
     var.grafana_configuration.environment,
+    "--compact",
+    "--prune-defaults",
+    "--gzip",
     local.notification_args,
+    local.time_args,
     "--cw",
     var.grafana_configuration.cloudwatch_data_source,
     "api-gateway",
@@ -39,7 +53,7 @@ data "external" "dashboard" {
 resource "grafana_dashboard" "this" {
   count       = var.enable ? 1 : 0
   folder      = var.grafana_configuration.folder
-  config_json = base64decode(data.external.dashboard[0].result.base64EncodedJson)
+  config_json = base64gunzip(data.external.dashboard[0].result.base64gzip)
 }
 
 output "output" {
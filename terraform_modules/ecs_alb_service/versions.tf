@@ -1,4 +1,5 @@
 terraform {
+  experiments      = [module_variable_optional_attrs]
   required_version = "~> 1.1.0"
   required_providers {
     grafana = {
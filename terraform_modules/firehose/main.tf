@@ -4,6 +4,10 @@ variable "grafana_configuration" {
     environment          = string
     influxdb_data_source = string
     folder               = string
+    time_profile         = optional(string)
+    refresh              = optional(string)
+    time_range           = optional(string)
+    refresh_intervals    = optional(list(string))
   })
 }
 
@@ -14,6 +18,12 @@ variable "enable" {
 
 locals {
   dahboard_path = "${path.module}/dashboard.json"
+  time_args = concat(
+    var.grafana_configuration.time_profile == null ? [] : ["--time-profile", var.grafana_configuration.time_profile],
+    var.grafana_configuration.refresh == null ? [] : ["--refresh", var.grafana_configuration.refresh],
+    var.grafana_configuration.time_range == null ? [] : ["--time-range", var.grafana_configuration.time_range],
+    try(length(var.grafana_configuration.refresh_intervals), 0) > 0 ? flatten(["--refresh-intervals", var.grafana_configuration.refresh_intervals]) : [],
+  )
 }
 
 resource "null_resource" "generate_dashboard" {
@@ -21,7 +31,7 @@ resource "null_resource" "generate_dashboard" {
   count = var.enable ? 1 : 0
 
   provisioner "local-exec" {
-    command = "python3 ${path.module}/../../bin.py --name firehose --environment ${var.grafana_configuration.environment} --influxdb_data_source ${var.grafana_configuration.influxdb_data_source} firehose | json_pp > ${local.dahboard_path}"
+    command = "python3 ${path.module}/../../client.py --name firehose --environment ${var.grafana_configuration.environment} --influxdb_data_source ${var.grafana_configuration.influxdb_data_source} ${join(" ", local.time_args)} firehose | json_pp > ${local.dahboard_path}"
   }
 
   triggers = {
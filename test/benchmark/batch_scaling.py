@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of the parallel batch rendering.
+
+Renders a manifest of dashboards of every service with bin.py batch --jobs N
+for a range of job counts and reports the wall time, speedup and parallel
+efficiency of each against a single job.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from cli_startup import ROOT_DIR, save
+
+RESULTS = os.path.join(os.path.dirname(__file__), "results", "batch_scaling.json")
+
+SPECS = [
+    {"service": "lambda", "trigger": "sns", "topics": ["topic-1", "topic-2"]},
+    {"service": "lambda", "trigger": "sqs", "fifo": True},
+    {"service": "api-gateway", "lambdas": ["lambda-1", "lambda-2", "lambda-3"]},
+    {
+        "service": "step-function",
+        "name": "arn:aws:states:eu-west-1:1234567890:stateMachine:benchmark",
+        "lambdas": ["lambda-1", "lambda-2", "lambda-3"],
+    },
+    {"service": "firehose"},
+    {"service": "elasticache-redis", "cache_cluster_id": "redis"},
+    {"service": "elasticsearch", "client_id": "1234567890"},
+    {"service": "rds", "engine": "postgres"},
+    {
+        "service": "ecs-alb-service",
+        "loadbalancer": "app/lb/1",
+        "target_group": "targetgroup/tg/1",
+        "cluster_name": "cluster",
+        "max": 4,
+    },
+]
+
+
+def parse_options():  # pragma: no cover
+    """
+    parse cli
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--dashboards", type=int, default=1000, help="Dashboards in the manifest"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16],
+        help="Job counts to benchmark",
+    )
+    parser.add_argument("--output", type=str, default=RESULTS, help="Results file")
+    return parser.parse_args()
+
+
+def get_manifest(dashboards: int) -> list:
+    """Manifest of dashboards cycling through the services"""
+
+    manifest = []
+    for i in range(dashboards):
+        spec = {
+            "id": "dashboard-{}".format(i),
+            "name": "dashboard-{}".format(i),
+            "environment": "benchmark",
+            "cloudwatch_data_source": "cloudwatch",
+            "influxdb_data_source": "influxdb",
+            "elasticsearch_data_source": "elasticsearch",
+            "lucene_query": "level:error",
+            "notifications": ["slack"],
+        }
+        spec.update(SPECS[i % len(SPECS)])
+        manifest.append(spec)
+
+    return manifest
+
+
+def run_batch(manifest_path: str, jobs: int) -> float:
+    """Run bin.py batch in a fresh interpreter, returns the wall time in ms"""
+
+    start = time.perf_counter()
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(ROOT_DIR, "bin.py"),
+            "batch",
+            "--manifest",
+            manifest_path,
+            "--jobs",
+            str(jobs),
+        ],
+        cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():  # pragma: no cover
+    """
+    main
+    """
+    args = parse_options()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json") as manifest:
+        json.dump(get_manifest(args.dashboards), manifest)
+        manifest.flush()
+        wall_times = {jobs: run_batch(manifest.name, jobs) for jobs in args.jobs}
+
+    # Speedup and efficiency against the smallest job count, 1 by default
+    base_jobs = min(wall_times)
+    results = {
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "dashboards": args.dashboards,
+        "jobs": {
+            str(jobs): {
+                "wall_time_ms": wall_time,
+                "speedup": wall_times[base_jobs] / wall_time,
+                "efficiency": wall_times[base_jobs] / wall_time * base_jobs / jobs,
+            }
+            for jobs, wall_time in wall_times.items()
+        },
+    }
+
+    print("{} dashboards, {} cpus".format(args.dashboards, os.cpu_count()))
+    for jobs, result in results["jobs"].items():
+        print(
+            "{:>3} jobs {:>10.1f} ms {:>6.2f}x speedup {:>6.0%} efficiency".format(
+                int(jobs),
+                result["wall_time_ms"],
+                result["speedup"],
+                result["efficiency"],
+            )
+        )
+
+    save(results, args.output)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
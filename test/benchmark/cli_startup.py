@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for every bin.py subcommand.
+
+Measures the wall time, the `-X importtime` breakdown and the peak RSS of fresh
+interpreters rendering one dashboard per service in dispatcher(), saves them as
+JSON and compares them against the baselines. The imported modules do not
+depend on the machine, their baseline is committed. Timings and memory only
+compare on one machine, their baseline is recorded next to the results.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "cli_startup.json")
+RESULTS = os.path.join(os.path.dirname(__file__), "results", "cli_startup.json")
+TIMING_BASELINE = os.path.join(
+    os.path.dirname(__file__), "results", "cli_startup_baseline.json"
+)
+
+sys.path.append(ROOT_DIR)
+
+from bin import DISPATCHERS  # noqa: E402
+
+GLOBAL_ARGS = [
+    "--notifications",
+    "slack",
+    # Measure rendering, not render cache hits
+    "--no-cache",
+    "--name",
+    "arn:aws:states:eu-west-1:1234567890:stateMachine:benchmark",
+    "--environment",
+    "benchmark",
+    "--cw",
+    "cloudwatch",
+    "--influxdb_data_source",
+    "influxdb",
+    "--es",
+    "elasticsearch",
+    "--lucene-query",
+    "level:error",
+]
+
+SUBCOMMAND_ARGS = {
+    "lambda": ["lambda", "sns", "--topics", "topic-1", "topic-2"],
+    "api-gateway": ["api-gateway", "--lambdas", "lambda-1", "lambda-2"],
+    "step-function": ["step-function", "--lambdas", "lambda-1", "lambda-2"],
+    "firehose": ["firehose"],
+    "elasticache-redis": ["elasticache-redis", "--cache_cluster_id", "redis"],
+    "elasticsearch": ["elasticsearch", "--client_id", "1234567890"],
+    "rds": ["rds", "--engine", "postgres"],
+    "ecs-alb-service": [
+        "ecs-alb-service",
+        "--loadbalancer",
+        "app/lb/1",
+        "--target-group",
+        "targetgroup/tg/1",
+        "--cluster-name",
+        "cluster",
+        "--max",
+        "4",
+    ],
+}
+
+# Metrics compared against the baseline of the machine, a regression is a
+# growth beyond the tolerance factor
+TIMING_METRICS = ["wall_time_ms", "import_time_ms", "peak_rss_kb"]
+# Metrics compared against the committed baseline, importing more modules is a
+# regression regardless of the machine
+MODULE_METRICS = ["imported_modules"]
+
+
+def parse_options():  # pragma: no cover
+    """
+    parse cli
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs per subcommand")
+    parser.add_argument("--output", type=str, default=RESULTS, help="Results file")
+    parser.add_argument(
+        "--baseline", type=str, default=BASELINE, help="Imported modules baseline file"
+    )
+    parser.add_argument(
+        "--timing-baseline",
+        type=str,
+        default=TIMING_BASELINE,
+        help="Timings and memory baseline file of this machine",
+        dest="timing_baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="Allowed growth factor of timings and memory over the baseline",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the timings and memory as the new baseline of this machine",
+        dest="save_baseline",
+    )
+    parser.add_argument(
+        "--save-modules",
+        action="store_true",
+        help="Store the imported modules as the new committed baseline",
+        dest="save_modules",
+    )
+    return parser.parse_args()
+
+
+def run_subcommand(argv: list) -> dict:
+    """Run bin.py in a fresh interpreter, measure wall time and peak RSS"""
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT_DIR, "bin.py")] + argv,
+        cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    stderr = process.stderr.read()
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_time = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode:
+        raise Exception("bin.py {} failed:\n{}".format(" ".join(argv), stderr))
+
+    return {
+        "wall_time_ms": wall_time * 1000,
+        "peak_rss_kb": rusage.ru_maxrss,
+        "imports": parse_import_times(stderr),
+    }
+
+
+def parse_import_times(stderr: str) -> dict:
+    """Parse `-X importtime` output into the self time per module in ms"""
+
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        imports[module.strip()] = int(self_us) / 1000
+
+    return imports
+
+
+def benchmark_subcommand(service: str, runs: int) -> dict:
+    """Benchmark the subcommand, keep the median of every metric"""
+
+    argv = GLOBAL_ARGS + SUBCOMMAND_ARGS[service]
+    measurements = [run_subcommand(argv) for _ in range(runs)]
+    imports = measurements[-1]["imports"]
+    slowest_imports = sorted(imports.items(), key=lambda item: -item[1])[:10]
+
+    return {
+        "argv": argv,
+        "wall_time_ms": statistics.median(m["wall_time_ms"] for m in measurements),
+        "import_time_ms": statistics.median(
+            sum(m["imports"].values()) for m in measurements
+        ),
+        "peak_rss_kb": statistics.median(m["peak_rss_kb"] for m in measurements),
+        "imported_modules": len(imports),
+        "slowest_imports_ms": dict(slowest_imports),
+    }
+
+
+def compare(results: dict, baseline: dict, metrics: list, tolerance: float) -> list:
+    """List the regressions of the metrics of the results against the baseline"""
+
+    regressions = []
+    for service, result in results["subcommands"].items():
+        expected = baseline["subcommands"].get(service)
+        if not expected:
+            continue
+
+        for metric in metrics:
+            allowed = expected[metric] * tolerance
+            if result[metric] > allowed:
+                regressions.append(
+                    "{} {}: {:.1f} > {:.1f} (baseline {:.1f})".format(
+                        service, metric, result[metric], allowed, expected[metric]
+                    )
+                )
+
+    return regressions
+
+
+def get_metrics(results: dict, metrics: list) -> dict:
+    """Results with only the metrics of every subcommand"""
+
+    return dict(
+        results,
+        subcommands={
+            service: {metric: result[metric] for metric in metrics}
+            for service, result in results["subcommands"].items()
+        },
+    )
+
+
+def load(path: str):
+    """Load results saved as JSON, None when there are none"""
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results: dict, path: str) -> None:
+    """Save results as JSON"""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():  # pragma: no cover
+    """
+    main
+    """
+    args = parse_options()
+
+    missing = set(DISPATCHERS) - set(SUBCOMMAND_ARGS)
+    if missing:
+        raise Exception("No benchmark for {}".format(", ".join(sorted(missing))))
+
+    results = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "subcommands": {
+            service: benchmark_subcommand(service, args.runs) for service in DISPATCHERS
+        },
+    }
+
+    for service, result in results["subcommands"].items():
+        print(
+            "{:<20} {:>8.1f} ms wall {:>8.1f} ms import {:>8} KB rss {:>4} modules".format(
+                service,
+                result["wall_time_ms"],
+                result["import_time_ms"],
+                result["peak_rss_kb"],
+                result["imported_modules"],
+            )
+        )
+
+    save(results, args.output)
+
+    if args.save_modules:
+        save(get_metrics(results, MODULE_METRICS), args.baseline)
+    if args.save_baseline:
+        save(get_metrics(results, TIMING_METRICS), args.timing_baseline)
+    if args.save_modules or args.save_baseline:
+        return
+
+    regressions = compare(results, load(args.baseline), MODULE_METRICS, 1)
+    timing_baseline = load(args.timing_baseline)
+    if timing_baseline:
+        regressions += compare(results, timing_baseline, TIMING_METRICS, args.tolerance)
+    else:
+        print(
+            "\nNo timing baseline in {}, record it on this machine with "
+            "make bench-cli-baseline".format(args.timing_baseline)
+        )
+
+    if regressions:
+        print("\nRegressions:")
+        print("\n".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
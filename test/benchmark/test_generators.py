@@ -0,0 +1,117 @@
+"""
+Benchmark of every dashboard generator at realistic scale.
+
+Times the generators rendering the JSON bin.py prints, with pytest-benchmark,
+and records the peak memory of one render with tracemalloc in the extra info
+of every benchmark. Run it with make bench-generators.
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+sys.path.append(ROOT_DIR)
+
+from lib import CanonicalEncoder, get_canonical_json_data  # noqa: E402
+from lib.api_gateways import generate_api_gateways_dashboard  # noqa: E402
+from lib.ecs import generate_ecs_alb_service_dashboard  # noqa: E402
+from lib.elasticache_redis import generate_elasticache_redis_dashboard  # noqa: E402
+from lib.elasticsearch import generate_elasticsearch_dashboard  # noqa: E402
+from lib.lambdas import lambda_sns_sqs_dashboard  # noqa: E402
+from lib.rds import generate_rds_dashboard  # noqa: E402
+from lib.step_functions import generate_sfn_dashboard  # noqa: E402
+
+LAMBDAS = [1, 10, 100, 500]
+TOPICS = [1, 50, 500]
+
+ARGUMENTS = {
+    "name": "benchmark",
+    "environment": "benchmark",
+    "cloudwatch_data_source": "cloudwatch",
+    "influxdb_data_source": "influxdb",
+    "elasticsearch_data_source": "elasticsearch",
+    "lucene_query": "level:error",
+    "lambda_insights_namespace": "LambdaInsights",
+    "notifications": [{"uid": "slack"}],
+}
+
+
+def render(generator, **kwargs) -> str:
+    """Render the dashboard of the generator the way bin.py prints it"""
+
+    dashboard = generator(**dict(ARGUMENTS, **kwargs))
+    return json.dumps(get_canonical_json_data(dashboard), cls=CanonicalEncoder)
+
+
+def run_benchmark(benchmark, generator, **kwargs):
+    """Time the generator and record the peak memory and size of one render"""
+
+    tracemalloc.start()
+    output = render(generator, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.extra_info["peak_memory_kb"] = peak // 1024
+    benchmark.extra_info["output_kb"] = len(output) // 1024
+    benchmark(render, generator, **kwargs)
+
+
+def get_lambdas(count: int) -> list:
+    return ["lambda-{}".format(i) for i in range(count)]
+
+
+@pytest.mark.parametrize("lambdas", LAMBDAS)
+def test_sfn_dashboard(benchmark, lambdas):
+    run_benchmark(
+        benchmark,
+        generate_sfn_dashboard,
+        name="arn:aws:states:eu-west-1:1234567890:stateMachine:benchmark",
+        lambdas=get_lambdas(lambdas),
+    )
+
+
+@pytest.mark.parametrize("lambdas", LAMBDAS)
+def test_api_gateways_dashboard(benchmark, lambdas):
+    run_benchmark(
+        benchmark, generate_api_gateways_dashboard, lambdas=get_lambdas(lambdas)
+    )
+
+
+@pytest.mark.parametrize("topics", TOPICS)
+def test_lambda_sns_sqs_dashboard(benchmark, topics):
+    run_benchmark(
+        benchmark,
+        lambda_sns_sqs_dashboard,
+        topics=["topic-{}".format(i) for i in range(topics)],
+        fifo=False,
+    )
+
+
+def test_ecs_alb_service_dashboard(benchmark):
+    run_benchmark(
+        benchmark,
+        generate_ecs_alb_service_dashboard,
+        cluster_name="cluster",
+        loadbalancer="app/lb/1",
+        target_group="targetgroup/tg/1",
+        max=4,
+    )
+
+
+def test_rds_dashboard(benchmark):
+    run_benchmark(benchmark, generate_rds_dashboard, engine="postgres")
+
+
+def test_elasticache_redis_dashboard(benchmark):
+    run_benchmark(
+        benchmark, generate_elasticache_redis_dashboard, cache_cluster_id="redis"
+    )
+
+
+def test_elasticsearch_dashboard(benchmark):
+    run_benchmark(benchmark, generate_elasticsearch_dashboard, client_id="1234567890")
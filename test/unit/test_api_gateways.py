@@ -5,6 +5,7 @@ from lib.api_gateways import (
     generate_api_gateway_requests_graph,
     generate_api_gateways_dashboard,
 )
+from lib.layout import get_sections
 
 
 class TestAPIGatewayDashboards:
@@ -122,7 +123,7 @@ class TestAPIGatewayDashboards:
         generated_dashboard.annotations.should.be.a(Annotations)
         generated_dashboard.templating.should.be.a(Templating)
         generated_dashboard.tags.should.have.length_of(2)
-        generated_dashboard.rows.should.have.length_of(1)
+        get_sections(generated_dashboard.panels).should.have.length_of(1)
 
     def test_should_generate_proper_dashboard_with_lambdas(self):
         apig_name = "apig-1"
@@ -146,4 +147,35 @@ class TestAPIGatewayDashboards:
         generated_dashboard.annotations.should.be.a(Annotations)
         generated_dashboard.templating.should.be.a(Templating)
         generated_dashboard.tags.should.have.length_of(3)
-        generated_dashboard.rows.should.have.length_of((len(lambdas) * 2) + 1)
+        get_sections(generated_dashboard.panels).should.have.length_of(
+            (len(lambdas) * 2) + 1
+        )
+
+    def test_should_generate_repeated_lambda_rows(self):
+        lambdas = ["lambda-{}".format(i) for i in range(30)]
+
+        generated_dashboard = generate_api_gateways_dashboard(
+            name="apig-1",
+            cloudwatch_data_source="prod",
+            lambda_insights_namespace="insights",
+            notifications=["foo-1"],
+            environment="prod",
+            lambdas=lambdas,
+            repeat_lambdas=True,
+        )
+
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.have.length_of(3)
+        [section.repeat for section in sections].should.eql([None, "lambda", "lambda"])
+        sections[1].title.should.eql("$lambda Lambda Metrics")
+        sections[1].panels[0].targets[0].dimensions.should.eql(
+            {"FunctionName": "$lambda"}
+        )
+        [panel.alert for panel in sections[1].panels].should.eql([None] * 4)
+        template = generated_dashboard.templating.list[0].to_json_data()
+        template["name"].should.eql("lambda")
+        template["type"].should.eql("custom")
+        template["multi"].should.be.true
+        template["includeAll"].should.be.true
+        template["current"]["value"].should.eql("lambda-0")
+        [option["value"] for option in template["options"]].should.eql(lambdas)
@@ -1,6 +1,43 @@
+import base64
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
 from argparse import Namespace
 
-from bin import apply_options, dispatcher
+from bin import (
+    Base64Writer,
+    apply_options,
+    dispatcher,
+    evict_cache,
+    get_base64_encoded_dashboard,
+    get_cache_key,
+    get_manifest_options,
+    print_base64_encoded_json,
+    render_dashboard,
+    render_manifest,
+    run,
+    stream_encoded_json,
+)
+from lib import (
+    CanonicalEncoder,
+    DashboardEncoder,
+    compact_json_data,
+    get_canonical_json_data,
+    get_content_hash,
+    normalize_floats,
+)
+from lib.defaults import apply_dashboard_defaults
+from lib.step_functions import generate_sfn_dashboard
+from lib.templates import MEMO, MEMO_STATS
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "../..")
 
 
 class TestApplyOptions:
@@ -29,3 +66,825 @@ class TestApplyOptions:
         for handler in handlers:
 
             dispatcher().should.have.key(handler)
+
+
+class TestBatch:
+    """Test batch rendering"""
+
+    def test_should_render_every_dashboard_spec_by_id(self):
+        specs = [
+            {
+                "id": "firehose",
+                "service": "firehose",
+                "name": "firehose",
+                "environment": "prod",
+                "influxdb_data_source": "influxdb",
+            },
+            {
+                "id": "lambda-1",
+                "service": "lambda",
+                "trigger": "null",
+                "name": "lambda-1",
+                "environment": "prod",
+                "cloudwatch_data_source": "cloudwatch",
+                "notifications": ["slack-1"],
+            },
+        ]
+
+        rendered, errors = render_manifest(specs)
+
+        errors.should.be.empty
+
+        rendered.should.have.key("firehose")
+        rendered.should.have.key("lambda-1")
+        dashboard = json.loads(
+            base64.b64decode(rendered["lambda-1"]["base64EncodedJson"])
+        )
+        dashboard["title"].should.eql("Lambda: lambda-1")
+
+    def test_should_apply_time_profile_of_spec(self):
+        spec = {
+            "id": "rds",
+            "service": "rds",
+            "name": "db",
+            "environment": "staging",
+            "cloudwatch_data_source": "cloudwatch",
+            "engine": "postgres",
+            "time_profile": "review",
+            "time_range": "30d",
+        }
+
+        rendered, errors = render_manifest([spec])
+
+        errors.should.be.empty
+        dashboard = json.loads(base64.b64decode(rendered["rds"]["base64EncodedJson"]))
+        dashboard["refresh"].should.be.false
+        dashboard["time"].should.eql({"from": "now-30d", "to": "now"})
+        dashboard["timepicker"]["refresh_intervals"].should.eql(
+            ["5m", "15m", "1h", "1d"]
+        )
+
+    def test_should_start_bounded_period_on_time_range_of_spec(self):
+        spec = {
+            "id": "rds",
+            "service": "rds",
+            "name": "db",
+            "environment": "staging",
+            "cloudwatch_data_source": "cloudwatch",
+            "engine": "postgres",
+            "time_range": "7d",
+            "period": "variable",
+            "period_max": "1h",
+        }
+
+        rendered, errors = render_manifest([spec])
+
+        errors.should.be.empty
+        dashboard = json.loads(base64.b64decode(rendered["rds"]["base64EncodedJson"]))
+        [period] = dashboard["templating"]["list"]
+        period["query"].should.eql("1m,5m,15m,1h")
+        period["auto"].should.be.false
+        period["current"]["value"].should.eql("1h")
+
+    def test_should_reject_period_bounds_without_variable_period(self):
+        spec = {
+            "id": "rds",
+            "service": "rds",
+            "name": "db",
+            "environment": "staging",
+            "cloudwatch_data_source": "cloudwatch",
+            "engine": "postgres",
+            "period_max": "1h",
+        }
+
+        rendered, errors = render_manifest([spec, dict(spec, id="auto", period="auto")])
+
+        rendered.should.be.empty
+        errors["rds"].should.contain("only bound the variable period, not period None")
+        errors["auto"].should.contain("only bound the variable period, not period auto")
+        argv = ["--name", "db", "--environment", "prod", "--cw", "cw", "--no-cache"]
+        argv += ["--period-min", "5m", "rds", "--engine", "mysql"]
+        run.when.called_with(argv, io.StringIO()).should.throw(
+            Exception, "Min and max periods only bound the variable period"
+        )
+
+    def test_should_render_same_dashboard_as_cli(self):
+        spec = {
+            "id": "sfn",
+            "service": "step-function",
+            "name": "arn:aws:states:eu-west-1:1234567890:stateMachine:sfn-1",
+            "environment": "prod",
+            "cloudwatch_data_source": "cloudwatch",
+            "lambdas": ["lambda-1", "lambda-2"],
+        }
+        cli_options = apply_options(
+            Namespace(
+                service="step-function",
+                name=spec["name"],
+                environment="prod",
+                cloudwatch_data_source="cloudwatch",
+                influxdb_data_source=None,
+                elasticsearch_data_source=None,
+                lucene_query=None,
+                lambda_insights_namespace="LambdaInsights",
+                notifications=None,
+                lambdas=["lambda-1", "lambda-2"],
+            )
+        )
+
+        rendered, _ = render_manifest([spec])
+
+        base64.b64decode(rendered["sfn"]["base64EncodedJson"]).should.eql(
+            render_dashboard(cli_options).encode("utf-8")
+        )
+
+    def test_should_fail_on_missing_fields(self):
+        get_manifest_options.when.called_with(
+            {"id": "foo", "service": "firehose"}
+        ).should.throw(Exception, "Dashboard spec foo is missing name, environment")
+
+    def test_should_fail_on_unknown_service(self):
+        get_manifest_options.when.called_with(
+            {"id": "foo", "service": "foo", "name": "foo", "environment": "prod"}
+        ).should.throw(Exception, "Dashboard spec foo has an unknown service foo")
+
+    def test_should_fail_on_aggregated_and_repeated_lambdas(self):
+        spec = {
+            "id": "sfn",
+            "service": "step-function",
+            "name": "arn:aws:states:eu-west-1:1234567890:stateMachine:sfn-1",
+            "environment": "prod",
+            "lambdas": ["lambda-1"],
+            "aggregate_lambdas": True,
+            "repeat_lambdas": True,
+        }
+
+        get_manifest_options.when.called_with(spec).should.throw(
+            Exception,
+            "Dashboard spec sfn sets both aggregate_lambdas and repeat_lambdas",
+        )
+        argv = ["--name", spec["name"], "--environment", "prod", "--cw", "cw"]
+        argv += ["step-function", "--aggregate-lambdas", "--repeat-lambdas"]
+        with contextlib.redirect_stderr(io.StringIO()) as err:
+            run.when.called_with(argv, io.StringIO()).should.throw(SystemExit)
+        err.getvalue().should.contain("not allowed with argument --aggregate-lambdas")
+
+    def test_should_fail_on_duplicate_ids(self):
+        spec = {
+            "id": "firehose",
+            "service": "firehose",
+            "name": "firehose",
+            "environment": "prod",
+        }
+
+        render_manifest.when.called_with([spec, spec]).should.throw(
+            Exception, "Duplicate dashboard spec id firehose"
+        )
+
+    def test_should_render_in_parallel_in_manifest_order(self):
+        specs = [
+            {
+                "id": "rds-{}".format(i),
+                "service": "rds",
+                "name": "db-{}".format(i),
+                "environment": "prod",
+                "cloudwatch_data_source": "cloudwatch",
+                "engine": "postgres",
+            }
+            for i in range(8)
+        ]
+
+        rendered, _ = render_manifest(specs, jobs=3)
+
+        list(rendered).should.eql([spec["id"] for spec in specs])
+        rendered.should.eql(render_manifest(specs)[0])
+
+    def test_should_isolate_failing_specs(self):
+        specs = [
+            {"id": "firehose", "service": "firehose", "name": "f", "environment": "p"},
+            # The rds generator needs an engine
+            {"id": "rds", "service": "rds", "name": "db", "environment": "prod"},
+        ]
+
+        for jobs in [1, 2]:
+            rendered, errors = render_manifest(specs, jobs=jobs)
+
+            list(rendered).should.eql(["firehose"])
+            list(errors).should.eql(["rds"])
+
+    def test_should_memoize_shared_lambda_panels(self):
+        lambdas = ["lambda-1", "lambda-2"]
+        specs = [
+            {
+                "id": "lambda-1",
+                "service": "lambda",
+                "trigger": "null",
+                "name": "lambda-1",
+            },
+            {"id": "api", "service": "api-gateway", "name": "api", "lambdas": lambdas},
+            {
+                "id": "sfn",
+                "service": "step-function",
+                "name": "arn:aws:states:eu-west-1:1234567890:stateMachine:sfn",
+                "lambdas": lambdas,
+            },
+        ]
+        specs = [
+            dict(spec, environment="prod", cloudwatch_data_source="cloudwatch")
+            for spec in specs
+        ]
+        MEMO.clear()
+        hits, misses = MEMO_STATS["hits"], MEMO_STATS["misses"]
+
+        rendered, errors = render_manifest([dict(spec, memo_size=16) for spec in specs])
+
+        errors.should.be.empty
+        rendered.should.eql(render_manifest(specs)[0])
+        # The api gateway rows share their panels, the step function reuses
+        # the lambda-1 panels but its invocations graph has no notifications
+        (MEMO_STATS["hits"] - hits).should.eql(5 + 4)
+        (MEMO_STATS["misses"] - misses).should.eql(5 + 5 + 1 + 5)
+        for dashboard in rendered.values():
+            dashboard = base64.b64decode(dashboard["base64EncodedJson"])
+            ids = get_panel_ids(json.loads(dashboard))
+            ids.should_not.be.empty
+            sorted(ids).should.eql(list(range(1, len(ids) + 1)))
+
+
+def get_panel_ids(dashboard: dict) -> list:
+    """Ids of the panels of the dashboard JSON and of its collapsed rows"""
+
+    ids = []
+    for panel in dashboard["panels"]:
+        ids.append(panel["id"])
+        ids += [row_panel["id"] for row_panel in panel.get("panels", [])]
+
+    return ids
+
+
+def get_imported_modules(script: str) -> set:
+    """Run script in a fresh interpreter, return the lib and grafanalib modules"""
+
+    script += (
+        "\nimport sys"
+        "\nprint(' '.join(m for m in sys.modules "
+        "if m.split('.')[0] in ('lib', 'grafanalib')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(output.split())
+
+
+class TestLazyDispatch:
+    """Test that generators are only imported when dispatched"""
+
+    def test_should_not_import_generators_on_startup(self):
+        get_imported_modules("import bin").should.eql(set())
+
+    def test_should_only_import_firehose_generator(self):
+        script = (
+            "import bin\n"
+            "bin.dispatcher()['firehose'](influxdb_data_source='i', environment='p')"
+        )
+
+        get_imported_modules(script).should.eql(
+            {
+                "lib",
+                "lib.colors",
+                "lib.commons",
+                "lib.firehose",
+                "lib.layout",
+                "lib.templates",
+                "grafanalib",
+                "grafanalib.core",
+                "grafanalib.influxdb",
+            }
+        )
+
+    def test_should_only_import_rds_generator(self):
+        script = (
+            "import bin\n"
+            "bin.dispatcher()['rds'](name='db', environment='p',"
+            " influxdb_data_source=None, cloudwatch_data_source='c',"
+            " engine='postgres', notifications=[])"
+        )
+
+        get_imported_modules(script).should.eql(
+            {
+                "lib",
+                "lib.colors",
+                "lib.commons",
+                "lib.layout",
+                "lib.periods",
+                "lib.rds",
+                "lib.report",
+                "lib.templates",
+                "grafanalib",
+                "grafanalib.cloudwatch",
+                "grafanalib.core",
+                "grafanalib.formatunits",
+            }
+        )
+
+
+class TestRenderCache:
+    """Test the render cache"""
+
+    argv = ["--name", "db", "--environment", "prod", "--cw", "cw"]
+
+    def test_should_return_cached_output(self):
+        cache_dir = tempfile.mkdtemp()
+        argv = self.argv + ["--cache-dir", cache_dir, "rds", "--engine", "mysql"]
+        rendered = io.StringIO()
+        run(argv, rendered)
+
+        os.listdir(cache_dir).should.have.length_of(1)
+        cached = io.StringIO()
+        run(argv, cached)
+
+        cached.getvalue().should.eql(rendered.getvalue())
+
+        with open(os.path.join(cache_dir, os.listdir(cache_dir)[0]), "w") as entry:
+            entry.write("cached\n")
+        cached = io.StringIO()
+        run(argv, cached)
+
+        cached.getvalue().should.eql("cached\n")
+
+    def test_should_repeat_warnings_on_cache_hit(self):
+        cache_dir = tempfile.mkdtemp()
+        argv = self.argv + ["--cache-dir", cache_dir, "--on-budget-exceeded", "warn"]
+        argv += ["--budget-queries-per-refresh", "1", "rds", "--engine", "mysql"]
+        rendered, warnings = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stderr(warnings):
+            run(argv, rendered)
+
+        warnings.getvalue().should.contain("Warning: Dashboard RDS: db exceeds")
+        cached, cached_warnings = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stderr(cached_warnings):
+            run(argv, cached)
+
+        cached.getvalue().should.eql(rendered.getvalue())
+        cached_warnings.getvalue().should.eql(warnings.getvalue())
+
+    def test_should_skip_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        argv = self.argv + ["--cache-dir", cache_dir, "--no-cache", "rds"]
+        argv += ["--engine", "mysql"]
+        run(argv, io.StringIO())
+
+        os.listdir(cache_dir).should.be.empty
+
+    def test_should_not_import_lib_on_cache_hit(self):
+        cache_dir = tempfile.mkdtemp()
+        argv = self.argv + ["--cache-dir", cache_dir, "rds", "--engine", "mysql"]
+        run(argv, io.StringIO())
+        script = "import io, bin\nbin.run({}, io.StringIO())".format(argv)
+
+        get_imported_modules(script).should.eql(set())
+
+    def test_should_key_on_options(self):
+        args = Namespace(name="db", engine="mysql", no_cache=False, cache_dir="a")
+
+        get_cache_key(args).should.eql(
+            get_cache_key(
+                Namespace(engine="mysql", name="db", no_cache=True, cache_dir="b")
+            )
+        )
+        get_cache_key(args).shouldnt.eql(
+            get_cache_key(Namespace(name="db", engine="postgres"))
+        )
+
+    def test_should_evict_least_recently_used_entries(self):
+        cache_dir = tempfile.mkdtemp()
+        now = time.time()
+        for age, key in enumerate(["new", "old", "oldest"]):
+            with open(os.path.join(cache_dir, key), "w") as entry:
+                entry.write("x" * 10)
+            os.utime(os.path.join(cache_dir, key), (now - age, now - age))
+
+        with open(os.path.join(cache_dir, "oldest.stderr"), "w") as warnings:
+            warnings.write("Warning\n")
+
+        evict_cache(cache_dir, 20)
+
+        sorted(os.listdir(cache_dir)).should.eql(["new", "old"])
+
+
+class TestProfile:
+    """Test profiling a render"""
+
+    argv = ["--name", "db", "--environment", "prod", "--cw", "cw"]
+
+    def test_should_write_profile_without_changing_output(self):
+        cache_dir = tempfile.mkdtemp()
+        path = os.path.join(cache_dir, "profile.txt")
+        argv = self.argv + ["--cache-dir", cache_dir, "rds", "--engine", "mysql"]
+        rendered = io.StringIO()
+        run(["--no-cache"] + argv, rendered)
+        profiled = io.StringIO()
+
+        run(["--profile={}".format(path)] + argv, profiled)
+
+        profiled.getvalue().should.eql(rendered.getvalue())
+        os.listdir(cache_dir).should.eql(["profile.txt"])
+        with open(path) as profile:
+            report = profile.read()
+        phases = ["arguments", "import", "build", "ids", "json", "base64", "total"]
+        [line.split()[0] for line in report.splitlines()[1:8]].should.eql(phases)
+        report.should.contain("function calls")
+
+    def test_should_write_profile_to_stderr(self):
+        argv = ["--profile"] + self.argv + ["rds", "--engine", "mysql"]
+        stderr = io.StringIO()
+
+        with contextlib.redirect_stderr(stderr):
+            run(argv, io.StringIO())
+
+        stderr.getvalue().should.match(r"^Phase timings\n")
+
+
+class NullWriter:
+    def write(self, text):
+        pass
+
+
+class TestStreaming:
+    """Test the streaming output"""
+
+    def get_dashboard(self, lambdas=50):
+        return generate_sfn_dashboard(
+            name="arn:aws:states:eu-west-1:1234567890:stateMachine:sfn-1",
+            cloudwatch_data_source="cw",
+            lambda_insights_namespace="LambdaInsights",
+            notifications=[{"uid": "slack"}],
+            environment="prod",
+            lambdas=["lambda-{}".format(i) for i in range(lambdas)],
+        )
+
+    def test_should_base64_encode_chunks(self):
+        text = "lorem ipsum – dolor sit amet 📈 " * 5000
+
+        for chunk_size in [1, 2, 7, 1000, 100000]:
+            out = io.StringIO()
+            writer = Base64Writer(out)
+            for i in range(0, len(text), chunk_size):
+                writer.write(text[i : i + chunk_size])
+            writer.close()
+
+            out.getvalue().should.eql(
+                str(base64.b64encode(text.encode("utf-8")), "utf-8")
+            )
+
+    def test_should_stream_same_output(self):
+        dashboard = self.get_dashboard()
+        expected = io.StringIO()
+        print_base64_encoded_json(
+            get_base64_encoded_dashboard(
+                json.dumps(get_canonical_json_data(dashboard), cls=CanonicalEncoder)
+            ),
+            expected,
+        )
+        streamed = io.StringIO()
+
+        stream_encoded_json(dashboard, streamed)
+
+        streamed.getvalue().should.eql(expected.getvalue())
+
+    def test_should_not_build_the_dashboard_json_in_memory(self):
+        # Large enough for the gzip compressor state not to count
+        dashboard = self.get_dashboard(lambdas=200)
+        dashboard_json = json.dumps(dashboard.to_json_data(), cls=DashboardEncoder)
+
+        for options in [
+            {},
+            {"compact": True},
+            {"prune_defaults": True},
+            {"compact": True, "prune_defaults": True, "gzip": True},
+        ]:
+            tracemalloc.start()
+            stream_encoded_json(dashboard, NullWriter(), **options)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            peak.should.be.lower_than(len(dashboard_json) / 4)
+
+
+EXAMPLE_ARGV = [
+    "--notifications",
+    "slack",
+    "--name",
+    "arn:aws:states:eu-west-1:1234567890:stateMachine:example",
+    "--environment",
+    "prod",
+    "--cw",
+    "cloudwatch",
+    "--influxdb_data_source",
+    "influxdb",
+    "--es",
+    "elasticsearch",
+    "--lucene-query",
+    "level:error",
+    "--no-cache",
+]
+
+EXAMPLE_SUBCOMMANDS = [
+    ["lambda", "sns", "--topics", "topic-1", "topic-2"],
+    ["lambda", "sqs", "--fifo"],
+    ["api-gateway", "--lambdas", "lambda-1", "lambda-2"],
+    ["step-function", "--lambdas", "lambda-1", "lambda-2"],
+    ["firehose"],
+    ["elasticache-redis", "--cache_cluster_id", "redis"],
+    ["elasticsearch", "--client_id", "1234567890"],
+    ["rds", "--engine", "postgres"],
+    ["ecs-alb-service", "--loadbalancer", "lb", "--target-group", "tg"]
+    + ["--cluster-name", "cluster", "--max", "4"],
+]
+# 0 turns hash randomization off, the others randomize it differently
+HASH_SEEDS = [0, 1, 42, 1234]
+
+
+def render_example(options: list, subcommand: list) -> dict:
+    out = io.StringIO()
+    run(EXAMPLE_ARGV + options + subcommand, out)
+    return json.loads(out.getvalue())
+
+
+class TestCompactOutput:
+    """Test the compact and gzip output"""
+
+    def test_should_drop_null_and_empty_fields(self):
+        compact_json_data(
+            {
+                "a": None,
+                "b": "",
+                "c": [],
+                "d": {"e": {}, "f": None},
+                "g": [None, {"h": 0, "i": False}],
+            }
+        ).should.eql({"g": [None, {"h": 0, "i": False}]})
+
+    def test_should_shrink_example_dashboards(self):
+        for subcommand in EXAMPLE_SUBCOMMANDS:
+            default = render_example([], subcommand)["base64EncodedJson"]
+            compact = render_example(["--compact"], subcommand)["base64EncodedJson"]
+            gzipped = render_example(["--compact", "--gzip"], subcommand)["base64gzip"]
+
+            len(compact).should.be.lower_than(len(default) * 0.8)
+            len(gzipped).should.be.lower_than(len(compact) * 0.5)
+            json.loads(base64.b64decode(compact)).should.eql(
+                compact_json_data(json.loads(base64.b64decode(default)))
+            )
+            zlib.decompress(base64.b64decode(gzipped), 16 + zlib.MAX_WBITS).should.eql(
+                base64.b64decode(compact)
+            )
+
+
+def get_grafana_defaults() -> dict:
+    """Defaults Grafana fills in when loading a dashboard, from its sources"""
+
+    path = os.path.join(ROOT_DIR, "test/fixtures/grafana_defaults/v8.3.json")
+    with open(path) as fixture:
+        return json.load(fixture)
+
+
+def get_pruned_values(data: dict, pruned: dict, path: str = ""):
+    """Paths and values of the keys of data that pruning left out"""
+
+    for key, value in data.items():
+        if key == "panels":
+            continue
+        if key not in pruned:
+            yield path + key, value
+        elif isinstance(value, dict) and isinstance(pruned[key], dict):
+            yield from get_pruned_values(value, pruned[key], path + key + ".")
+
+
+def get_grafana_default(defaults: dict, path: str):
+    """Default of the key path, KeyError when Grafana does not fill it in"""
+
+    for key in path.split("."):
+        if not isinstance(defaults, dict) or key not in defaults:
+            return KeyError
+        defaults = defaults[key]
+    return defaults
+
+
+def iter_panels(panels: list):
+    for panel in panels:
+        yield panel
+        yield from iter_panels(panel.get("panels", []))
+
+
+class TestPruneDefaultsOutput:
+    """Test the output without Grafana defaults"""
+
+    def check_pruned_values(self, data: dict, pruned: dict, defaults: dict):
+        for path, value in get_pruned_values(data, pruned):
+            default = get_grafana_default(defaults, path)
+            if isinstance(value, dict) and isinstance(default, dict):
+                # Every key of a left out object is a default
+                self.check_pruned_values(value, {}, default)
+            elif default is KeyError:
+                # Grafana treats null and missing keys alike
+                {path: value}.should.eql({path: None})
+            else:
+                # JSON equality, true is not 1
+                {path: json.dumps(value)}.should.eql({path: json.dumps(default)})
+
+    def test_should_only_prune_what_grafana_fills_in(self):
+        grafana = get_grafana_defaults()
+        for subcommand in EXAMPLE_SUBCOMMANDS:
+            for options in [[], ["--lazy-rows"]]:
+                dashboard = json.loads(
+                    base64.b64decode(
+                        render_example(options, subcommand)["base64EncodedJson"]
+                    )
+                )
+                pruned = json.loads(
+                    base64.b64decode(
+                        render_example(options + ["--prune-defaults"], subcommand)[
+                            "base64EncodedJson"
+                        ]
+                    )
+                )
+
+                self.check_pruned_values(dashboard, pruned, grafana["dashboard"])
+                panels = list(iter_panels(dashboard["panels"]))
+                pruned_panels = list(iter_panels(pruned["panels"]))
+                panels.should.have.length_of(len(pruned_panels))
+                for panel, pruned_panel in zip(panels, pruned_panels):
+                    defaults = dict(grafana["panel"])
+                    defaults.update(grafana["plugins"][panel["type"]])
+                    self.check_pruned_values(panel, pruned_panel, defaults)
+
+    def test_should_load_same_dashboard_in_grafana(self):
+        for subcommand in EXAMPLE_SUBCOMMANDS:
+            for options in [[], ["--compact"]]:
+                dashboard = render_example(options, subcommand)["base64EncodedJson"]
+                pruned = render_example(options + ["--prune-defaults"], subcommand)[
+                    "base64EncodedJson"
+                ]
+
+                len(pruned).should.be.lower_than(len(dashboard))
+                apply_dashboard_defaults(
+                    json.loads(base64.b64decode(pruned))
+                ).should.eql(
+                    apply_dashboard_defaults(json.loads(base64.b64decode(dashboard)))
+                )
+
+
+class TestReportOutput:
+    """Test the query fan-out report next to the dashboard"""
+
+    def test_should_add_report_to_same_output(self):
+        argv = ["--no-cache", "--name", "db", "--environment", "prod", "--cw", "cw"]
+        argv += ["--compact", "--gzip", "rds", "--engine", "mysql"]
+        rendered, reported = io.StringIO(), io.StringIO()
+        run(argv, rendered)
+
+        run(["--report"] + argv, reported)
+
+        output = json.loads(reported.getvalue())
+        list(output).should.eql(["base64gzip", "report"])
+        output["base64gzip"].should.eql(json.loads(rendered.getvalue())["base64gzip"])
+        report = json.loads(output["report"])
+        report["title"].should.eql("RDS: db")
+        report["panel_count"].should.eql(8)
+
+
+class TestBudget:
+    """Test the CloudWatch budgets"""
+
+    argv = [
+        "--no-cache",
+        "--name",
+        "arn:aws:states:eu-west-1:1234567890:stateMachine:sfn",
+        "--environment",
+        "prod",
+        "--cw",
+        "cw",
+    ]
+    lambdas = ["lambda-{}".format(i) for i in range(80)]
+
+    def test_should_fail_over_budget(self):
+        argv = self.argv + ["step-function", "--lambdas"] + self.lambdas
+        out = io.StringIO()
+
+        run.when.called_with(argv, out).should.throw(
+            Exception, "809 CloudWatch metric queries per refresh, more than 500"
+        )
+        out.getvalue().should.be.empty
+        unlimited = ["--budget-queries-per-refresh", "0"]
+        unlimited += ["--budget-datapoints-per-hour", "0"]
+        run(unlimited + argv, out)
+
+        json.loads(out.getvalue()).should.have.key("base64EncodedJson")
+
+    def test_should_warn_over_budget(self):
+        argv = self.argv + ["--on-budget-exceeded", "warn", "step-function"]
+        argv += ["--lambdas"] + self.lambdas
+        out, stderr = io.StringIO(), io.StringIO()
+
+        with contextlib.redirect_stderr(stderr):
+            run(argv, out)
+
+        json.loads(out.getvalue()).should.have.key("base64EncodedJson")
+        stderr.getvalue().should.contain("Warning: Dashboard Step Function: sfn")
+        stderr.getvalue().should.contain("GetMetricData datapoints per hour")
+
+    def test_should_check_budgets_of_batch(self):
+        spec = {
+            "service": "step-function",
+            "name": "arn:aws:states:eu-west-1:1234567890:stateMachine:sfn",
+            "environment": "prod",
+            "cloudwatch_data_source": "cw",
+        }
+        specs = [
+            dict(spec, id="big", lambdas=self.lambdas),
+            dict(spec, id="small", lambdas=self.lambdas[:10]),
+            dict(spec, id="allowed", lambdas=self.lambdas, budget="warn"),
+        ]
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            rendered, errors = render_manifest(specs)
+
+        list(rendered).should.eql(["small", "allowed"])
+        errors["big"].should.contain("exceeds the CloudWatch budget")
+        render_manifest.when.called_with(
+            specs[1:2], max_batch_datapoints_per_hour=1000
+        ).should.throw(Exception, "Batch exceeds the CloudWatch budget")
+
+
+class TestCanonicalOutput:
+    """Test the canonical output"""
+
+    def test_should_normalize_floats(self):
+        normalized = normalize_floats(
+            {"a": 1.0, "b": 0.1 + 0.2, "c": [2.50, -0.0], "d": True, "e": 3}
+        )
+
+        normalized.should.eql({"a": 1, "b": 0.3, "c": [2.5, 0], "d": True, "e": 3})
+        normalized["a"].should.be.a(int)
+
+    def test_should_sort_keys_and_pin_panel_ids(self):
+        dashboard = render_example([], ["lambda", "sqs"])["base64EncodedJson"]
+        dashboard_json = base64.b64decode(dashboard)
+
+        dashboard = json.loads(dashboard_json)
+        list(dashboard).should.eql(sorted(dashboard))
+        ids = get_panel_ids(dashboard)
+        ids.should_not.be.empty
+        ids.should.eql(list(range(1, len(ids) + 1)))
+
+        dashboard = render_example(["--lazy-rows"], ["lambda", "sqs"])
+        ids = get_panel_ids(
+            json.loads(base64.b64decode(dashboard["base64EncodedJson"]))
+        )
+        ids.should.have.length_of(len(get_panel_ids(json.loads(dashboard_json))))
+        ids.should.eql(list(range(1, len(ids) + 1)))
+
+    def test_should_add_content_hash(self):
+        rendered = render_example([], ["rds", "--engine", "postgres"])
+        dashboard = json.loads(base64.b64decode(rendered["base64EncodedJson"]))
+        hashed = render_example(["--content-hash"], ["rds", "--engine", "postgres"])
+
+        list(hashed).should.eql(["base64EncodedJson", "contentHash"])
+        hashed["base64EncodedJson"].should.eql(rendered["base64EncodedJson"])
+        hashed["contentHash"].should.eql(get_content_hash(dashboard))
+        compact = render_example(
+            ["--content-hash", "--compact"], ["rds", "--engine", "postgres"]
+        )
+        compact["contentHash"].should_not.eql(hashed["contentHash"])
+
+    def test_should_render_identical_bytes_under_hash_seeds(self):
+        script = (
+            "import hashlib, io, bin\n"
+            "for argv in {}:\n"
+            "    out = io.StringIO()\n"
+            "    bin.run(argv, out)\n"
+            "    print(hashlib.sha256(out.getvalue().encode()).hexdigest())"
+        ).format([EXAMPLE_ARGV + subcommand for subcommand in EXAMPLE_SUBCOMMANDS])
+        processes = [
+            subprocess.Popen(
+                [sys.executable, "-c", script],
+                cwd=ROOT_DIR,
+                env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for seed in HASH_SEEDS
+        ]
+        digests = set()
+
+        for process in processes:
+            stdout, _ = process.communicate()
+            process.returncode.should.eql(0)
+            digests.add(stdout)
+
+        digests.should.have.length_of(1)
@@ -0,0 +1,130 @@
+import contextlib
+import io
+import os
+import stat
+import tempfile
+import threading
+
+import pytest
+
+from bin import get_generator_version, run, run_captured
+from client import SOCKET_ENV, get_socket_path, request
+from server import GeneratorServer
+
+ARGV = ["--name", "api", "--environment", "prod", "--cw", "cw", "--no-cache"]
+ARGV += ["lambda", "null"]
+
+
+def request_daemon(argv) -> dict:
+    """Render argv through a daemon handling one request"""
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "generator.sock")
+    with GeneratorServer(socket_path, run_captured, get_generator_version) as server:
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        response = request(argv, socket_path)
+        thread.join()
+
+    os.path.exists(socket_path).should.be.false
+    return response
+
+
+class TestClient:
+    def test_should_render_through_the_daemon(self):
+        expected = io.StringIO()
+        run(ARGV, expected)
+
+        response = request_daemon(ARGV)
+
+        response.should.eql({"stdout": expected.getvalue(), "stderr": "", "status": 0})
+
+    def test_should_pass_on_the_warnings_of_the_daemon(self):
+        argv = ARGV[:-2] + ["--on-budget-exceeded", "warn"]
+        argv += ["--budget-queries-per-refresh", "1", "lambda", "null"]
+        expected, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            run(argv, expected)
+
+        response = request_daemon(argv)
+
+        response["stdout"].should.eql(expected.getvalue())
+        response["stderr"].should.eql(stderr.getvalue())
+        response["stderr"].should.contain("Warning: Dashboard Lambda: api exceeds")
+        response["status"].should.eql(0)
+
+    def test_should_pass_on_the_failures_of_the_daemon(self):
+        response = request_daemon(
+            ARGV[:-2] + ["--budget-queries-per-refresh", "1", "lambda", "null"]
+        )
+
+        response["stdout"].should.be.empty
+        response["stderr"].should.match(r"^Exception: Dashboard Lambda: api exceeds")
+        response["status"].should.eql(1)
+
+        response = request_daemon(["--name", "api"])
+
+        response["stderr"].should.contain("usage: ")
+        response["status"].should.eql(2)
+
+    def test_should_stop_the_daemon_when_the_sources_changed(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "generator.sock")
+
+        with GeneratorServer(
+            socket_path, run_captured, get_generator_version
+        ) as server:
+            server.generator_version = "sources the daemon started with"
+            thread = threading.Thread(target=server.handle_request)
+            thread.start()
+            response = request(ARGV, socket_path)
+            thread.join()
+
+        response.should.be(None)
+        server.idle.should.be.true
+
+    def test_should_return_nothing_without_a_daemon(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "generator.sock")
+
+        request(ARGV, socket_path).should.be(None)
+
+    def test_should_keep_the_socket_in_a_private_directory(self):
+        environ = dict(os.environ)
+        os.environ.pop(SOCKET_ENV, None)
+        os.environ.pop("XDG_RUNTIME_DIR", None)
+        os.environ["TMPDIR"] = tempfile.mkdtemp()
+        try:
+            socket_path = get_socket_path()
+            with GeneratorServer(socket_path, run_captured, get_generator_version):
+                socket_dir = os.path.dirname(socket_path)
+                socket_dir.should.eql(
+                    os.path.join(
+                        os.environ["TMPDIR"],
+                        "grafana-dashboards-{}".format(os.getuid()),
+                    )
+                )
+                stat.S_IMODE(os.stat(socket_dir).st_mode).should.eql(0o700)
+                (os.stat(socket_path).st_mode & 0o077).should.eql(0)
+
+            os.environ["XDG_RUNTIME_DIR"] = "/run/user/1000"
+            get_socket_path().should.eql("/run/user/1000/grafana-dashboards.sock")
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+
+    @pytest.mark.skipif(os.getuid() != 0, reason="Needs root to chown the socket")
+    def test_should_refuse_the_socket_of_another_user(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "generator.sock")
+
+        with GeneratorServer(socket_path, run_captured, get_generator_version):
+            os.chown(socket_path, 1, -1)
+            request(ARGV, socket_path).should.be(None)
+
+    @pytest.mark.skipif(os.getuid() != 0, reason="Needs root to chown the directory")
+    def test_should_refuse_the_socket_directory_of_another_user(self):
+        socket_dir = tempfile.mkdtemp()
+        os.chown(socket_dir, 1, -1)
+
+        GeneratorServer.when.called_with(
+            os.path.join(socket_dir, "generator.sock"),
+            run_captured,
+            get_generator_version,
+        ).should.throw(Exception, "belongs to another user")
@@ -0,0 +1,39 @@
+from lib.commons import apply_time_profile
+from lib.rds import generate_rds_dashboard
+
+
+class TestApplyTimeProfile:
+    def get_dashboard(self):
+        return generate_rds_dashboard(
+            name="db",
+            environment="prod",
+            influxdb_data_source="influxdb",
+            cloudwatch_data_source="cw",
+            engine="postgres",
+            notifications=[],
+        )
+
+    def test_should_apply_time_profile(self):
+        dashboard = apply_time_profile(self.get_dashboard(), time_profile="ops-live")
+
+        dashboard.refresh.should.eql("30s")
+        dashboard.time.to_json_data().should.eql({"from": "now-1h", "to": "now"})
+        dashboard.timePicker.refreshIntervals.should.eql(["30s", "1m", "5m", "15m"])
+
+    def test_should_override_time_profile(self):
+        dashboard = apply_time_profile(
+            self.get_dashboard(), time_profile="ops-live", refresh="off"
+        )
+
+        dashboard.refresh.should.be.false
+        apply_time_profile(self.get_dashboard(), time_range="30d").refresh.should.eql(
+            "1m"
+        )
+
+    def test_should_fail_on_unknown_time_profile_or_refresh(self):
+        apply_time_profile.when.called_with(
+            self.get_dashboard(), time_profile="live"
+        ).should.throw(Exception, "Unknown time profile live, one of ops-live, review")
+        apply_time_profile.when.called_with(
+            self.get_dashboard(), time_profile="review", refresh="30s"
+        ).should.throw(Exception, "Refresh 30s is not one of the refresh intervals")
@@ -0,0 +1,78 @@
+from lib.defaults import (
+    apply_dashboard_defaults,
+    get_panel_defaults,
+    prune_dashboard_defaults,
+)
+
+
+class TestPruneDefaults:
+    """Test pruning the Grafana defaults"""
+
+    def test_should_prune_panel_defaults_by_type(self):
+        dashboard = {
+            "title": "dashboard",
+            "style": "dark",
+            "panels": [
+                {
+                    "type": "graph",
+                    "title": "graph",
+                    "transparent": False,
+                    "bars": False,
+                    "linewidth": 2,
+                    "legend": {"show": True, "max": False, "alignAsTable": True},
+                    "xaxis": {"show": True, "mode": "time", "name": None, "values": []},
+                },
+                {
+                    "type": "row",
+                    "collapsed": False,
+                    "panels": [{"type": "text", "options": {"mode": "markdown"}}],
+                },
+            ],
+        }
+
+        prune_dashboard_defaults(dashboard).should.eql(
+            {
+                "title": "dashboard",
+                "panels": [
+                    {
+                        "type": "graph",
+                        "title": "graph",
+                        "linewidth": 2,
+                        "legend": {"alignAsTable": True},
+                    },
+                    {"type": "row", "collapsed": False, "panels": [{"type": "text"}]},
+                ],
+            }
+        )
+
+    def test_should_not_prune_values_of_other_panel_types(self):
+        panel = {"type": "stat", "bars": False, "lines": True}
+
+        get_panel_defaults(panel).shouldnt.have.key("bars")
+        prune_dashboard_defaults({"panels": [panel]}).should.eql({"panels": [panel]})
+
+    def test_should_not_prune_values_of_other_types(self):
+        panel = {"type": "graph", "fill": True, "lines": 1, "legend": {"show": 1}}
+
+        prune_dashboard_defaults({"panels": [panel]}).should.eql({"panels": [panel]})
+        prune_dashboard_defaults({"version": False}).should.eql({"version": False})
+
+    def test_should_apply_defaults_like_grafana(self):
+        dashboard = {"panels": [{"type": "graph", "legend": {"alignAsTable": True}}]}
+
+        applied = apply_dashboard_defaults(dashboard)
+
+        applied["style"].should.eql("dark")
+        applied["panels"][0]["lines"].should.be.true
+        applied["panels"][0]["legend"].should.eql(
+            {
+                "alignAsTable": True,
+                "avg": False,
+                "current": False,
+                "max": False,
+                "min": False,
+                "show": True,
+                "total": False,
+                "values": False,
+            }
+        )
@@ -9,7 +9,6 @@ from grafanalib.core import (  # OP_OR,; RowPanel,; single_y_axis,; Text,
     Dashboard,
     Graph,
     GreaterThan,
-    GridPos,
     Logs,
     Stat,
     Target,
@@ -39,7 +38,6 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
 
         expected_targets = [
             CloudwatchMetricsTarget(
@@ -70,12 +68,10 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
         )
         panel.should.be.a(Stat)
         panel.title.should.eql("Task Count")
         panel.dataSource.should.eql(cloudwatch_data_source)
-        panel.gridPos.should.eql(grid_pos)
         panel.colorMode.should.eql("background")
         panel.alignment.should.eql("center")
         panel.targets.should.have.length_of(3)
@@ -85,12 +81,10 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         panel = generate_deployment_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
         )
 
         panel.should.be.a(TimeSeries)
@@ -106,13 +100,11 @@ class TestECSDashboards:
                 dimensions={"ServiceName": name, "ClusterName": cluster_name},
             )
         )
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_running_count_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         max = 1000
         notifications = []
 
@@ -120,7 +112,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             max=max,
             notifications=notifications,
         )
@@ -139,13 +130,11 @@ class TestECSDashboards:
                 refId="A",
             )
         )
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_running_count_with_alerts_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         max = 1000
         notifications = ["foo", "bar"]
 
@@ -153,7 +142,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             max=max,
             notifications=notifications,
         )
@@ -174,7 +162,6 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         max = 1
         notifications = ["foo", "bar"]
 
@@ -182,7 +169,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             max=max,
             notifications=notifications,
         )
@@ -193,7 +179,6 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         max = 1000
         notifications = []
 
@@ -201,7 +186,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             max=max,
             notifications=notifications,
         )
@@ -220,13 +204,11 @@ class TestECSDashboards:
                 refId="A",
             )
         )
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_desired_count_with_alerts_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         max = 1000
         notifications = ["foo", "bar"]
 
@@ -234,7 +216,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             max=max,
             notifications=notifications,
         )
@@ -255,7 +236,6 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         max = 1
         notifications = ["foo", "bar"]
 
@@ -263,7 +243,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             max=max,
             notifications=notifications,
         )
@@ -274,14 +253,12 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         notifications = []
 
         panel = generate_pending_count_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             notifications=notifications,
         )
 
@@ -299,20 +276,17 @@ class TestECSDashboards:
                 refId="A",
             )
         )
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_pending_count_with_alerts_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         notifications = ["foo", "bar"]
 
         panel = generate_pending_count_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             notifications=notifications,
         )
 
@@ -333,12 +307,10 @@ class TestECSDashboards:
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         panel = generate_cpu_utilization_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
         )
 
         expected_targets = [
@@ -369,51 +341,43 @@ class TestECSDashboards:
         panel.dataSource.should.eql(cloudwatch_data_source)
         panel.targets.should.have.length_of(3)
         panel.targets.should.eql(expected_targets)
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_mem_utilization_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
 
         panel = generate_mem_utilization_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
         )
         panel.should.be.a(Graph)
         panel.title.should.eql("Memory Utilization")
         panel.dataSource.should.eql(cloudwatch_data_source)
         panel.targets.should.have.length_of(4)
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_mem_utilization_percentage_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         notifications = []
 
         panel = generate_mem_utilization_percentage_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             notifications=notifications,
         )
         panel.should.be.a(Graph)
         panel.title.should.eql("Memory Utilization Percentage")
         panel.dataSource.should.eql(cloudwatch_data_source)
         panel.targets.should.have.length_of(3)
-        panel.gridPos.should.eql(grid_pos)
 
     def test_should_generate_mem_utilization_percentage_with_alerts_graph(self):
         name = "service-1"
         cloudwatch_data_source = "prod"
         cluster_name = "cluster-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         notifications = ["foo", "bar", "baz"]
 
         expected_alert_condition = AlertCondition(
@@ -428,7 +392,6 @@ class TestECSDashboards:
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
             cluster_name=cluster_name,
-            grid_pos=grid_pos,
             notifications=notifications,
         )
 
@@ -441,11 +404,9 @@ class TestECSDashboards:
         cloudwatch_data_source = "prod"
         loadbalancer = "loadbalancer-1"
         target_group = "target-group-1"
-        grid_pos = GridPos(1, 2, 3, 4)
 
         panel = generate_req_count_graph(
             cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=grid_pos,
             loadbalancer=loadbalancer,
             target_group=target_group,
         )
@@ -459,20 +420,17 @@ class TestECSDashboards:
         cloudwatch_data_source = "prod"
         loadbalancer = "loadbalancer-1"
         target_group = "target-group-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         notifications = []
 
         panel = generate_res_count_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=grid_pos,
             loadbalancer=loadbalancer,
             target_group=target_group,
             notifications=notifications,
         )
         panel.should.be.a(Graph)
         panel.title.should.eql("Responses")
-        panel.gridPos.should.eql(grid_pos)
         panel.dataSource.should.eql(cloudwatch_data_source)
         panel.targets.should.have.length_of(4)
         panel.targets.should.eql(
@@ -526,13 +484,11 @@ class TestECSDashboards:
         cloudwatch_data_source = "prod"
         loadbalancer = "loadbalancer-1"
         target_group = "target-group-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         notifications = ["foo", "bar", "baz"]
 
         panel = generate_res_count_graph(
             name=name,
             cloudwatch_data_source=cloudwatch_data_source,
-            grid_pos=grid_pos,
             loadbalancer=loadbalancer,
             target_group=target_group,
             notifications=notifications,
@@ -554,18 +510,15 @@ class TestECSDashboards:
 
     def test_should_generate_error_logs_panel(self):
         name = "service-1"
-        grid_pos = GridPos(1, 2, 3, 4)
         elasticsearch_data_source = "es"
         es_query = 'tag: "booking-api" AND log.level: [50 TO *]'
 
         panel = generate_error_logs_panel(
             lucene_query=es_query,
-            grid_pos=grid_pos,
             elasticsearch_data_source=elasticsearch_data_source,
         )
         panel.should.be.a(Logs)
         panel.title.should.eql("Error Logs")
-        panel.gridPos.should.eql(grid_pos)
         panel.dataSource.should.eql(elasticsearch_data_source)
         panel.targets.should.have.length_of(1)
         panel.targets[0].query.should.eql(es_query)
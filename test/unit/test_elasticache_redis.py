@@ -21,6 +21,7 @@ from lib.elasticache_redis import (
     generate_elasticache_redis_replication_graph,
     generate_elasticache_redis_swap_and_memory_usage_graph,
 )
+from lib.layout import get_sections
 
 
 class TestElasticCacheRedisDashboard:
@@ -268,5 +269,5 @@ class TestElasticCacheRedisDashboard:
 
         generated_dashboard.title.should.equal("ElastiCache Redis: foo")
         generated_dashboard.tags.should.have.length_of(3)
-        generated_dashboard.rows.should.have.length_of(3)
+        get_sections(generated_dashboard.panels).should.have.length_of(3)
         generated_dashboard.links.should.have.length_of(1)
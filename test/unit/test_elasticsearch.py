@@ -13,6 +13,7 @@ from lib.elasticsearch import (  # generate_elasticsearch_storage_alert_graph,;
     generate_elasticsearch_storage_graph,
     generate_elasticsearch_writes_blocked_alert_graph,
 )
+from lib.layout import get_sections
 
 
 class TestElasticsearchDashboards:
@@ -294,5 +295,5 @@ class TestElasticsearchDashboards:
         )
         generated_dashboard.title.should.equal("Elasticsearch: {}".format(name))
         generated_dashboard.tags.should.have.length_of(2)
-        generated_dashboard.rows.should.have.length_of(5)
+        get_sections(generated_dashboard.panels).should.have.length_of(5)
         generated_dashboard.links.should.have.length_of(1)
@@ -5,6 +5,7 @@ from lib.firehose import (
     generate_firehose_graph,
     get_firehose_template,
 )
+from lib.layout import get_sections
 
 
 class TestFirehose:
@@ -42,6 +43,7 @@ class TestFirehose:
         generated_dashboard.should.be.a(Dashboard)
         generated_dashboard.title.should.eql("Firehose")
         generated_dashboard.tags.should.eql(["firehose", environment])
-        generated_dashboard.rows.should.have.length_of(1)
-        generated_dashboard.rows[0].title.should.eql("$firehose")
-        generated_dashboard.rows[0].repeat.should.eql("firehose")
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.have.length_of(1)
+        sections[0].title.should.eql("$firehose")
+        sections[0].repeat.should.eql("firehose")
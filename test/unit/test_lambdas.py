@@ -17,6 +17,8 @@ from lib.lambdas import (
     lambda_sns_sqs_dashboard,
     lambda_sqs_dashboard,
 )
+from lib.layout import get_sections, lazy_rows
+from lib.report import get_dashboard_report
 
 
 class TestDispatcher:
@@ -488,17 +490,18 @@ class TestGraphs:
         sorted(generated_dashboard.tags).should.eql(
             sorted(["lambda", environment, "sqs"])
         )
-        generated_dashboard.rows.should.be.length_of(5)
-        generated_dashboard.rows[0].title.should.eql("Invocations")
-        generated_dashboard.rows[0].panels.should.be.length_of(2)
-        generated_dashboard.rows[1].title.should.eql("Memory Utilization")
-        generated_dashboard.rows[1].panels.should.be.length_of(2)
-        generated_dashboard.rows[2].title.should.eql("Logs")
-        generated_dashboard.rows[2].panels.should.be.length_of(1)
-        generated_dashboard.rows[3].title.should.eql("Queues")
-        generated_dashboard.rows[3].panels.should.be.length_of(1)
-        generated_dashboard.rows[4].title.should.eql("Dead Letter Queues")
-        generated_dashboard.rows[4].panels.should.be.length_of(1)
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.be.length_of(5)
+        sections[0].title.should.eql("Invocations")
+        sections[0].panels.should.be.length_of(2)
+        sections[1].title.should.eql("Memory Utilization")
+        sections[1].panels.should.be.length_of(2)
+        sections[2].title.should.eql("Logs")
+        sections[2].panels.should.be.length_of(1)
+        sections[3].title.should.eql("Queues")
+        sections[3].panels.should.be.length_of(1)
+        sections[4].title.should.eql("Dead Letter Queues")
+        sections[4].panels.should.be.length_of(1)
 
     def test_should_generate_lambda_sqs_fifo_dashboard(self):
         lambda_name = "lambda-1"
@@ -520,17 +523,18 @@ class TestGraphs:
         sorted(generated_dashboard.tags).should.eql(
             sorted(["lambda", environment, "sqs", "fifo"])
         )
-        generated_dashboard.rows.should.be.length_of(5)
-        generated_dashboard.rows[0].title.should.eql("Invocations")
-        generated_dashboard.rows[0].panels.should.be.length_of(2)
-        generated_dashboard.rows[1].title.should.eql("Memory Utilization")
-        generated_dashboard.rows[1].panels.should.be.length_of(2)
-        generated_dashboard.rows[2].title.should.eql("Logs")
-        generated_dashboard.rows[2].panels.should.be.length_of(1)
-        generated_dashboard.rows[3].title.should.eql("Queues")
-        generated_dashboard.rows[3].panels.should.be.length_of(1)
-        generated_dashboard.rows[4].title.should.eql("Dead Letter Queues")
-        generated_dashboard.rows[4].panels.should.be.length_of(1)
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.be.length_of(5)
+        sections[0].title.should.eql("Invocations")
+        sections[0].panels.should.be.length_of(2)
+        sections[1].title.should.eql("Memory Utilization")
+        sections[1].panels.should.be.length_of(2)
+        sections[2].title.should.eql("Logs")
+        sections[2].panels.should.be.length_of(1)
+        sections[3].title.should.eql("Queues")
+        sections[3].panels.should.be.length_of(1)
+        sections[4].title.should.eql("Dead Letter Queues")
+        sections[4].panels.should.be.length_of(1)
 
     def test_should_generate_lambda_sns_sqs_dashboard(self):
         lambda_name = "lambda-1"
@@ -554,24 +558,58 @@ class TestGraphs:
         sorted(generated_dashboard.tags).should.eql(
             sorted(["lambda", environment, "sqs", "sns"])
         )
-        generated_dashboard.rows.should.be.length_of(6)
-        generated_dashboard.rows[0].panels.should.be.length_of(len(topics))
-        generated_dashboard.rows[0].title.should.eql("SNS Topics")
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.be.length_of(6)
+        sections[0].panels.should.be.length_of(len(topics))
+        sections[0].title.should.eql("SNS Topics")
 
-        generated_dashboard.rows[1].title.should.eql("Invocations")
-        generated_dashboard.rows[1].panels.should.be.length_of(2)
+        sections[1].title.should.eql("Invocations")
+        sections[1].panels.should.be.length_of(2)
 
-        generated_dashboard.rows[2].title.should.eql("Memory Utilization")
-        generated_dashboard.rows[2].panels.should.be.length_of(2)
+        sections[2].title.should.eql("Memory Utilization")
+        sections[2].panels.should.be.length_of(2)
 
-        generated_dashboard.rows[3].title.should.eql("Logs")
-        generated_dashboard.rows[3].panels.should.be.length_of(1)
+        sections[3].title.should.eql("Logs")
+        sections[3].panels.should.be.length_of(1)
 
-        generated_dashboard.rows[4].title.should.eql("Queues")
-        generated_dashboard.rows[4].panels.should.be.length_of(1)
+        sections[4].title.should.eql("Queues")
+        sections[4].panels.should.be.length_of(1)
 
-        generated_dashboard.rows[5].title.should.eql("Dead Letter Queues")
-        generated_dashboard.rows[5].panels.should.be.length_of(1)
+        sections[5].title.should.eql("Dead Letter Queues")
+        sections[5].panels.should.be.length_of(1)
+
+    def test_should_only_query_the_invocations_of_a_lazy_sns_sqs_dashboard(self):
+        call_args = {
+            "name": "lambda-1",
+            "environment": "alpha",
+            "cloudwatch_data_source": "cloudwatch",
+            "lambda_insights_namespace": "insights",
+            "notifications": [],
+            "fifo": False,
+            "topics": ["topic-{}".format(i) for i in range(50)],
+        }
+        report = get_dashboard_report(
+            lambda_sns_sqs_dashboard(**call_args).to_json_data()
+        )
+
+        with lazy_rows():
+            generated_dashboard = lambda_sns_sqs_dashboard(**call_args)
+
+        sections = get_sections(generated_dashboard.panels)
+        [(section.title, section.collapsed) for section in sections].should.eql(
+            [
+                ("SNS Topics", True),
+                ("Invocations", False),
+                ("Memory Utilization", True),
+                ("Logs", True),
+                ("Queues", True),
+                ("Dead Letter Queues", True),
+            ]
+        )
+        lazy_report = get_dashboard_report(generated_dashboard.to_json_data())
+        lazy_report["queries_per_refresh"].should.eql(report["queries_per_refresh"])
+        report["queries_on_load"]["cloudwatch_metrics"].should.eql(162)
+        lazy_report["queries_on_load"]["cloudwatch_metrics"].should.eql(5)
 
     def test_should_generate_lambda_sns_sqs_fifo_dashboard(self):
         lambda_name = "lambda-1"
@@ -596,21 +634,22 @@ class TestGraphs:
         sorted(generated_dashboard.tags).should.eql(
             sorted(["lambda", environment, "sqs", "sns", "fifo"])
         )
-        generated_dashboard.rows.should.be.length_of(6)
-        generated_dashboard.rows[0].panels.should.be.length_of(len(topics))
-        generated_dashboard.rows[0].title.should.eql("SNS Topics")
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.be.length_of(6)
+        sections[0].panels.should.be.length_of(len(topics))
+        sections[0].title.should.eql("SNS Topics")
 
-        generated_dashboard.rows[1].title.should.eql("Invocations")
-        generated_dashboard.rows[1].panels.should.be.length_of(2)
+        sections[1].title.should.eql("Invocations")
+        sections[1].panels.should.be.length_of(2)
 
-        generated_dashboard.rows[2].title.should.eql("Memory Utilization")
-        generated_dashboard.rows[2].panels.should.be.length_of(2)
+        sections[2].title.should.eql("Memory Utilization")
+        sections[2].panels.should.be.length_of(2)
 
-        generated_dashboard.rows[3].title.should.eql("Logs")
-        generated_dashboard.rows[3].panels.should.be.length_of(1)
+        sections[3].title.should.eql("Logs")
+        sections[3].panels.should.be.length_of(1)
 
-        generated_dashboard.rows[4].title.should.eql("Queues")
-        generated_dashboard.rows[4].panels.should.be.length_of(1)
+        sections[4].title.should.eql("Queues")
+        sections[4].panels.should.be.length_of(1)
 
-        generated_dashboard.rows[5].title.should.eql("Dead Letter Queues")
-        generated_dashboard.rows[5].panels.should.be.length_of(1)
+        sections[5].title.should.eql("Dead Letter Queues")
+        sections[5].panels.should.be.length_of(1)
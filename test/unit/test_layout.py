@@ -0,0 +1,167 @@
+from grafanalib.core import Graph, GridPos, RowPanel, Text
+
+from lib.ecs import generate_ecs_alb_service_dashboard
+from lib.layout import Cell, Section, get_sections, layout_panels, lazy_rows
+from lib.rds import generate_rds_dashboard
+from lib.report import get_dashboard_report
+
+
+def get_graphs(count: int) -> list:
+    return [Graph(title="graph-{}".format(i), targets=[]) for i in range(count)]
+
+
+class TestLayoutPanels:
+    def test_should_share_the_grid_width_between_panels(self):
+        panels = layout_panels([Section(panels=get_graphs(3))])
+
+        [panel.gridPos for panel in panels].should.eql(
+            [GridPos(8, 8, 0, 0), GridPos(8, 8, 8, 0), GridPos(8, 8, 16, 0)]
+        )
+
+    def test_should_wrap_panels_to_a_new_line(self):
+        panels = layout_panels([Section(panels=get_graphs(5), height=6)])
+
+        [panel.gridPos for panel in panels].should.eql(
+            [
+                GridPos(6, 6, 0, 0),
+                GridPos(6, 6, 6, 0),
+                GridPos(6, 6, 12, 0),
+                GridPos(6, 6, 18, 0),
+                GridPos(6, 6, 0, 6),
+            ]
+        )
+
+    def test_should_size_cells(self):
+        text, graph = Text(title="text"), Graph(title="graph", targets=[])
+
+        panels = layout_panels(
+            [Section(title="Logs", panels=[text, Cell(graph, width=24, height=24)])]
+        )
+
+        panels[0].should.be.a(RowPanel)
+        panels[0].gridPos.should.eql(GridPos(1, 24, 0, 0))
+        panels[1].gridPos.should.eql(GridPos(8, 24, 0, 1))
+        panels[2].gridPos.should.eql(GridPos(24, 24, 0, 9))
+
+    def test_should_move_panels_into_collapsed_sections(self):
+        panels = layout_panels(
+            [
+                Section(title="Summary", panels=get_graphs(2)),
+                Section(title="Logs", panels=get_graphs(1), collapsed=True),
+                Section(title="Details", panels=get_graphs(1), repeat="lambda"),
+            ]
+        )
+
+        [panel.title for panel in panels].should.eql(
+            ["Summary", "graph-0", "graph-1", "Logs", "Details", "graph-0"]
+        )
+        [panel.gridPos.y for panel in panels].should.eql([0, 1, 1, 9, 10, 11])
+        panels[3].collapsed.should.be.true
+        panels[3].panels[0].gridPos.should.eql(GridPos(8, 24, 0, 10))
+        panels[4].repeat.variable.should.eql("lambda")
+
+    def test_should_get_the_sections_of_panels(self):
+        sections = [
+            Section(panels=get_graphs(2)),
+            Section(title="Logs", panels=get_graphs(1), collapsed=True),
+            Section(title="Details", panels=get_graphs(3), repeat="lambda"),
+        ]
+
+        [
+            (section.title, len(section.panels), section.collapsed, section.repeat)
+            for section in get_sections(layout_panels(sections))
+        ].should.eql(
+            [
+                (None, 2, False, None),
+                ("Logs", 1, True, None),
+                ("Details", 3, False, "lambda"),
+            ]
+        )
+
+
+class TestLazyRows:
+    def test_should_keep_summary_sections_open(self):
+        sections = [
+            Section(panels=get_graphs(1)),
+            Section(title="Topics", panels=get_graphs(2)),
+            Section(title="Summary", panels=get_graphs(2), summary=True),
+            Section(title="Details", panels=get_graphs(1), repeat="lambda"),
+        ]
+
+        with lazy_rows():
+            panels = layout_panels(sections)
+
+        [
+            (section.title, section.collapsed) for section in get_sections(panels)
+        ].should.eql(
+            [(None, False), ("Topics", True), ("Summary", False), ("Details", True)]
+        )
+        [panel.gridPos.y for panel in panels].should.eql([0, 8, 9, 10, 10, 18])
+        layout_panels(sections).should_not.eql(panels)
+
+    def test_should_collapse_rows_below_the_untitled_summary(self):
+        arguments = dict(
+            name="db",
+            environment="prod",
+            influxdb_data_source="influxdb",
+            cloudwatch_data_source="cw",
+            engine="postgres",
+            notifications=["foo"],
+        )
+        dashboard = generate_rds_dashboard(**arguments)
+
+        with lazy_rows():
+            lazy_dashboard = generate_rds_dashboard(**arguments)
+
+        sections = get_sections(lazy_dashboard.panels)
+        [section.title for section in sections].should.eql(
+            [None, "Connections and Memory", "Disk and Network", "Transaction IDs"]
+        )
+        [section.collapsed for section in sections].should.eql(
+            [False, True, True, True]
+        )
+        sections[1].panels.should.eql(get_sections(dashboard.panels)[1].panels)
+        get_sections(dashboard.panels)[1].collapsed.should.be.false
+
+    def test_should_move_panels_into_collapsed_row_panels(self):
+        arguments = dict(
+            name="service-1",
+            cluster_name="cluster-1",
+            cloudwatch_data_source="cw",
+            notifications=[],
+            environment="prod",
+            loadbalancer="loadbalancer-1",
+            target_group="target-group-1",
+            max=4,
+            elasticsearch_data_source="es",
+            lucene_query="level:error",
+        )
+        dashboard = generate_ecs_alb_service_dashboard(**arguments)
+
+        with lazy_rows():
+            lazy_dashboard = generate_ecs_alb_service_dashboard(**arguments)
+
+        [panel.title for panel in lazy_dashboard.panels].should.eql(
+            [
+                "Summary",
+                "Task Count",
+                "Deployments",
+                "Capacity",
+                "Utilization",
+                "Requests and Responses",
+                "Logs",
+            ]
+        )
+        rows = [panel for panel in lazy_dashboard.panels if isinstance(panel, RowPanel)]
+        [row.collapsed for row in rows].should.eql([False, True, True, True, True])
+        [row.gridPos.y for row in rows].should.eql([0, 9, 10, 11, 12])
+        [len(row.panels) for row in rows].should.eql([0, 3, 3, 2, 2])
+        rows[4].panels[1].title.should.eql("Error Logs")
+
+        report = get_dashboard_report(lazy_dashboard.to_json_data())
+        report["queries_per_refresh"].should.eql(
+            get_dashboard_report(dashboard.to_json_data())["queries_per_refresh"]
+        )
+        report["queries_on_load"].should.eql(
+            {"cloudwatch_metrics": 4, "cloudwatch_logs": 0, "other": 0}
+        )
@@ -0,0 +1,100 @@
+from lib.periods import (
+    PeriodPolicy,
+    apply_period_policy,
+    get_cloudwatch_target,
+    get_period_template,
+    period_policy,
+)
+from lib.rds import generate_rds_cpu_graph, generate_rds_dashboard
+from lib.templates import precompiled_panels
+
+
+def get_rds_dashboard():
+    return generate_rds_dashboard(
+        name="db",
+        environment="prod",
+        influxdb_data_source="influxdb",
+        cloudwatch_data_source="cw",
+        engine="postgres",
+        notifications=["slack"],
+    )
+
+
+def get_periods(panel) -> list:
+    return [target.period for target in panel.targets]
+
+
+class TestPeriodPolicy:
+    def test_should_keep_period_of_builder_by_default(self):
+        get_cloudwatch_target(period="1m").period.should.eql("1m")
+        get_cloudwatch_target().period.should.eql("")
+
+    def test_should_apply_policy_to_targets(self):
+        with period_policy(PeriodPolicy("auto")):
+            get_cloudwatch_target(period="1m").period.should.eql("")
+        with period_policy(PeriodPolicy("5m")):
+            get_cloudwatch_target(period="1m").period.should.eql("5m")
+        with period_policy(PeriodPolicy("variable")):
+            get_cloudwatch_target(period="1m").period.should.eql("$period")
+        get_cloudwatch_target(period="1m").period.should.eql("1m")
+
+    def test_should_fail_on_invalid_periods(self):
+        PeriodPolicy.when.called_with("30s").should.throw(
+            Exception, "Invalid period 30s, a multiple of 1m"
+        )
+        PeriodPolicy.when.called_with("variable", "5m", "90s").should.throw(
+            Exception, "Invalid period 90s, a multiple of 1m"
+        )
+        PeriodPolicy.when.called_with("variable", "1h", "5m").should.throw(
+            Exception, "Min period 1h is longer than the max period 5m"
+        )
+
+    def test_should_bound_auto_period_template(self):
+        template = get_period_template(PeriodPolicy("variable", "5m"), 3600)
+
+        data = template.to_json_data()
+        data["name"].should.eql("period")
+        data["type"].should.eql("interval")
+        data["query"].should.eql("5m,15m,1h,6h,1d")
+        data["auto"].should.be.true
+        data["auto_min"].should.eql("5m")
+        data["current"]["value"].should.eql("$__auto_interval_period")
+
+    def test_should_not_exceed_max_period(self):
+        policy = PeriodPolicy("variable", "5m", "6h")
+
+        data = get_period_template(policy, 3600).to_json_data()
+        data["query"].should.eql("5m,15m,1h,6h")
+        data["auto"].should.be.false
+        data["current"]["value"].should.eql("5m")
+        # 90 days would be 3d periods on auto
+        data = get_period_template(policy, 90 * 86400).to_json_data()
+        data["current"]["value"].should.eql("6h")
+        data = get_period_template(policy, 7 * 86400).to_json_data()
+        data["current"]["value"].should.eql("6h")
+        data = get_period_template(policy, 86400).to_json_data()
+        data["current"]["value"].should.eql("1h")
+
+    def test_should_add_period_template_and_pin_alert_periods(self):
+        policy = PeriodPolicy("variable")
+        with period_policy(policy):
+            dashboard = apply_period_policy(get_rds_dashboard(), policy)
+
+        [template.name for template in dashboard.templating.list].should.eql(["period"])
+        cpu = dashboard.panels[0]
+        cpu.alert.should_not.be.none
+        get_periods(cpu).should.eql(["", "$period", "$period"])
+
+    def test_should_key_precompiled_panels_on_policy(self):
+        arguments = {
+            "name": "db",
+            "cloudwatch_data_source": "cw",
+            "notifications": [],
+        }
+        with precompiled_panels():
+            with period_policy(PeriodPolicy("5m")):
+                five_minutes = generate_rds_cpu_graph(**arguments).to_json_data()
+            one_minute = generate_rds_cpu_graph(**arguments).to_json_data()
+
+        [target["period"] for target in five_minutes["targets"]].should.eql(["5m"] * 3)
+        [target["period"] for target in one_minute["targets"]].should.eql(["1m"] * 3)
@@ -1,5 +1,6 @@
 from grafanalib.core import Alert, Dashboard, Graph, Template, Templating
 
+from lib.layout import get_sections
 from lib.rds import generate_rds_dashboard
 
 
@@ -27,7 +28,7 @@ class TestRDSMySqlDashboard:
             ["rds", engine, environment, "database"].sort()
         )
         generated_dashboard.links.should.have.length_of(1)
-        generated_dashboard.rows.should.have.length_of(3)
+        get_sections(generated_dashboard.panels).should.have.length_of(3)
 
 
 class TestRDSPostgresDashboard:
@@ -54,4 +55,4 @@ class TestRDSPostgresDashboard:
             ["rds", engine, environment, "database"].sort()
         )
         generated_dashboard.links.should.have.length_of(1)
-        generated_dashboard.rows.should.have.length_of(4)
+        get_sections(generated_dashboard.panels).should.have.length_of(4)
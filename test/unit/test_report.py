@@ -0,0 +1,173 @@
+from lib.report import get_budget_violations, get_dashboard_report, parse_duration
+from lib.step_functions import generate_sfn_dashboard
+
+DASHBOARD = {
+    "title": "Report",
+    "refresh": "30s",
+    "time": {"from": "now-1h", "to": "now"},
+    "rows": [
+        {
+            "panels": [
+                {
+                    "id": 1,
+                    "title": "Duration",
+                    "type": "graph",
+                    "targets": [
+                        {
+                            "refId": "A",
+                            "namespace": "AWS/Lambda",
+                            "metricName": "Duration",
+                            "statistics": ["Minimum", "Average", "Maximum"],
+                        },
+                        {
+                            "refId": "B",
+                            "namespace": "AWS/Lambda",
+                            "metricName": "Errors",
+                            "statistics": ["Sum"],
+                            "period": "5m",
+                        },
+                    ],
+                    "alert": {
+                        "name": "Errors",
+                        "frequency": "5m",
+                        "conditions": [{"query": {"params": ["B", "5m", "now"]}}],
+                    },
+                },
+                {
+                    "id": 2,
+                    "title": "Logs",
+                    "type": "logs",
+                    "targets": [{"queryMode": "Logs", "expression": "fields @message"}],
+                },
+            ]
+        }
+    ],
+    "panels": [
+        {
+            "id": 3,
+            "type": "row",
+            "panels": [
+                {
+                    "id": 4,
+                    "title": "Memory",
+                    "type": "graph",
+                    "targets": [{"query": "SELECT max(used) FROM memory"}],
+                }
+            ],
+        }
+    ],
+}
+
+
+class TestReport:
+    """Test the query fan-out report"""
+
+    def test_should_parse_durations(self):
+        parse_duration("30s").should.eql(30)
+        parse_duration("1m").should.eql(60)
+        parse_duration("2h").should.eql(7200)
+        parse_duration(10).should.eql(10)
+        parse_duration.when.called_with("soon").should.throw(Exception)
+
+    def test_should_count_queries(self):
+        report = get_dashboard_report(DASHBOARD)
+
+        report["panel_count"].should.eql(3)
+        report["target_count"].should.eql(4)
+        [panel["queries"] for panel in report["panels"]].should.eql([1, 4, 1])
+        report["distinct_metrics"].should.eql(
+            ["AWS/Lambda/Duration", "AWS/Lambda/Errors"]
+        )
+        report["queries_per_refresh"].should.eql(
+            {"cloudwatch_metrics": 4, "cloudwatch_logs": 1, "other": 1}
+        )
+        report["alerts"].should.eql(
+            [
+                {
+                    "name": "Errors",
+                    "panel": "Duration",
+                    "frequency": "5m",
+                    "queries_per_evaluation": 1,
+                    "queries_per_hour": 12,
+                    "datapoints_per_hour": 12,
+                }
+            ]
+        )
+        report["queries_per_hour"].should.eql(
+            {"dashboard": 6 * 120, "alerts": 12, "total": 6 * 120 + 12}
+        )
+        # 3 statistics at the 60s auto period and 1 at 5m over an hour
+        report["datapoints_per_hour"].should.eql(
+            {"dashboard": 192 * 120, "alerts": 12, "total": 192 * 120 + 12}
+        )
+
+    def test_should_not_count_refreshes_of_dashboards_without_refresh(self):
+        report = get_dashboard_report(dict(DASHBOARD, refresh=False))
+
+        report["queries_per_hour"].should.eql(
+            {"dashboard": 0, "alerts": 12, "total": 12}
+        )
+        report["datapoints_per_hour"]["total"].should.eql(12)
+
+    def test_should_estimate_variable_periods_as_auto(self):
+        # The daily auto period of 30 days, refreshed every minute
+        target = {"metricName": "Errors", "period": "$period"}
+
+        get_dashboard_report(
+            {"time": {"from": "now-30d"}, "panels": [{"targets": [target]}]}
+        )["datapoints_per_hour"]["dashboard"].should.eql(30 * 60)
+
+    def test_should_report_budget_violations(self):
+        report = get_dashboard_report(DASHBOARD)
+
+        get_budget_violations(report).should.be.empty
+        get_budget_violations(report, 4, 192 * 120 + 12).should.be.empty
+        get_budget_violations(report, 3, 1000).should.eql(
+            [
+                "4 CloudWatch metric queries per refresh, more than 3",
+                "23052 GetMetricData datapoints per hour, more than 1000",
+            ]
+        )
+
+    def test_should_scale_with_lambdas(self):
+        def get_report(lambdas):
+            dashboard = generate_sfn_dashboard(
+                name="arn:aws:states:eu-west-1:1234567890:stateMachine:sfn",
+                cloudwatch_data_source="cloudwatch",
+                lambda_insights_namespace="LambdaInsights",
+                notifications=[],
+                environment="prod",
+                lambdas=["lambda-{}".format(i) for i in range(lambdas)],
+            )
+            return get_dashboard_report(dashboard.auto_panel_ids().to_json_data())
+
+        one, two = get_report(1), get_report(2)
+
+        per_lambda = (
+            two["queries_per_refresh"]["cloudwatch_metrics"]
+            - one["queries_per_refresh"]["cloudwatch_metrics"]
+        )
+        per_lambda.should.eql(2 + 3 + 3 + 2)
+        two["refresh"].should.eql("1m")
+
+    def test_should_count_search_expression_series(self):
+        def get_report(lambdas):
+            dashboard = generate_sfn_dashboard(
+                name="arn:aws:states:eu-west-1:1234567890:stateMachine:sfn",
+                cloudwatch_data_source="cloudwatch",
+                lambda_insights_namespace="LambdaInsights",
+                notifications=[],
+                environment="prod",
+                lambdas=["lambda-{}".format(i) for i in range(lambdas)],
+                aggregate_lambdas=True,
+            )
+            return get_dashboard_report(dashboard.auto_panel_ids().to_json_data())
+
+        one, ten = get_report(1), get_report(10)
+
+        ten["queries_per_refresh"].should.eql(one["queries_per_refresh"])
+        ten["panel_count"].should.eql(one["panel_count"])
+        (
+            ten["datapoints_per_hour"]["dashboard"]
+            - one["datapoints_per_hour"]["dashboard"]
+        ).should.eql(9 * 4 * 60 * 60)
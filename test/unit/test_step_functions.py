@@ -12,6 +12,7 @@ from grafanalib.core import (
     Templating,
 )
 
+from lib.layout import get_sections
 from lib.step_functions import (
     generate_sfn_dashboard,
     generate_sfn_execution_duration_graph,
@@ -178,7 +179,7 @@ class TestStepFunctionDashboards:
         generated_dashboard.should.be.a(Dashboard)
         generated_dashboard.title.should.match(r"Step Function:")
         generated_dashboard.tags.should.have.length_of(2)
-        generated_dashboard.rows.should.have.length_of(1)
+        get_sections(generated_dashboard.panels).should.have.length_of(1)
 
     def test_should_throw_error_when_sfn_arn_not_specified(self):
         name = "sfn-1"
@@ -214,4 +215,85 @@ class TestStepFunctionDashboards:
             lambdas=lambdas,
         )
         generated_dashboard.title.should.match(r"Step Function: sfn-1")
-        generated_dashboard.rows.should.have.length_of((len(lambdas) * 2) + 1)
+        get_sections(generated_dashboard.panels).should.have.length_of(
+            (len(lambdas) * 2) + 1
+        )
+
+    def test_should_generate_aggregated_lambda_graphs(self):
+        generated_dashboard = generate_sfn_dashboard(
+            name="arn:aws:states:eu-west-1:1234567890:stateMachine:sfn-1",
+            cloudwatch_data_source="prod",
+            lambda_insights_namespace="insights",
+            notifications=["foo-1"],
+            environment="prod",
+            lambdas=["lambda-{}".format(i) for i in range(100)],
+            aggregate_lambdas=True,
+        )
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.have.length_of(3)
+        [section.title for section in sections[1:]].should.eql(
+            ["Lambda Metrics", "Lambda Logs"]
+        )
+        invocations, errors, duration, memory = sections[1].panels
+        invocations.targets.should.have.length_of(3)
+        invocations.targets[0].alias.should.eql("{{FunctionName}}")
+        invocations.targets[0].expression.should.match(
+            r'^SEARCH\(\'{AWS/Lambda,FunctionName} MetricName="Invocations" '
+            r'\(FunctionName="lambda-0" OR FunctionName="lambda-1" OR '
+        )
+        invocations.targets[0].expression.should.match(r"\)', 'Sum'\)$")
+        "".join(target.expression for target in duration.targets).count(
+            'FunctionName="lambda-'
+        ).should.eql(100)
+        memory.targets[0].expression.should.match(
+            r"^SEARCH\('{insights,function_name} MetricName=\"memory_utilization\""
+        )
+        memory.alert.should.be.none
+        invocations.dataLinks[0].linkUrl.should.eql(
+            "/dashboards?query=Lambda%3A%20${__series.name:percentencode}"
+        )
+        logs = sections[2].panels[0]
+        [len(target.logGroupNames) for target in logs.targets].should.eql([50, 50])
+
+    def test_should_generate_repeated_lambda_rows(self):
+        lambdas = ["lambda-{}".format(i) for i in range(30)]
+
+        generated_dashboard = generate_sfn_dashboard(
+            name="arn:aws:states:eu-west-1:1234567890:stateMachine:sfn-1",
+            cloudwatch_data_source="prod",
+            lambda_insights_namespace="insights",
+            notifications=["foo-1"],
+            environment="prod",
+            lambdas=lambdas,
+            repeat_lambdas=True,
+        )
+
+        sections = get_sections(generated_dashboard.panels)
+        sections.should.have.length_of(3)
+        [section.repeat for section in sections].should.eql([None, "lambda", "lambda"])
+        [section.title for section in sections[1:]].should.eql(
+            ["$lambda Lambda Metrics", "$lambda Lambda Logs"]
+        )
+        sections[1].panels[0].targets[0].dimensions.should.eql(
+            {"FunctionName": "$lambda"}
+        )
+        [panel.alert for panel in sections[1].panels].should.eql([None] * 4)
+        generated_dashboard.templating.list.should.have.length_of(1)
+        template = generated_dashboard.templating.list[0].to_json_data()
+        template["name"].should.eql("lambda")
+        template["type"].should.eql("custom")
+        template["multi"].should.be.true
+        template["current"]["value"].should.eql("lambda-0")
+        [option["value"] for option in template["options"]].should.eql(lambdas)
+
+    def test_should_fail_on_aggregated_and_repeated_lambdas(self):
+        generate_sfn_dashboard.when.called_with(
+            name="arn:aws:states:eu-west-1:1234567890:stateMachine:sfn-1",
+            cloudwatch_data_source="prod",
+            lambda_insights_namespace="insights",
+            notifications=[],
+            environment="prod",
+            lambdas=["lambda-1"],
+            aggregate_lambdas=True,
+            repeat_lambdas=True,
+        ).should.throw(Exception, "Lambdas can not be both aggregated and repeated")
@@ -0,0 +1,196 @@
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bin import render_manifest, sync_manifest
+from lib import get_content_hash
+from lib.sync import GrafanaClient, GrafanaError, get_report
+
+
+class StubGrafanaHandler(BaseHTTPRequestHandler):
+    """Stub of the Grafana search and dashboard API"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        limit, page = int(query["limit"][0]), int(query["page"][0])
+        with self.server.lock:
+            results = [
+                {"folderUid": folder_uid, "title": title, "tags": tags}
+                for (folder_uid, title), tags in self.server.dashboards.items()
+            ]
+        self.reply(200, results[(page - 1) * limit : page * limit])
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        title = body["dashboard"]["title"]
+        server = self.server
+        with server.lock:
+            server.requests.append((self.client_address, self.path, body))
+            attempts = server.attempts[title] = server.attempts.get(title, 0) + 1
+
+        if attempts <= server.stalls:
+            time.sleep(0.5)
+        if title in server.failing or attempts <= server.failures:
+            self.reply(503, {"message": "unavailable"})
+            return
+
+        with server.lock:
+            server.dashboards[(body.get("folderUid"), title)] = body["dashboard"][
+                "tags"
+            ]
+        self.reply(200, {"status": "success", "uid": title, "version": attempts})
+
+    def reply(self, status: int, data):
+        response = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_grafana(failures=0, failing=(), stalls=0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGrafanaHandler)
+    server.lock = threading.Lock()
+    server.requests, server.attempts, server.dashboards = [], {}, {}
+    server.failures, server.failing, server.stalls = failures, failing, stalls
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:{}".format(server.server_address[1])
+
+
+SPECS = [
+    {
+        "id": "rds-{}".format(i),
+        "service": "rds",
+        "name": "db-{}".format(i),
+        "environment": "prod",
+        "cloudwatch_data_source": "cloudwatch",
+        "engine": "postgres",
+        "folder_uid": "folder-{}".format(i % 2),
+    }
+    for i in range(6)
+]
+
+
+class TestSync:
+    """Test pushing dashboards to Grafana"""
+
+    def test_should_post_dashboards_per_folder_over_pooled_connections(self):
+        server, url = start_stub_grafana()
+        client = GrafanaClient(url, auth="admin:admin", concurrency=2)
+
+        results, errors = sync_manifest(SPECS, client)
+        client.close()
+        server.shutdown()
+
+        errors.should.be.empty
+        list(results).should.eql(["rds-0", "rds-2", "rds-4", "rds-1", "rds-3", "rds-5"])
+        results["rds-0"]["action"].should.eql("created")
+        results["rds-0"]["status"].should.eql("success")
+        [body["folderUid"] for _, _, body in server.requests].should.eql(
+            ["folder-0"] * 3 + ["folder-1"] * 3
+        )
+        {path for _, path, _ in server.requests}.should.eql({"/api/dashboards/db"})
+        len({address for address, _, _ in server.requests}).should.be.lower_than(3)
+
+    def test_should_retry_with_backoff(self):
+        server, url = start_stub_grafana(failures=2)
+        client = GrafanaClient(url, concurrency=1, retries=2, backoff=0.01)
+
+        results, errors = sync_manifest(SPECS[:1], client)
+        client.close()
+        server.shutdown()
+
+        errors.should.be.empty
+        results["rds-0"]["version"].should.eql(3)
+
+    def test_should_retry_stalled_requests(self):
+        server, url = start_stub_grafana(stalls=1)
+        client = GrafanaClient(url, concurrency=1, retries=1, backoff=0.01, timeout=0.1)
+
+        results, errors = sync_manifest(SPECS[:1], client)
+        client.close()
+        server.shutdown()
+
+        errors.should.be.empty
+        results["rds-0"]["version"].should.eql(2)
+
+    def test_should_isolate_failing_dashboards(self):
+        server, url = start_stub_grafana(failing=("RDS: db-1",))
+        client = GrafanaClient(url, concurrency=2, retries=1, backoff=0.01)
+
+        results, errors = sync_manifest(SPECS[:3], client)
+        client.close()
+        server.shutdown()
+
+        list(results).should.eql(["rds-0", "rds-2"])
+        errors["rds-1"].should.contain("HTTP 503")
+
+    def test_should_fail_without_server(self):
+        client = GrafanaClient("http://127.0.0.1:1", retries=1, backoff=0.01)
+
+        client.request.when.called_with("GET", "/api/health").should.throw(GrafanaError)
+
+
+class TestSyncChanges:
+    """Test skipping unchanged dashboards"""
+
+    def test_should_hash_canonical_json(self):
+        get_content_hash({"a": 1, "b": [1, 2]}).should.eql(
+            get_content_hash({"b": [1, 2], "a": 1})
+        )
+        get_content_hash({"a": 1}).shouldnt.eql(get_content_hash({"a": 2}))
+        len("content-hash:" + get_content_hash({})).should.be.lower_than(51)
+
+    def test_should_tag_dashboards_with_the_rendered_hash(self):
+        server, url = start_stub_grafana()
+        client = GrafanaClient(url)
+        rendered, _ = render_manifest(SPECS[:1])
+
+        sync_manifest(SPECS[:1], client)
+        client.close()
+        server.shutdown()
+
+        server.dashboards[("folder-0", "RDS: db-0")].should.contain(
+            "content-hash:" + rendered["rds-0"]["contentHash"]
+        )
+
+    def test_should_only_post_changed_dashboards(self):
+        server, url = start_stub_grafana()
+        client = GrafanaClient(url, concurrency=2)
+        sync_manifest(SPECS[:2], client)
+        changed = dict(SPECS[1], engine="mysql")
+
+        dry_run, _ = sync_manifest(
+            SPECS[:1] + [changed] + SPECS[2:3], client, dry_run=True
+        )
+        posted = len(server.requests)
+        results, errors = sync_manifest(SPECS[:1] + [changed] + SPECS[2:3], client)
+        client.close()
+        server.shutdown()
+
+        get_report(dry_run).should.eql(
+            {
+                "created": 1,
+                "updated": 1,
+                "skipped": 1,
+                "dashboards": {
+                    "rds-0": {"action": "skipped"},
+                    "rds-2": {"action": "created"},
+                    "rds-1": {"action": "updated"},
+                },
+            }
+        )
+        posted.should.eql(2)
+        errors.should.be.empty
+        [
+            body["dashboard"]["title"] for _, _, body in server.requests[posted:]
+        ].should.eql(["RDS: db-2", "RDS: db-1"])
+        get_report(results)["skipped"].should.eql(1)
@@ -0,0 +1,107 @@
+import itertools
+import json
+
+import lib.api_gateways  # noqa: F401
+import lib.ecs  # noqa: F401
+import lib.elasticache_redis  # noqa: F401
+import lib.elasticsearch  # noqa: F401
+import lib.firehose  # noqa: F401
+import lib.lambdas  # noqa: F401
+import lib.rds  # noqa: F401
+import lib.sns  # noqa: F401
+import lib.step_functions  # noqa: F401
+from lib import CanonicalEncoder
+from lib.templates import (
+    BUILDERS,
+    MEMO,
+    MEMO_STATS,
+    memoized_panels,
+    precompiled_panels,
+)
+
+# Values of the builder arguments, variables get values that need escaping
+ARGUMENTS = {
+    "notifications": [[], [{"uid": "slack"}]],
+    "fifo": [False, True],
+    "max": [4],
+    # create_sns_graph parses the topic arn, so the name keys its template
+    "name": ["arn:aws:sns:eu-west-1:1234567890:topic-1", "topic-2"],
+}
+VALUES = [
+    "arn:aws:lambda:eu-west-1:1234567890:function:lambda-1",
+    'db-"quoted"\\path ü',
+]
+
+
+def get_arguments(builder):
+    """Every combination of the arguments of the builder"""
+
+    names = [
+        name
+        for name in builder.builder.__code__.co_varnames[
+            : builder.builder.__code__.co_argcount
+        ]
+        if name not in builder.variables
+    ]
+    for values in itertools.product(*[ARGUMENTS[name] for name in names]):
+        for value in VALUES:
+            arguments = dict(zip(names, values))
+            arguments.update(
+                {variable: value + variable for variable in builder.variables}
+            )
+            yield arguments
+
+
+def render(panel):
+    return json.dumps(panel, cls=CanonicalEncoder)
+
+
+class TestPanelTemplates:
+    """Test the precompiled panel templates"""
+
+    def test_should_precompile_every_panel_builder(self):
+        len(BUILDERS).should.be.greater_than(45)
+
+    def test_should_render_same_panels_as_builders(self):
+        for builder in BUILDERS:
+            for arguments in get_arguments(builder):
+                expected = render(builder(**arguments))
+                with precompiled_panels():
+                    panel = builder(**arguments)
+
+                panel.shouldnt.be.a(type(builder.builder(**arguments)))
+                render(panel).should.eql(expected)
+
+    def test_should_only_precompile_when_enabled(self):
+        arguments = next(get_arguments(lib.rds.generate_rds_cpu_graph))
+
+        with precompiled_panels():
+            with precompiled_panels(False):
+                panel = lib.rds.generate_rds_cpu_graph(**arguments)
+
+        panel.should.eql(lib.rds.generate_rds_cpu_graph.builder(**arguments))
+
+
+class TestPanelMemo:
+    """Test memoizing the lambda panels across dashboards"""
+
+    def test_should_only_memoize_when_enabled(self):
+        panel = lib.lambdas.lambda_generate_logs_panel("lambda-1", "cloudwatch")
+
+        panel.should.be.a(
+            type(lib.lambdas.lambda_generate_logs_panel.builder("a", "b"))
+        )
+
+    def test_should_evict_least_recently_used_panels(self):
+        MEMO.clear()
+        hits = MEMO_STATS["hits"]
+
+        with memoized_panels(2):
+            for name in ["lambda-1", "lambda-2", "lambda-1", "lambda-3", "lambda-2"]:
+                panel = lib.lambdas.lambda_generate_duration_graph(name, "cloudwatch")
+
+        (MEMO_STATS["hits"] - hits).should.eql(1)
+        len(MEMO).should.eql(2)
+        render(panel).should.eql(
+            render(lib.lambdas.lambda_generate_duration_graph("lambda-2", "cloudwatch"))
+        )